@@ -0,0 +1,184 @@
+"""Backtest throughput benchmark: legacy per-row loop vs array-backed loop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_backtest --bars 525600
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import time
+from typing import Any
+
+from core.backtest_engine import BacktestEngine, BacktestPosition
+from strategy.base_strategy import StrategySettings
+
+
+def make_klines(bars: int, seed: int = 7) -> Any:
+    """Build a deterministic random-walk OHLCV frame (the golden dataset)."""
+    numpy = importlib.import_module("numpy")
+    pandas = importlib.import_module("pandas")
+
+    rng = numpy.random.default_rng(seed)
+    close = 30_000.0 * numpy.exp(numpy.cumsum(rng.normal(0.0, 0.0015, bars)))
+    open_ = numpy.concatenate(([close[0]], close[:-1]))
+    spread = numpy.abs(rng.normal(0.0, 0.001, bars)) * close
+    return pandas.DataFrame(
+        {
+            "open_time": pandas.date_range("2024-01-01", periods=bars, freq="1min", tz="UTC"),
+            "open": open_,
+            "high": numpy.maximum(open_, close) + spread,
+            "low": numpy.minimum(open_, close) - spread,
+            "close": close,
+            "volume": rng.uniform(1.0, 100.0, bars),
+        }
+    )
+
+
+def legacy_run_backtest(engine: BacktestEngine, strategy_settings: StrategySettings) -> dict[str, float | int]:
+    """Reference copy of the original ``df.iloc`` row loop, kept for parity and timing.
+
+    Entry rules follow live trading: only the LONG condition opens a position and
+    the anti re-entry distance applies (the default settings have no cooldown or stop).
+    """
+    pandas = importlib.import_module("pandas")
+    importlib.import_module("pandas_ta")
+
+    df = engine.dataframe.copy()
+    df["rsi"] = df.ta.rsi(close="close", length=strategy_settings.rsi_period)
+    df["ema"] = df.ta.ema(close="close", length=strategy_settings.ema_period)
+    adx_df = df.ta.adx(high="high", low="low", close="close", length=strategy_settings.adx_period)
+    adx_col = f"ADX_{strategy_settings.adx_period}"
+    df["adx"] = adx_df[adx_col] if adx_col in adx_df.columns else None
+
+    position: BacktestPosition | None = None
+    engine.equity_curve = [0.0]
+    engine.trade_results = []
+    cumulative_pnl = 0.0
+    last_exit_price = 0.0
+
+    for i in range(len(df)):
+        row = df.iloc[i]
+        if pandas.isna(row.get("rsi")) or pandas.isna(row.get("ema")) or pandas.isna(row.get("adx")):
+            engine.equity_curve.append(cumulative_pnl)
+            continue
+
+        price = float(row["close"])
+        signal = None
+        if (
+            row["rsi"] < strategy_settings.rsi_level
+            and price > row["ema"]
+            and row["adx"] > strategy_settings.adx_threshold
+        ):
+            signal = "LONG"
+        if signal and last_exit_price > 0:
+            if abs(price - last_exit_price) / last_exit_price * 100.0 < strategy_settings.anti_reentry_threshold_pct:
+                signal = None
+
+        if position is None and signal:
+            position = engine.simulate_trade(
+                direction=(strategy_settings.futures_position_side.upper() if strategy_settings.enable_futures else signal),
+                usdt_amount=strategy_settings.base_order_size_usdt,
+                price=price,
+            )
+            engine.equity_curve.append(cumulative_pnl)
+            continue
+
+        if position is None:
+            engine.equity_curve.append(cumulative_pnl)
+            continue
+
+        step = strategy_settings.safety_step_pct / 100.0
+        trigger = (
+            price <= position.average_price * (1 - step)
+            if position.direction == "LONG"
+            else price >= position.average_price * (1 + step)
+        )
+        if trigger and position.safety_orders_used < strategy_settings.safety_orders_count:
+            next_usdt = position.last_order_usdt * strategy_settings.volume_multiplier
+            added = engine.simulate_trade(position.direction, next_usdt, price)
+            position.total_qty += added.total_qty
+            position.total_cost += added.total_cost
+            position.average_price = position.total_cost / max(position.total_qty, 1e-9)
+            position.last_order_usdt = next_usdt
+            position.safety_orders_used += 1
+
+        if strategy_settings.enable_futures and not position.break_even_armed:
+            gain_pct = (
+                (price - position.average_price) / position.average_price * 100.0
+                if position.direction == "LONG"
+                else (position.average_price - price) / position.average_price * 100.0
+            )
+            if gain_pct >= strategy_settings.break_even_after_percent:
+                position.break_even_armed = True
+
+        if strategy_settings.enable_futures and position.break_even_armed:
+            if (position.direction == "LONG" and price <= position.average_price) or (
+                position.direction == "SHORT" and price >= position.average_price
+            ):
+                pnl = engine._close_position(position, price, strategy_settings.commission_pct)
+                cumulative_pnl += pnl
+                engine.trade_results.append(pnl)
+                last_exit_price = price
+                position = None
+                engine.equity_curve.append(cumulative_pnl)
+                continue
+
+        tp = (
+            position.average_price * (1 + strategy_settings.take_profit_pct / 100.0)
+            if position.direction == "LONG"
+            else position.average_price * (1 - strategy_settings.take_profit_pct / 100.0)
+        )
+        hit_tp = (price >= tp) if position.direction == "LONG" else (price <= tp)
+        if hit_tp:
+            pnl = engine._close_position(position, price, strategy_settings.commission_pct)
+            cumulative_pnl += pnl
+            engine.trade_results.append(pnl)
+            last_exit_price = price
+            position = None
+
+        engine.equity_curve.append(cumulative_pnl)
+
+    return engine.generate_report()
+
+
+def _timed(label: str, bars: int, func: Any) -> Any:
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<12} {elapsed:8.3f}s  {bars / elapsed:12,.0f} bars/sec")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=100_000)
+    parser.add_argument("--futures", action="store_true", help="enable futures break-even logic")
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the array-backed loop")
+    args = parser.parse_args()
+
+    settings = StrategySettings(rsi_level=45.0, enable_futures=args.futures)
+    dataframe = make_klines(args.bars)
+
+    engine = BacktestEngine()
+    engine.dataframe = dataframe
+    report = _timed("array loop", args.bars, lambda: engine.run_backtest(settings))
+    if args.skip_legacy:
+        return 0
+
+    legacy = BacktestEngine()
+    legacy.dataframe = dataframe
+    legacy_report = _timed("legacy iloc", args.bars, lambda: legacy_run_backtest(legacy, settings))
+
+    # the legacy loop predates the trade-duration/DCA stats, so compare the metrics it produced
+    shared = ("total_trades", "win_rate", "total_profit", "max_drawdown", "average_profit", "average_loss", "profit_factor")
+    identical = all(report[key] == legacy_report[key] for key in shared)
+    identical = identical and engine.equity_curve.tolist() == legacy.equity_curve
+    print(f"reports and equity curves identical: {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+"""Close vs intrabar high/low fill model: throughput and result drift side by side.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_fill_models --bars 200000 --batch 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+from dataclasses import replace
+from typing import Any
+
+from benchmarks.bench_backtest import make_klines
+from core.backtest_engine import BacktestEngine
+from strategy.base_strategy import StrategySettings
+
+FILL_MODES = (
+    ("Close", "Adverse first"),
+    ("Intrabar", "Adverse first"),
+    ("Intrabar", "Favorable first"),
+)
+
+
+def _exit_grid(base: StrategySettings, size: int) -> list[StrategySettings]:
+    take_profits = (0.3, 0.5, 0.8, 1.0, 1.5, 2.0, 3.0, 4.0)
+    steps = (0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0)
+    counts = (0, 1, 2, 3, 4, 5, 6, 8)
+    grid = itertools.product(take_profits, steps, counts)
+    return [
+        replace(base, take_profit_pct=tp, safety_step_pct=step, safety_orders_count=count)
+        for tp, step, count in itertools.islice(grid, size)
+    ]
+
+
+def _timed(func: Any) -> tuple[Any, float]:
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=64, help="exit parameter sets per batched run")
+    parser.add_argument("--futures", action="store_true", help="enable futures break-even logic")
+    args = parser.parse_args()
+
+    engine = BacktestEngine()
+    engine.dataframe = make_klines(args.bars)
+    base = StrategySettings(rsi_level=45.0, enable_futures=args.futures)
+    # warm the indicator arrays so every row times only the simulation
+    engine.build_entry_signals(base)
+
+    print(f"{'fill model':<26} {'single bars/s':>14} {'batch sets*bars/s':>18} {'trades':>7} {'profit':>11}")
+    for fill_model, order in FILL_MODES:
+        settings = replace(base, backtest_fill_model=fill_model, intrabar_order=order)
+        report, single = _timed(lambda: engine.run_backtest(settings))
+        batch = _exit_grid(settings, args.batch)
+        _, batched = _timed(lambda: engine.run_backtest_batch(batch))
+        label = fill_model if fill_model == "Close" else f"{fill_model} ({order})"
+        print(
+            f"{label:<26} {args.bars / single:14,.0f} {len(batch) * args.bars / batched:18,.0f} "
+            f"{report['total_trades']:7d} {report['total_profit']:11.4f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+"""Indicator backends: NumPy vs pandas-ta parity and per-call latency.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_indicators --sizes 200 500000
+
+The parity check compares every indicator and period over each size and fails
+(exit code 1) when the backends disagree on warm-up or by more than ``--tolerance``.
+The 20-bar volume average of the volume filter is checked against pandas'
+``shift(1).rolling(20, min_periods=1).mean()``, and the incremental engine of the
+live workers against the NumPy backend, on candles that include flat stretches
+and zero-range bars. Without pandas-ta installed the backend comparison is skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import time
+from types import SimpleNamespace
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks.bench_backtest import make_klines
+from strategy.indicators import INDICATOR_NAMES, IncrementalIndicatorEngine, indicator_array
+from strategy.numpy_indicators import volume_mean
+from strategy.signals import VOLUME_LOOKBACK
+
+PARITY_PERIODS = (2, 5, 14, 30, 200)
+
+
+def _columns(bars: int) -> tuple[Any, Any, Any, Any]:
+    frame = make_klines(bars)
+    return tuple(frame[name].to_numpy() for name in ("close", "high", "low", "volume"))
+
+
+def _per_call_ms(compute: Callable[[], Any], bars: int) -> float:
+    compute()
+    repeat = max(3, 200_000 // max(bars, 1))
+    started = time.perf_counter()
+    for _ in range(repeat):
+        compute()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+def volume_mean_reference(volume: Any, lookback: int) -> Any:
+    """The pandas formulation of the volume filter's average of previous bars."""
+    pandas = importlib.import_module("pandas")
+    return pandas.Series(volume).shift(1).rolling(lookback, min_periods=1).mean().to_numpy()
+
+
+def _drift_errors(label: str, fast: Any, reference: Any, tolerance: float) -> list[str]:
+    numpy = importlib.import_module("numpy")
+    warm = ~numpy.isnan(reference)
+    if not numpy.array_equal(warm, ~numpy.isnan(fast)):
+        return [f"{label}: warm-up differs"]
+    if warm.any():
+        scale = numpy.maximum(numpy.abs(reference[warm]), 1.0)
+        drift = float(numpy.max(numpy.abs(fast[warm] - reference[warm]) / scale))
+        if drift > tolerance:
+            return [f"{label}: relative drift {drift:.3g}"]
+    return []
+
+
+def parity_errors(bars: int, tolerance: float) -> list[str]:
+    """Mismatches between the backends over ``bars`` golden candles (empty when they agree)."""
+    close, high, low, _ = _columns(bars)
+    errors = []
+    for name in INDICATOR_NAMES:
+        for period in PARITY_PERIODS:
+            fast = indicator_array(name, period, close, high, low, "numpy")
+            reference = indicator_array(name, period, close, high, low, "pandas_ta")
+            errors += _drift_errors(f"{name}({period}) bars={bars}", fast, reference, tolerance)
+    return errors
+
+
+def volume_parity_errors(bars: int, tolerance: float) -> list[str]:
+    """Mismatches between ``volume_mean`` and the pandas rolling reference (empty when they agree)."""
+    volume = _columns(bars)[3]
+    errors = []
+    for lookback in sorted({*PARITY_PERIODS, VOLUME_LOOKBACK}):
+        reference = volume_mean_reference(volume, lookback)
+        errors += _drift_errors(f"volume_mean({lookback}) bars={bars}", volume_mean(volume, lookback), reference, tolerance)
+    return errors
+
+
+def _flat_candles(bars: int) -> dict[str, Any]:
+    """Golden candles with a flat stretch (no price change at all) and scattered zero-range bars."""
+    numpy = importlib.import_module("numpy")
+    frame = make_klines(bars)
+    columns = {name: frame[name].to_numpy().copy() for name in ("high", "low", "close")}
+    flat = slice(bars // 3, bars // 3 + min(60, bars // 3))
+    for column in columns.values():
+        column[flat] = columns["close"][flat.start]
+    zero_range = numpy.arange(5, bars, 37)
+    columns["high"][zero_range] = columns["low"][zero_range] = columns["close"][zero_range]
+    return columns
+
+
+def incremental_parity_errors(bars: int, tolerance: float) -> list[str]:
+    """Mismatches between ``IncrementalIndicatorEngine`` and the NumPy backend, bar by bar."""
+    numpy = importlib.import_module("numpy")
+    flat_price = numpy.full(min(bars, 30), 100.0)
+    cases = {"golden": _flat_candles(bars), "flat": {"high": flat_price, "low": flat_price, "close": flat_price}}
+    errors = []
+    for case, columns in cases.items():
+        keys = [(name, period) for name in INDICATOR_NAMES for period in PARITY_PERIODS]
+        engine = IncrementalIndicatorEngine()
+        values = {key: [engine.value(*key)] for key in keys}
+        for row in range(len(columns["close"])):
+            engine.update(SimpleNamespace(**{name: column[row] for name, column in columns.items()}))
+            for key in keys:
+                values[key].append(engine.value(*key))
+        for (name, period), series in values.items():
+            reference = indicator_array(name, period, columns["close"], columns["high"], columns["low"], "numpy")
+            label = f"incremental {name}({period}) {case} bars={len(reference)}"
+            errors += _drift_errors(label, numpy.array(series[1:]), reference, tolerance)
+    return errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 500_000], help="bars per input")
+    parser.add_argument("--period", type=int, default=14)
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="allowed relative drift")
+    args = parser.parse_args()
+
+    try:
+        importlib.import_module("pandas_ta")
+        has_pandas_ta = True
+    except ModuleNotFoundError:
+        has_pandas_ta = False
+
+    # reference: pandas-ta for the indicators, the pandas rolling mean for the volume average
+    print(f"{'bars':>9} {'indicator':>11} {'numpy ms':>13} {'reference ms':>13}")
+    for bars in args.sizes:
+        close, high, low, volume = _columns(bars)
+        rows: list[tuple[str, Callable[[], Any], Callable[[], Any] | None]] = [
+            (
+                name,
+                lambda name=name: indicator_array(name, args.period, close, high, low, "numpy"),
+                (lambda name=name: indicator_array(name, args.period, close, high, low, "pandas_ta"))
+                if has_pandas_ta
+                else None,
+            )
+            for name in INDICATOR_NAMES
+        ]
+        rows.append(
+            (
+                "volume_mean",
+                lambda: volume_mean(volume, VOLUME_LOOKBACK),
+                lambda: volume_mean_reference(volume, VOLUME_LOOKBACK),
+            )
+        )
+        for name, fast, reference in rows:
+            reference_ms = f"{_per_call_ms(reference, bars):13.3f}" if reference is not None else f"{'-':>13}"
+            print(f"{bars:9d} {name:>11} {_per_call_ms(fast, bars):13.3f} {reference_ms}")
+
+    errors = [error for bars in args.sizes for error in volume_parity_errors(bars, args.tolerance)]
+    # the incremental engine is fed bar by bar: keep its check to a few thousand candles
+    errors += [error for bars in args.sizes for error in incremental_parity_errors(min(bars, 5_000), args.tolerance)]
+    if not has_pandas_ta:
+        print("pandas_ta is not installed: backend parity check skipped")
+    else:
+        errors += [error for bars in args.sizes for error in parity_errors(bars, args.tolerance)]
+    for error in errors:
+        print(error)
+    print(f"parity {'OK' if not errors else 'FAILED'}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,54 @@
+"""Portfolio backtest over many memory-mapped symbols: throughput and peak memory.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_portfolio --symbols 50 --bars 100000 --budget-mb 128
+"""
+
+from __future__ import annotations
+
+import argparse
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_backtest import make_klines
+from core.candles import CandleArrays, open_candle_file, write_candle_file
+from core.portfolio_backtest import simulate_portfolio
+from strategy.base_strategy import StrategySettings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--bars", type=int, default=100_000)
+    parser.add_argument("--budget-mb", type=float, default=128.0, help="chunk working set")
+    parser.add_argument("--exposure-pct", type=float, default=30.0, help="max_total_exposure_pct")
+    args = parser.parse_args()
+
+    settings = StrategySettings(rsi_level=45.0, safety_orders_count=3, max_total_exposure_pct=args.exposure_pct)
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+        candles = {}
+        for index in range(args.symbols):
+            path = Path(directory) / f"SYM{index}.candles"
+            write_candle_file(path, CandleArrays.from_dataframe(make_klines(args.bars, seed=index)))
+            candles[f"SYM{index}"] = open_candle_file(path)
+
+        started = time.perf_counter()
+        result = simulate_portfolio(candles, settings, memory_budget_mb=args.budget_mb, stop_on_loss_streak=False)
+        elapsed = time.perf_counter() - started
+
+    combined = result["combined"]
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"symbols={args.symbols} bars={args.bars} rows={len(result['open_time'])} seconds={elapsed:.2f}")
+    print(f"symbol-bars/s={args.symbols * args.bars / elapsed:,.0f} peak RSS={peak_mb:.0f} MB")
+    print(
+        f"trades={combined['total_trades']} skipped entries={combined['skipped_entries']} "
+        f"peak exposure={combined['peak_exposure_usdt']:.2f} profit={combined['total_profit']:.4f}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
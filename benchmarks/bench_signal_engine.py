@@ -0,0 +1,77 @@
+"""Minute-boundary signal latency: per-pair evaluation vs the cross-pair SignalEngine batch.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_signal_engine --pairs 60 --bars 600
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from benchmarks.bench_backtest import make_klines
+from core.pair_manager import PairWorker
+from core.signal_engine import SignalEngine
+from core.websocket_manager import Candle
+from strategy.base_strategy import StrategySettings
+
+
+async def _boundary_ms(
+    klines: dict[str, Any], settings: StrategySettings, batched: bool, warmup: int
+) -> tuple[float, list[tuple[str, int, str]]]:
+    """Mean time to process one candle close on every pair, after ``warmup`` closes."""
+    websocket = SimpleNamespace(candles={pair: [] for pair in klines}, candle_versions=dict.fromkeys(klines, 0), prices={})
+    workers: dict[str, PairWorker] = {}
+    engine = SignalEngine(workers) if batched else None
+    signals: list[tuple[str, int, str]] = []
+    for pair in klines:
+        worker = PairWorker(pair, "Spot", "Binance", None, websocket, None, settings, lambda *args: None, signal_engine=engine)
+        worker.running = True
+        # measure evaluation only: no orders are placed
+        worker.position_open = True
+        workers[pair] = worker
+
+    columns = {pair: frame[["open", "high", "low", "close", "volume"]].to_numpy() for pair, frame in klines.items()}
+    bars = len(next(iter(columns.values())))
+    spent = 0.0
+    for bar in range(bars):
+        for pair, rows in columns.items():
+            websocket.candles[pair].append(Candle(*map(float, rows[bar])))
+            del websocket.candles[pair][:-200]
+            websocket.candle_versions[pair] += 1
+        started = time.perf_counter()
+        for worker in workers.values():
+            await worker._process_closed_candle_if_needed()
+        if bar >= warmup:
+            spent += time.perf_counter() - started
+            for pair, worker in workers.items():
+                snapshot = worker.indicator_snapshot
+                if snapshot is not None and snapshot.signal is not None:
+                    signals.append((pair, snapshot.version, snapshot.signal))
+    return spent / max(bars - warmup, 1) * 1e3, signals
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=60)
+    parser.add_argument("--bars", type=int, default=600)
+    args = parser.parse_args()
+
+    settings = StrategySettings(rsi_level=50.0, use_adx_filter=True, use_volume_filter=True, volume_spike_multiplier=0.9)
+    klines = {f"PAIR{index}USDT": make_klines(args.bars, seed=index) for index in range(args.pairs)}
+    warmup = min(settings.ema_period, args.bars // 2)
+    single, single_signals = asyncio.run(_boundary_ms(klines, settings, False, warmup))
+    batched, batched_signals = asyncio.run(_boundary_ms(klines, settings, True, warmup))
+    print(f"pairs={args.pairs} bars={args.bars}")
+    print(f"per-pair evaluation   {single:8.3f} ms per boundary")
+    print(f"SignalEngine batch    {batched:8.3f} ms per boundary ({single / batched:.1f}x)")
+    print(f"signals identical: {single_signals == batched_signals}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,14 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
 import importlib
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any
 
+from core.batch_kernel import entry_parameters_key, simulate_exit_grid, stop_loss_rule, trade_variance
+from core.cancellation import CANCEL_CHECK_MASK, BacktestCancelled, CancelEvent
+from core.candles import CandleArrays, open_candle_file, write_candle_file
+from core.indicator_cache import IndicatorCache
+from core.kline_fetcher import KlineFetcher
+from core.kline_store import KLINE_COLUMNS, KlineStore
 from strategy.base_strategy import StrategySettings
+from strategy.indicators import indicator_array, indicator_backend
+from strategy.signals import build_condition_arrays, condition_indicators, condition_lookback
 from utils.logger import log
 
+DEFAULT_STREAM_CHUNK_BARS = 100_000
+# Wilder/EMA averages forget their starting point by a factor (1 - 1/period) per bar;
+# this many periods of warm-up push a different start far below float64 resolution
+STREAM_WARMUP_PERIODS = 50
+
 
 @dataclass
 class BacktestPosition:
@@ -22,16 +37,80 @@ class BacktestPosition:
     break_even_armed: bool = False
 
 
+@dataclass
+class BacktestRunState:
+    """Open position and trade log of a backtest loop; bar indexes count from the first bar of the run.
+
+    A streaming run hands the same state to the loop for every chunk, so positions,
+    cooldown and anti re-entry memory carry over chunk boundaries.
+    """
+
+    bars: int = 0
+    position: BacktestPosition | None = None
+    entry_bar: int = 0
+    last_exit_time: float = float("-inf")
+    last_exit_price: float = 0.0
+    dca_fills: int = 0
+    trade_results: list[float] = field(default_factory=list)
+    trade_bars: list[int] = field(default_factory=list)
+    exit_bars: list[int] = field(default_factory=list)
+
+
 class BacktestEngine:
     """Runs offline trade simulation on historical Binance klines."""
 
-    def __init__(self) -> None:
-        self.dataframe: Any | None = None
-        self.equity_curve: list[float] = []
+    KLINES_URL = "https://api.binance.com/api/v3/klines"
+
+    def __init__(
+        self,
+        kline_store: KlineStore | None = None,
+        offline: bool = False,
+        kline_fetcher: KlineFetcher | None = None,
+        indicator_cache: IndicatorCache | None = None,
+        cancel_event: CancelEvent | None = None,
+    ) -> None:
+        self.candles: CandleArrays | None = None
+        self._dataframe: Any | None = None
+        # realized PnL after every bar, float64 array of len(bars) + 1 starting at 0.0
+        self.equity_curve: Any = []
         self.trade_results: list[float] = []
+        # bars each closed trade was held, safety orders filled, bars spent in a position
+        self.trade_bars: list[int] = []
+        self.dca_fills = 0
+        self.exposure_bars = 0
+        self.bars_simulated = 0
+        self.kline_store = kline_store
+        self.kline_fetcher = kline_fetcher
+        self.indicator_cache = indicator_cache
+        # checked every CANCEL_CHECK_BARS bars; a set event raises BacktestCancelled
+        self.cancel_event = cancel_event
+        self.offline = offline
         self._aiohttp = None
         self.session = None
 
+    @property
+    def dataframe(self) -> Any | None:
+        """Pandas view over the loaded candles, built lazily for UI and legacy callers."""
+        if self._dataframe is None and self.candles is not None:
+            self._dataframe = self.candles.to_dataframe()
+        return self._dataframe
+
+    @dataframe.setter
+    def dataframe(self, value: Any | None) -> None:
+        self._dataframe = value
+        self.candles = CandleArrays.from_dataframe(value) if value is not None else None
+
+    def load_candle_file(self, path: str) -> CandleArrays:
+        """Memory-map a candle file written by ``save_candle_file`` instead of loading a frame."""
+        self._dataframe = None
+        self.candles = open_candle_file(path)
+        return self.candles
+
+    def save_candle_file(self, path: str, dtype: str = "float64") -> None:
+        if self.candles is None:
+            raise RuntimeError("Historical data is not loaded")
+        write_candle_file(path, self.candles, dtype=dtype)
+
     async def load_historical_data(
         self,
         symbol: str,
@@ -39,113 +118,381 @@ class BacktestEngine:
         start_date: str,
         end_date: str,
     ) -> Any:
-        pandas = importlib.import_module("pandas")
+        symbol = symbol.upper()
+        start_ms, end_ms = _date_range_ms(start_date, end_date)
+
+        if self.kline_store is not None:
+            rows = await self._load_cached_klines(symbol, timeframe, start_ms, end_ms)
+        elif self.offline:
+            raise RuntimeError("Offline mode requires a kline store")
+        else:
+            rows = await self._fetch_klines(symbol, timeframe, start_ms, end_ms)
+
+        self._dataframe = None
+        self.candles = CandleArrays.from_rows(rows)
+        return self.dataframe
+
+    async def _load_cached_klines(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: int,
+        load: bool = True,
+    ) -> list[Any]:
+        """Serve the range from the kline store, fetching only ranges it has not seen yet.
+
+        ``load=False`` only fills the store and returns nothing (streaming reads it in chunks).
+        """
+        store = self.kline_store
+        await asyncio.to_thread(store.init_db)
+        if not self.offline:
+            gaps = await asyncio.to_thread(store.missing_ranges, symbol, timeframe, start_ms, end_ms)
+            for gap_start, gap_end in gaps:
+                fetched = await self._fetch_klines(symbol, timeframe, gap_start, gap_end)
+                await asyncio.to_thread(store.save_klines, symbol, timeframe, fetched, gap_start, gap_end)
+            if gaps:
+                log(f"Kline cache: fetched {len(gaps)} missing range(s) for {symbol} {timeframe}")
+        if not load:
+            return []
+
+        rows = await asyncio.to_thread(store.load_klines, symbol, timeframe, start_ms, end_ms)
+        if not rows and self.offline:
+            raise RuntimeError(f"No cached klines for {symbol} {timeframe} in offline mode")
+        return rows
+
+    async def _fetch_klines(self, symbol: str, timeframe: str, start_ms: int, end_ms: int) -> list[list[Any]]:
+        if self.kline_fetcher is not None:
+            return await self.kline_fetcher.fetch(symbol, timeframe, start_ms, end_ms)
+
         if self._aiohttp is None:
             self._aiohttp = importlib.import_module("aiohttp")
 
-        start_ms = int(datetime.fromisoformat(start_date).replace(tzinfo=timezone.utc).timestamp() * 1000)
-        end_ms = int(datetime.fromisoformat(end_date).replace(tzinfo=timezone.utc).timestamp() * 1000)
         params = {
-            "symbol": symbol.upper(),
+            "symbol": symbol,
             "interval": timeframe,
             "startTime": start_ms,
             "endTime": end_ms,
             "limit": 1000,
         }
 
-        url = "https://api.binance.com/api/v3/klines"
         rows: list[list[Any]] = []
         async with self._aiohttp.ClientSession(timeout=self._aiohttp.ClientTimeout(total=20)) as session:
             while True:
-                async with session.get(url, params=params) as response:
+                async with session.get(self.KLINES_URL, params=params) as response:
                     payload = await response.json(content_type=None)
                     if response.status >= 400:
                         raise RuntimeError(f"Failed to load historical data: {payload}")
                     if not payload:
                         break
-                    rows.extend(payload)
+                    rows.extend(row[: len(KLINE_COLUMNS)] for row in payload)
                     last_open = int(payload[-1][0])
                     if len(payload) < 1000 or last_open >= end_ms:
                         break
                     params["startTime"] = last_open + 1
+        return rows
+
+    def run_backtest(
+        self,
+        strategy_settings: StrategySettings,
+        window: tuple[int, int] | None = None,
+    ) -> dict[str, float | int]:
+        """Backtest the loaded candles, or only bars ``window = (start, stop)`` of them.
+
+        Indicators are always computed over the whole history, so a window starts
+        with warmed-up indicators and shares cached indicator arrays with other windows.
+        ``backtest_fill_model = "Intrabar"`` checks exit and DCA levels against each
+        bar's high/low instead of its close (see ``_run_intrabar_loop``).
+        """
+        signals = self._window_signals(strategy_settings, window)
+        state = BacktestRunState()
+        high_low = self._window_range(window) if strategy_settings.backtest_fill_model == "Intrabar" else None
+        self._run_loop(strategy_settings, state, signals, self._window_open_time(window), high_low)
+        self._store_run(state)
+
+        report = self.generate_report()
+        log(f"Backtest complete: trades={report['total_trades']} profit={report['total_profit']:.4f}")
+        return report
+
+    def run_backtest_streaming(
+        self,
+        strategy_settings: StrategySettings,
+        chunks: Iterable[CandleArrays],
+        warmup_bars: int | None = None,
+        keep_equity_curve: bool = True,
+    ) -> dict[str, float | int]:
+        """Backtest consecutive candle chunks without holding the whole history.
+
+        Each chunk's indicators are computed over the chunk plus the ``warmup_bars``
+        candles before it (default ``stream_warmup_bars``), enough for the recursive
+        averages to settle on the same doubles as a whole-history run; position,
+        cooldown and re-entry state carry over in a ``BacktestRunState``. The report
+        matches ``run_backtest`` over the concatenated chunks. Peak memory follows
+        the chunk size; ``keep_equity_curve`` adds the 8-byte-per-bar equity curve.
+        """
+        warmup = stream_warmup_bars(strategy_settings) if warmup_bars is None else max(0, int(warmup_bars))
+        intrabar = strategy_settings.backtest_fill_model == "Intrabar"
+        state = BacktestRunState()
+        tail: CandleArrays | None = None
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            history = chunk if tail is None else CandleArrays.concatenate((tail, chunk))
+            skip = len(history) - len(chunk)
+            signals = tuple(values[skip:] for values in self.build_entry_signals(strategy_settings, history))
+            high_low = (chunk.high, chunk.low) if intrabar else None
+            self._run_loop(strategy_settings, state, signals, chunk.open_time, high_low)
+            # copy the tail so the chunk can be released before the next one arrives
+            tail = CandleArrays.concatenate((history.slice(max(0, len(history) - warmup)),))
+            del history, signals
+
+        self._store_run(state, keep_equity_curve)
+        report = self.generate_report()
+        log(
+            f"Streaming backtest complete: bars={state.bars} trades={report['total_trades']} "
+            f"profit={report['total_profit']:.4f}"
+        )
+        return report
+
+    async def run_backtest_from_store(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date: str,
+        end_date: str,
+        strategy_settings: StrategySettings,
+        chunk_bars: int = DEFAULT_STREAM_CHUNK_BARS,
+        keep_equity_curve: bool = True,
+    ) -> dict[str, float | int]:
+        """Streaming backtest reading ``chunk_bars`` candles at a time from the kline store.
+
+        Missing ranges are fetched into the store first (unless offline), then the
+        simulation runs in a worker thread.
+        """
+        if self.kline_store is None:
+            raise RuntimeError("Streaming backtests read from a kline store")
+        symbol = symbol.upper()
+        start_ms, end_ms = _date_range_ms(start_date, end_date)
+        await self._load_cached_klines(symbol, timeframe, start_ms, end_ms, load=False)
+        chunks = self._store_chunks(symbol, timeframe, start_ms, end_ms, chunk_bars)
+        return await asyncio.to_thread(
+            self.run_backtest_streaming, strategy_settings, chunks, keep_equity_curve=keep_equity_curve
+        )
+
+    def _store_chunks(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: int,
+        chunk_bars: int,
+    ) -> Iterator[CandleArrays]:
+        for rows in self.kline_store.iter_klines(symbol, timeframe, start_ms, end_ms, chunk_bars):
+            yield CandleArrays.from_rows(rows)
+
+    def run_backtest_batch(
+        self,
+        settings_list: list[StrategySettings],
+        window: tuple[int, int] | None = None,
+    ) -> list[dict[str, float | int]]:
+        """Backtest many exit/DCA settings that share entry parameters in one sweep over the bars.
 
-        df = pandas.DataFrame(
-            rows,
-            columns=[
-                "open_time",
-                "open",
-                "high",
-                "low",
-                "close",
-                "volume",
-                "close_time",
-                "quote_asset_volume",
-                "number_of_trades",
-                "taker_buy_base",
-                "taker_buy_quote",
-                "ignore",
-            ],
+        Reports match ``run_backtest`` (with the same ``window``) for each settings
+        object; equity curves and trade lists are not kept.
+        """
+        if not settings_list:
+            return []
+        entry_keys = {entry_parameters_key(settings) for settings in settings_list}
+        if len(entry_keys) != 1:
+            raise ValueError("Batched backtest requires identical entry parameters")
+
+        close, ready, long_signal, short_signal = self._window_signals(settings_list[0], window)
+        high = low = None
+        if settings_list[0].backtest_fill_model == "Intrabar":
+            high, low = self._window_range(window)
+        reports = simulate_exit_grid(
+            close,
+            ready,
+            long_signal,
+            short_signal,
+            settings_list,
+            self.cancel_event,
+            high=high,
+            low=low,
+            open_time=self._window_open_time(window),
         )
-        for col in ["open", "high", "low", "close", "volume"]:
-            df[col] = pandas.to_numeric(df[col], errors="coerce")
-        df["open_time"] = pandas.to_datetime(df["open_time"], unit="ms", utc=True)
-        df = df.dropna(subset=["open", "high", "low", "close", "volume"]).reset_index(drop=True)
-        self.dataframe = df
-        return df
-
-    def run_backtest(self, strategy_settings: StrategySettings) -> dict[str, float | int]:
-        if self.dataframe is None or self.dataframe.empty:
+        log(f"Batched backtest complete: {len(reports)} parameter sets")
+        return reports
+
+    def build_entry_signals(
+        self,
+        strategy_settings: StrategySettings,
+        candles: CandleArrays | None = None,
+    ) -> tuple[Any, Any, Any, Any]:
+        """Return close prices plus ready/LONG/SHORT entry masks for every bar.
+
+        Conditions come from ``build_condition_arrays``, the same filters live trading
+        evaluates. Like ``PairWorker``, only a LONG signal opens a position (spot
+        goes long, futures use the configured side), so the SHORT mask is empty.
+        Explicit ``candles`` (a streaming chunk) replace the loaded history and skip
+        the indicator cache.
+        """
+        cached = candles is None
+        candles = self.candles if cached else candles
+        if candles is None or len(candles) == 0:
             raise RuntimeError("Historical data is not loaded")
 
-        pandas = importlib.import_module("pandas")
-        importlib.import_module("pandas_ta")
-
-        df = self.dataframe.copy()
-        # vectorized pre-calculation
-        df["rsi"] = df.ta.rsi(close="close", length=strategy_settings.rsi_period)
-        df["ema"] = df.ta.ema(close="close", length=strategy_settings.ema_period)
-        adx_df = df.ta.adx(high="high", low="low", close="close", length=strategy_settings.adx_period)
-        adx_col = f"ADX_{strategy_settings.adx_period}"
-        df["adx"] = adx_df[adx_col] if adx_col in adx_df.columns else None
-
-        position: BacktestPosition | None = None
-        self.equity_curve = [0.0]
-        self.trade_results = []
-        cumulative_pnl = 0.0
-
-        for i in range(len(df)):
-            row = df.iloc[i]
-            if pandas.isna(row.get("rsi")) or pandas.isna(row.get("ema")) or pandas.isna(row.get("adx")):
-                self.equity_curve.append(cumulative_pnl)
-                continue
+        numpy = importlib.import_module("numpy")
+        close = numpy.asarray(candles.close, dtype=numpy.float64)
+        indicator = (
+            (lambda name, period: self._indicator(candles, name, period))
+            if cached
+            else (lambda name, period: self._compute_indicator(candles, name, period))
+        )
+        columns = {"open": candles.open, "high": candles.high, "low": candles.low}
+        conditions = build_condition_arrays(strategy_settings, close, candles.volume, indicator, columns=columns)
+        long_signal = conditions.ready & conditions.long_signal
+        return close, conditions.ready, long_signal, numpy.zeros_like(long_signal)
 
-            price = float(row["close"])
-            signal = None
-            if row["rsi"] < strategy_settings.rsi_level and price > row["ema"] and row["adx"] > 20:
-                signal = "LONG"
-            elif row["rsi"] > strategy_settings.rsi_level and price < row["ema"] and row["adx"] > 20:
-                signal = "SHORT"
-
-            if position is None and signal:
-                position = self.simulate_trade(
-                    direction=(strategy_settings.futures_position_side.upper() if strategy_settings.enable_futures else signal),
-                    usdt_amount=strategy_settings.base_order_size_usdt,
-                    price=price,
-                )
-                self.equity_curve.append(cumulative_pnl)
+    def _window_signals(
+        self,
+        strategy_settings: StrategySettings,
+        window: tuple[int, int] | None,
+    ) -> tuple[Any, Any, Any, Any]:
+        signals = self.build_entry_signals(strategy_settings)
+        if window is None:
+            return signals
+        start, stop = window
+        return tuple(values[start:stop] for values in signals)
+
+    def _window_range(self, window: tuple[int, int] | None) -> tuple[Any, Any]:
+        """High and low prices of the bars ``_window_signals`` returns."""
+        numpy = importlib.import_module("numpy")
+        candles = self.candles
+        high = numpy.asarray(candles.high, dtype=numpy.float64)
+        low = numpy.asarray(candles.low, dtype=numpy.float64)
+        if window is None:
+            return high, low
+        start, stop = window
+        return high[start:stop], low[start:stop]
+
+    def _window_open_time(self, window: tuple[int, int] | None) -> Any:
+        open_time = self.candles.open_time
+        if window is None:
+            return open_time
+        start, stop = window
+        return open_time[start:stop]
+
+    def _indicator(self, candles: CandleArrays, name: str, period: int) -> Any:
+        """Return one indicator column as a float64 side array, memoized when a cache is attached."""
+        if self.indicator_cache is None:
+            return self._compute_indicator(candles, name, period)
+        # backends agree only to rounding, so their columns are cached apart
+        backend = indicator_backend()
+        return self.indicator_cache.get_or_compute(
+            candles, f"{backend}:{name}", period, lambda: self._compute_indicator(candles, name, period, backend)
+        )
+
+    @staticmethod
+    def _compute_indicator(candles: CandleArrays, name: str, period: int, backend: str | None = None) -> Any:
+        return indicator_array(name, period, candles.close, candles.high, candles.low, backend)
+
+    def _run_loop(
+        self,
+        strategy_settings: StrategySettings,
+        state: BacktestRunState,
+        signals: tuple[Any, Any, Any, Any],
+        open_time: Any,
+        high_low: tuple[Any, Any] | None,
+    ) -> None:
+        """Advance ``state`` over one block of bars with the loop for the configured fill model."""
+        close, ready, long_signal, short_signal = signals
+        # bar open times are only needed to measure the post-exit cooldown
+        times = open_time.tolist() if strategy_settings.cooldown_minutes > 0 else None
+        if high_low is not None:
+            high, low = high_low
+            self._run_intrabar_loop(
+                strategy_settings,
+                state,
+                close.tolist(),
+                high.tolist(),
+                low.tolist(),
+                ready.tolist(),
+                long_signal.tolist(),
+                short_signal.tolist(),
+                times,
+            )
+        else:
+            self._run_array_loop(
+                strategy_settings, state, close.tolist(), ready.tolist(), long_signal.tolist(), short_signal.tolist(), times
+            )
+
+    def _run_array_loop(
+        self,
+        strategy_settings: StrategySettings,
+        state: BacktestRunState,
+        closes: list[float],
+        ready: list[bool],
+        long_signal: list[bool],
+        short_signal: list[bool],
+        times: list[int] | None = None,
+    ) -> None:
+        """Run the DCA/TP/break-even/stop-loss state machine over precomputed per-bar arrays.
+
+        Entry gates and the stop follow ``PairWorker``: no entry within
+        ``cooldown_minutes`` of the last exit (``times`` are bar open times in ms) or
+        within ``anti_reentry_threshold_pct`` of the last exit price, and the stop loss
+        only exists where live places one, on futures with exchange protection orders.
+        """
+        futures = strategy_settings.enable_futures
+        futures_direction = strategy_settings.futures_position_side.upper()
+        step = strategy_settings.safety_step_pct / 100.0
+        tp_pct = strategy_settings.take_profit_pct / 100.0
+        commission_pct = strategy_settings.commission_pct
+        stop_loss_mode, stop_pct = stop_loss_rule(strategy_settings)
+        stop_always = stop_loss_mode == "Always"
+        stop_after_last_safety = stop_loss_mode == "After Last Safety"
+        cooldown_ms = strategy_settings.cooldown_minutes * 60_000.0
+        reentry_pct = strategy_settings.anti_reentry_threshold_pct
+        offset = state.bars
+        last_exit_time = state.last_exit_time
+        last_exit_price = state.last_exit_price
+
+        # entry_bar is relative to this block (negative for a position carried in)
+        position = state.position
+        entry_bar = state.entry_bar - offset
+        trade_results = state.trade_results
+        trade_bars = state.trade_bars
+        exit_bars = state.exit_bars
+        dca_fills = state.dca_fills
+        cancel_event = self.cancel_event
+        check_cancel = cancel_event is not None
+
+        for i, price in enumerate(closes):
+            if check_cancel and not i & CANCEL_CHECK_MASK and cancel_event.is_set():
+                raise BacktestCancelled(f"Backtest cancelled at bar {offset + i}")
+            if not ready[i]:
                 continue
 
             if position is None:
-                self.equity_curve.append(cumulative_pnl)
+                signal = "LONG" if long_signal[i] else "SHORT" if short_signal[i] else None
+                if signal and cooldown_ms > 0 and times[i] - last_exit_time < cooldown_ms:
+                    continue
+                if signal and last_exit_price > 0 and abs(price - last_exit_price) / last_exit_price * 100.0 < reentry_pct:
+                    continue
+                if signal:
+                    position = self.simulate_trade(
+                        direction=(futures_direction if futures else signal),
+                        usdt_amount=strategy_settings.base_order_size_usdt,
+                        price=price,
+                    )
+                    entry_bar = i
                 continue
 
+            is_long = position.direction == "LONG"
+
             # DCA
-            step = strategy_settings.safety_step_pct / 100.0
-            trigger = (
-                price <= position.average_price * (1 - step)
-                if position.direction == "LONG"
-                else price >= position.average_price * (1 + step)
-            )
+            trigger = price <= position.average_price * (1 - step) if is_long else price >= position.average_price * (1 + step)
             if trigger and position.safety_orders_used < strategy_settings.safety_orders_count:
                 next_usdt = position.last_order_usdt * strategy_settings.volume_multiplier
                 added = self.simulate_trade(position.direction, next_usdt, price)
@@ -154,45 +501,189 @@ class BacktestEngine:
                 position.average_price = position.total_cost / max(position.total_qty, 1e-9)
                 position.last_order_usdt = next_usdt
                 position.safety_orders_used += 1
+                dca_fills += 1
+
+            # stop loss, break-even (futures only) and take profit all fill at the close
+            hit = False
+            if stop_always or (
+                stop_after_last_safety
+                and position.safety_orders_used >= strategy_settings.safety_orders_count
+            ):
+                stop = position.average_price * (1 - stop_pct) if is_long else position.average_price * (1 + stop_pct)
+                hit = (price <= stop) if is_long else (price >= stop)
 
-            # break-even (futures only)
-            if strategy_settings.enable_futures and not position.break_even_armed:
+            if not hit and futures and not position.break_even_armed:
                 gain_pct = (
                     (price - position.average_price) / position.average_price * 100.0
-                    if position.direction == "LONG"
+                    if is_long
                     else (position.average_price - price) / position.average_price * 100.0
                 )
                 if gain_pct >= strategy_settings.break_even_after_percent:
                     position.break_even_armed = True
 
-            if strategy_settings.enable_futures and position.break_even_armed:
-                if (position.direction == "LONG" and price <= position.average_price) or (
-                    position.direction == "SHORT" and price >= position.average_price
-                ):
-                    pnl = self._close_position(position, price, strategy_settings.commission_pct)
-                    cumulative_pnl += pnl
-                    self.trade_results.append(pnl)
-                    position = None
-                    self.equity_curve.append(cumulative_pnl)
+            if not hit and futures and position.break_even_armed:
+                hit = (is_long and price <= position.average_price) or (not is_long and price >= position.average_price)
+
+            if not hit:
+                tp = position.average_price * (1 + tp_pct) if is_long else position.average_price * (1 - tp_pct)
+                hit = (price >= tp) if is_long else (price <= tp)
+
+            if hit:
+                trade_results.append(self._close_position(position, price, commission_pct))
+                trade_bars.append(i - entry_bar)
+                exit_bars.append(offset + i)
+                last_exit_time = times[i] if times is not None else 0.0
+                last_exit_price = price
+                position = None
+
+        state.bars = offset + len(closes)
+        state.position = position
+        state.entry_bar = offset + entry_bar
+        state.last_exit_time = last_exit_time
+        state.last_exit_price = last_exit_price
+        state.dca_fills = dca_fills
+
+    def _run_intrabar_loop(
+        self,
+        strategy_settings: StrategySettings,
+        state: BacktestRunState,
+        closes: list[float],
+        highs: list[float],
+        lows: list[float],
+        ready: list[bool],
+        long_signal: list[bool],
+        short_signal: list[bool],
+        times: list[int] | None = None,
+    ) -> None:
+        """``_run_array_loop`` with DCA, break-even, stop and TP levels checked against the bar range.
+
+        Entries still fill at the close. While a position is open each bar is walked
+        open -> first extreme -> second extreme; ``intrabar_order`` "Adverse first" visits
+        the extreme against the position (low for a long) first, "Favorable first" the other.
+        The adverse extreme fills a safety order, then hits an armed break-even stop or
+        the stop loss, the favorable extreme arms break-even and hits take profit. Fills happen at the
+        level price, at most one safety order per bar.
+        """
+        futures = strategy_settings.enable_futures
+        futures_direction = strategy_settings.futures_position_side.upper()
+        step = strategy_settings.safety_step_pct / 100.0
+        tp_pct = strategy_settings.take_profit_pct / 100.0
+        commission_pct = strategy_settings.commission_pct
+        stop_loss_mode, stop_pct = stop_loss_rule(strategy_settings)
+        stop_always = stop_loss_mode == "Always"
+        stop_after_last_safety = stop_loss_mode == "After Last Safety"
+        cooldown_ms = strategy_settings.cooldown_minutes * 60_000.0
+        reentry_pct = strategy_settings.anti_reentry_threshold_pct
+        offset = state.bars
+        last_exit_time = state.last_exit_time
+        last_exit_price = state.last_exit_price
+        phases = (True, False) if strategy_settings.intrabar_order == "Adverse first" else (False, True)
+
+        # entry_bar is relative to this block (negative for a position carried in)
+        position = state.position
+        entry_bar = state.entry_bar - offset
+        trade_results = state.trade_results
+        trade_bars = state.trade_bars
+        exit_bars = state.exit_bars
+        dca_fills = state.dca_fills
+        cancel_event = self.cancel_event
+        check_cancel = cancel_event is not None
+
+        for i, price in enumerate(closes):
+            if check_cancel and not i & CANCEL_CHECK_MASK and cancel_event.is_set():
+                raise BacktestCancelled(f"Backtest cancelled at bar {offset + i}")
+            if not ready[i]:
+                continue
+
+            if position is None:
+                signal = "LONG" if long_signal[i] else "SHORT" if short_signal[i] else None
+                if signal and cooldown_ms > 0 and times[i] - last_exit_time < cooldown_ms:
                     continue
+                if signal and last_exit_price > 0 and abs(price - last_exit_price) / last_exit_price * 100.0 < reentry_pct:
+                    continue
+                if signal:
+                    position = self.simulate_trade(
+                        direction=(futures_direction if futures else signal),
+                        usdt_amount=strategy_settings.base_order_size_usdt,
+                        price=price,
+                    )
+                    entry_bar = i
+                continue
 
-            tp = (
-                position.average_price * (1 + strategy_settings.take_profit_pct / 100.0)
-                if position.direction == "LONG"
-                else position.average_price * (1 - strategy_settings.take_profit_pct / 100.0)
-            )
-            hit_tp = (price >= tp) if position.direction == "LONG" else (price <= tp)
-            if hit_tp:
-                pnl = self._close_position(position, price, strategy_settings.commission_pct)
-                cumulative_pnl += pnl
-                self.trade_results.append(pnl)
+            is_long = position.direction == "LONG"
+            adverse, favorable = (lows[i], highs[i]) if is_long else (highs[i], lows[i])
+            exit_price = None
+            for adverse_phase in phases:
+                if adverse_phase:
+                    if position.safety_orders_used < strategy_settings.safety_orders_count:
+                        level = position.average_price * (1 - step) if is_long else position.average_price * (1 + step)
+                        if (adverse <= level) if is_long else (adverse >= level):
+                            next_usdt = position.last_order_usdt * strategy_settings.volume_multiplier
+                            added = self.simulate_trade(position.direction, next_usdt, level)
+                            position.total_qty += added.total_qty
+                            position.total_cost += added.total_cost
+                            position.average_price = position.total_cost / max(position.total_qty, 1e-9)
+                            position.last_order_usdt = next_usdt
+                            position.safety_orders_used += 1
+                            dca_fills += 1
+                    if futures and position.break_even_armed:
+                        if (adverse <= position.average_price) if is_long else (adverse >= position.average_price):
+                            exit_price = position.average_price
+                            break
+                    if stop_always or (
+                        stop_after_last_safety
+                        and position.safety_orders_used >= strategy_settings.safety_orders_count
+                    ):
+                        stop = position.average_price * (1 - stop_pct) if is_long else position.average_price * (1 + stop_pct)
+                        if (adverse <= stop) if is_long else (adverse >= stop):
+                            exit_price = stop
+                            break
+                else:
+                    if futures and not position.break_even_armed:
+                        gain_pct = (
+                            (favorable - position.average_price) / position.average_price * 100.0
+                            if is_long
+                            else (position.average_price - favorable) / position.average_price * 100.0
+                        )
+                        if gain_pct >= strategy_settings.break_even_after_percent:
+                            position.break_even_armed = True
+                    tp = position.average_price * (1 + tp_pct) if is_long else position.average_price * (1 - tp_pct)
+                    if (favorable >= tp) if is_long else (favorable <= tp):
+                        exit_price = tp
+                        break
+
+            if exit_price is not None:
+                trade_results.append(self._close_position(position, exit_price, commission_pct))
+                trade_bars.append(i - entry_bar)
+                exit_bars.append(offset + i)
+                last_exit_time = times[i] if times is not None else 0.0
+                last_exit_price = exit_price
                 position = None
 
-            self.equity_curve.append(cumulative_pnl)
+        state.bars = offset + len(closes)
+        state.position = position
+        state.entry_bar = offset + entry_bar
+        state.last_exit_time = last_exit_time
+        state.last_exit_price = last_exit_price
+        state.dca_fills = dca_fills
 
-        report = self.generate_report()
-        log(f"Backtest complete: trades={report['total_trades']} profit={report['total_profit']:.4f}")
-        return report
+    def _store_run(self, state: BacktestRunState, keep_equity_curve: bool = True) -> None:
+        bars = state.bars
+        self.equity_curve = []
+        if keep_equity_curve:
+            # equity only moves on exit bars: scatter the trade PnL and accumulate once
+            numpy = importlib.import_module("numpy")
+            equity_curve = numpy.zeros(bars + 1)
+            equity_curve[numpy.asarray(state.exit_bars, dtype=numpy.int64) + 1] = state.trade_results
+            numpy.add.accumulate(equity_curve, out=equity_curve)
+            self.equity_curve = equity_curve
+
+        self.trade_results = state.trade_results
+        self.trade_bars = state.trade_bars
+        self.dca_fills = state.dca_fills
+        open_bars = bars - 1 - state.entry_bar if state.position is not None else 0
+        self.exposure_bars = sum(state.trade_bars) + open_bars
+        self.bars_simulated = bars
 
     def simulate_trade(self, direction: str, usdt_amount: float, price: float) -> BacktestPosition:
         qty = usdt_amount / max(price, 1e-9)
@@ -205,32 +696,50 @@ class BacktestEngine:
         )
 
     def generate_report(self) -> dict[str, float | int]:
-        total = len(self.trade_results)
-        wins = [x for x in self.trade_results if x > 0]
-        losses = [x for x in self.trade_results if x < 0]
-        total_profit = float(sum(self.trade_results))
-        win_rate = (len(wins) / total * 100.0) if total else 0.0
-        avg_profit = (sum(wins) / len(wins)) if wins else 0.0
-        avg_loss = (sum(losses) / len(losses)) if losses else 0.0
-        gross_profit = sum(wins)
-        gross_loss = abs(sum(losses))
-        profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else 0.0
-
-        max_dd = 0.0
-        peak = float("-inf")
-        for equity in self.equity_curve:
-            peak = max(peak, equity)
-            drawdown = peak - equity
-            max_dd = max(max_dd, drawdown)
+        """Summarize the last run from its trade list; cost is O(trades), not O(bars).
+
+        Realized equity only changes on exits, so drawdown is taken over the per-trade
+        running PnL. Sums are sequential (``add.accumulate``) to match the batch kernel
+        bit for bit. Sharpe and Sortino are per trade and not annualized.
+        """
+        numpy = importlib.import_module("numpy")
+        results = numpy.asarray(self.trade_results, dtype=numpy.float64)
+        total = int(results.shape[0])
+        wins = results[results > 0]
+        losses = results[results < 0]
+        gross_profit = _sequential_sum(wins)
+        loss_sum = _sequential_sum(losses)
+        gross_loss = abs(loss_sum)
+
+        running = numpy.add.accumulate(results)
+        total_profit = float(running[-1]) if total else 0.0
+        peak = numpy.maximum.accumulate(running)
+        numpy.maximum(peak, 0.0, out=peak)
+        max_dd = float((peak - running).max()) if total else 0.0
+
+        sharpe = sortino = 0.0
+        if total:
+            mean = total_profit / total
+            deviation = results - results[0]
+            variance = trade_variance(mean, _sequential_sum(deviation), _sequential_sum(deviation * deviation), total)
+            downside = _sequential_sum(losses * losses) / total
+            sharpe = mean / variance**0.5 if variance > 0 else 0.0
+            sortino = mean / downside**0.5 if downside > 0 else 0.0
 
+        bars = self.bars_simulated
         return {
             "total_trades": total,
-            "win_rate": win_rate,
+            "win_rate": (wins.shape[0] / total * 100.0) if total else 0.0,
             "total_profit": total_profit,
             "max_drawdown": max_dd,
-            "average_profit": avg_profit,
-            "average_loss": avg_loss,
-            "profit_factor": profit_factor,
+            "average_profit": (gross_profit / wins.shape[0]) if wins.shape[0] else 0.0,
+            "average_loss": (loss_sum / losses.shape[0]) if losses.shape[0] else 0.0,
+            "profit_factor": (gross_profit / gross_loss) if gross_loss > 0 else 0.0,
+            "sharpe_ratio": sharpe,
+            "sortino_ratio": sortino,
+            "exposure_pct": (self.exposure_bars / bars * 100.0) if bars else 0.0,
+            "average_trade_bars": (sum(self.trade_bars) / len(self.trade_bars)) if self.trade_bars else 0.0,
+            "dca_fills": int(self.dca_fills),
         }
 
     def _close_position(self, position: BacktestPosition, exit_price: float, commission_pct: float) -> float:
@@ -241,3 +750,23 @@ class BacktestEngine:
         else:
             gross = qty * (2 * position.average_price - exit_price)
         return (gross - commission) - position.total_cost
+
+
+def _sequential_sum(values: Any) -> float:
+    """Left-to-right float sum, the same order as a running Python or per-slot kernel total."""
+    if not values.shape[0]:
+        return 0.0
+    return float(importlib.import_module("numpy").add.accumulate(values)[-1])
+
+
+def stream_warmup_bars(settings: StrategySettings) -> int:
+    """Candles a streaming chunk re-reads before its first bar so indicators match a whole-history run."""
+    # ADX smooths the already smoothed directional index a second time
+    periods = [2 * period if name == "adx" else period for name, period in condition_indicators(settings)]
+    return max(STREAM_WARMUP_PERIODS * max(periods, default=0), condition_lookback(settings))
+
+
+def _date_range_ms(start_date: str, end_date: str) -> tuple[int, int]:
+    start_ms = int(datetime.fromisoformat(start_date).replace(tzinfo=timezone.utc).timestamp() * 1000)
+    end_ms = int(datetime.fromisoformat(end_date).replace(tzinfo=timezone.utc).timestamp() * 1000)
+    return start_ms, end_ms
@@ -0,0 +1,339 @@
+"""Vectorized backtest kernel simulating many exit/DCA parameter sets in one pass."""
+
+from __future__ import annotations
+
+import importlib
+from dataclasses import astuple, fields
+from typing import Any
+
+from core.cancellation import CANCEL_CHECK_MASK, BacktestCancelled, CancelEvent
+from strategy.base_strategy import StrategySettings
+
+# parameters that only shape exits, DCA fills and position size; everything else drives entries
+EXIT_PARAMETERS = frozenset(
+    {
+        "take_profit_pct",
+        "safety_step_pct",
+        "volume_multiplier",
+        "safety_orders_count",
+        "break_even_after_percent",
+        "base_order_size_usdt",
+        "commission_pct",
+        "stop_loss_pct",
+    }
+)
+
+# a trade PnL variance below this fraction of mean**2 is rounding noise between equal trades
+# (about 1e-24 and less; a real spread that small would mean a Sharpe ratio beyond 1e10)
+VARIANCE_EPSILON = 1e-20
+
+
+def trade_variance(mean: float, deviation_sum: float, deviation_squares: float, total: int) -> float:
+    """Population variance of trade PnLs from sums of their deviations from the first trade.
+
+    Shifting by the first PnL avoids the cancellation of ``E[x**2] - mean**2`` when
+    every trade makes about the same amount (fixed-size, take-profit-only runs).
+    """
+    shifted_mean = deviation_sum / total
+    variance = deviation_squares / total - shifted_mean * shifted_mean
+    return variance if variance > VARIANCE_EPSILON * mean * mean else 0.0
+
+
+def entry_parameters_key(settings: StrategySettings) -> tuple[Any, ...]:
+    """Settings values that must be shared by every parameter set of one batch."""
+    values = astuple(settings)
+    return tuple(value for field, value in zip(fields(settings), values, strict=True) if field.name not in EXIT_PARAMETERS)
+
+
+def stop_loss_rule(settings: StrategySettings) -> tuple[str, float]:
+    """Stop-loss mode in effect for a backtest and its distance as a fraction.
+
+    Live trading only places a stop as an exchange protection order on futures,
+    so backtests simulate one under the same conditions and "Off" elsewhere.
+    """
+    if not (settings.enable_futures and settings.protection_orders_on_exchange):
+        return "Off", 0.0
+    return settings.stop_loss_mode, settings.stop_loss_pct / 100.0
+
+
+def simulate_exit_grid(
+    close: Any,
+    ready: Any,
+    long_signal: Any,
+    short_signal: Any,
+    settings_list: list[StrategySettings],
+    cancel_event: CancelEvent | None = None,
+    high: Any | None = None,
+    low: Any | None = None,
+    open_time: Any | None = None,
+) -> list[dict[str, float | int]]:
+    """Run the DCA/TP/break-even/stop-loss state machine for K settings at once.
+
+    Position state is held as length-K arrays and every bar updates all of them
+    with masked ufuncs. Float operations follow ``BacktestEngine._run_array_loop``
+    step by step, so each report equals the one ``run_backtest`` produces.
+    A set ``cancel_event`` raises ``BacktestCancelled`` at the next bar chunk.
+    With ``backtest_fill_model = "Intrabar"`` the ``high``/``low`` arrays are required
+    and levels follow ``BacktestEngine._run_intrabar_loop`` instead. ``open_time``
+    (bar open times in ms) is required when ``cooldown_minutes`` is set.
+    """
+    numpy = importlib.import_module("numpy")
+    count = len(settings_list)
+    base = settings_list[0]
+    futures = base.enable_futures
+    futures_long = base.futures_position_side.upper() == "LONG"
+
+    def _param(getter: Any) -> Any:
+        return numpy.array([getter(settings) for settings in settings_list], dtype=numpy.float64)
+
+    tp_pct = _param(lambda s: s.take_profit_pct / 100.0)
+    tp_up, tp_down = 1 + tp_pct, 1 - tp_pct
+    step = _param(lambda s: s.safety_step_pct / 100.0)
+    step_down, step_up = 1 - step, 1 + step
+    volume_multiplier = _param(lambda s: s.volume_multiplier)
+    safety_count = _param(lambda s: s.safety_orders_count)
+    break_even_pct = _param(lambda s: s.break_even_after_percent)
+    base_usdt = _param(lambda s: s.base_order_size_usdt)
+    commission_rate = _param(lambda s: s.commission_pct / 100.0)
+    stop_loss_mode = stop_loss_rule(base)[0]
+    stop_enabled = stop_loss_mode in ("Always", "After Last Safety")
+    stop_always = stop_loss_mode == "Always"
+    stop_pct = _param(lambda s: stop_loss_rule(s)[1])
+    stop_down, stop_up = 1 - stop_pct, 1 + stop_pct
+    cooldown_ms = base.cooldown_minutes * 60_000.0
+    reentry_pct = base.anti_reentry_threshold_pct
+
+    in_pos = numpy.zeros(count, dtype=bool)
+    is_long = numpy.zeros(count, dtype=bool)
+    armed = numpy.zeros(count, dtype=bool)
+    total_qty = numpy.zeros(count)
+    total_cost = numpy.zeros(count)
+    average = numpy.zeros(count)
+    last_usdt = numpy.zeros(count)
+    safety_used = numpy.zeros(count)
+
+    # Trigger levels are cached per parameter set and refreshed only when a position changes.
+    # They are stored multiplied by ``sign`` (+1 long, -1 short; negation is exact), so one
+    # comparison against ``sign * price`` covers both directions. Idle slots hold -inf/+inf.
+    sign = numpy.ones(count)
+    dca_key = numpy.full(count, -numpy.inf)
+    tp_key = numpy.full(count, numpy.inf)
+    be_key = numpy.full(count, -numpy.inf)
+    sl_key = numpy.full(count, -numpy.inf)
+    last_exit_time = numpy.full(count, -numpy.inf)
+    last_exit_price = numpy.zeros(count)
+
+    cumulative = numpy.zeros(count)
+    peak = numpy.zeros(count)
+    max_dd = numpy.zeros(count)
+    trades = numpy.zeros(count, dtype=numpy.int64)
+    wins = numpy.zeros(count, dtype=numpy.int64)
+    losses = numpy.zeros(count, dtype=numpy.int64)
+    gross_win = numpy.zeros(count)
+    gross_loss = numpy.zeros(count)
+    # first trade PnL per set and the running sums of deviations from it, for the variance
+    pnl_shift = numpy.zeros(count)
+    pnl_deviation = numpy.zeros(count)
+    pnl_deviation_sq = numpy.zeros(count)
+    loss_sq = numpy.zeros(count)
+    entry_bar = numpy.zeros(count, dtype=numpy.int64)
+    held_bars = numpy.zeros(count, dtype=numpy.int64)
+    dca_fills = numpy.zeros(count, dtype=numpy.int64)
+
+    def _refresh_levels(mask: Any) -> None:
+        dca_level = numpy.where(is_long, average * step_down, average * step_up)
+        dca_level = numpy.where(safety_used < safety_count, sign * dca_level, -numpy.inf)
+        numpy.copyto(dca_key, dca_level, where=mask)
+        numpy.copyto(tp_key, sign * numpy.where(is_long, average * tp_up, average * tp_down), where=mask)
+        numpy.copyto(be_key, sign * average, where=mask & armed)
+        if stop_enabled:
+            active = (safety_used >= safety_count) | stop_always
+            stop_level = numpy.where(is_long, average * stop_down, average * stop_up)
+            numpy.copyto(sl_key, numpy.where(active, sign * stop_level, -numpy.inf), where=mask)
+
+    def _fill_safety(trigger: Any, fill_price: Any) -> None:
+        next_usdt = last_usdt * volume_multiplier
+        added_qty = next_usdt / numpy.maximum(fill_price, 1e-9)
+        numpy.add(total_qty, added_qty, out=total_qty, where=trigger)
+        numpy.add(total_cost, added_qty * fill_price, out=total_cost, where=trigger)
+        numpy.copyto(average, total_cost / numpy.maximum(total_qty, 1e-9), where=trigger)
+        numpy.copyto(last_usdt, next_usdt, where=trigger)
+        numpy.add(safety_used, trigger, out=safety_used)
+        numpy.add(dca_fills, trigger, out=dca_fills)
+        _refresh_levels(trigger)
+
+    def _arm(price: float) -> None:
+        gain = (price - average) / average * 100.0 if futures_long else (average - price) / average * 100.0
+        arm = in_pos & ~armed & (gain >= break_even_pct)
+        if arm.any():
+            numpy.logical_or(armed, arm, out=armed)
+            numpy.copyto(be_key, sign * average, where=arm)
+
+    def _close_slots(exits: Any, exit_price: Any, bar: int) -> int:
+        commission = commission_rate * total_qty * exit_price
+        gross = numpy.where(is_long, total_qty * exit_price, total_qty * (2 * average - exit_price))
+        pnl = (gross - commission) - total_cost
+        numpy.add(cumulative, pnl, out=cumulative, where=exits)
+        numpy.maximum(peak, cumulative, out=peak, where=exits)
+        numpy.maximum(max_dd, peak - cumulative, out=max_dd, where=exits)
+        numpy.copyto(pnl_shift, pnl, where=exits & (trades == 0))
+        numpy.add(trades, exits, out=trades)
+        won = exits & (pnl > 0)
+        lost = exits & (pnl < 0)
+        numpy.add(wins, won, out=wins)
+        numpy.add(losses, lost, out=losses)
+        numpy.add(gross_win, pnl, out=gross_win, where=won)
+        numpy.add(gross_loss, pnl, out=gross_loss, where=lost)
+        deviation = pnl - pnl_shift
+        numpy.add(pnl_deviation, deviation, out=pnl_deviation, where=exits)
+        numpy.add(pnl_deviation_sq, deviation * deviation, out=pnl_deviation_sq, where=exits)
+        numpy.add(loss_sq, pnl * pnl, out=loss_sq, where=lost)
+        numpy.add(held_bars, bar - entry_bar, out=held_bars, where=exits)
+
+        numpy.logical_and(in_pos, ~exits, out=in_pos)
+        numpy.logical_and(armed, ~exits, out=armed)
+        numpy.copyto(dca_key, -numpy.inf, where=exits)
+        numpy.copyto(tp_key, numpy.inf, where=exits)
+        numpy.copyto(be_key, -numpy.inf, where=exits)
+        numpy.copyto(sl_key, -numpy.inf, where=exits)
+        numpy.copyto(last_exit_price, exit_price, where=exits)
+        if times is not None:
+            numpy.copyto(last_exit_time, times[bar], where=exits)
+        return int(exits.sum())
+
+    closes = close.tolist()
+    ready_list = ready.tolist()
+    long_list = long_signal.tolist()
+    short_list = short_signal.tolist()
+    intrabar = base.backtest_fill_model == "Intrabar"
+    if intrabar:
+        if high is None or low is None:
+            raise ValueError("Intrabar fills require high and low prices")
+        highs = high.tolist()
+        lows = low.tolist()
+        phases = (True, False) if base.intrabar_order == "Adverse first" else (False, True)
+    times = None
+    if cooldown_ms > 0:
+        if open_time is None:
+            raise ValueError("Entry cooldown requires bar open times")
+        times = open_time.tolist()
+    open_count = 0
+    check_cancel = cancel_event is not None
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        for i, price in enumerate(closes):
+            if check_cancel and not i & CANCEL_CHECK_MASK and cancel_event.is_set():
+                raise BacktestCancelled(f"Batched backtest cancelled at bar {i}")
+            if not ready_list[i]:
+                continue
+            signal_long = long_list[i]
+            signal_short = short_list[i]
+            if open_count == 0 and not (signal_long or signal_short):
+                continue
+
+            entering = None
+            if signal_long or signal_short:
+                entering = ~in_pos
+                if times is not None:
+                    entering &= times[i] - last_exit_time >= cooldown_ms
+                if reentry_pct > 0:
+                    moved = numpy.abs(price - last_exit_price) / last_exit_price * 100.0
+                    entering &= ~((last_exit_price > 0) & (moved < reentry_pct))
+
+            if open_count and intrabar:
+                low_price = lows[i]
+                high_price = highs[i]
+                # per-slot extremes, pre-multiplied by ``sign`` like the level keys
+                signed_adverse = numpy.where(is_long, low_price, -high_price)
+                signed_favorable = numpy.where(is_long, high_price, -low_price)
+                for adverse_phase in phases:
+                    if not open_count:
+                        break
+                    if adverse_phase:
+                        trigger = signed_adverse <= dca_key
+                        if trigger.any():
+                            _fill_safety(trigger, sign * dca_key)
+                        if futures:
+                            exits = signed_adverse <= be_key
+                            if exits.any():
+                                open_count -= _close_slots(exits, average, i)
+                        if stop_enabled:
+                            exits = signed_adverse <= sl_key
+                            if exits.any():
+                                open_count -= _close_slots(exits, sign * sl_key, i)
+                    else:
+                        if futures:
+                            _arm(high_price if futures_long else low_price)
+                        exits = signed_favorable >= tp_key
+                        if exits.any():
+                            open_count -= _close_slots(exits, sign * tp_key, i)
+            elif open_count:
+                signed_price = sign * price
+
+                # DCA
+                trigger = signed_price <= dca_key
+                if trigger.any():
+                    _fill_safety(trigger, price)
+
+                # stop loss, break-even (futures only, every open slot shares the configured side), TP
+                if futures:
+                    _arm(price)
+                    exits = signed_price <= be_key
+                    exits |= signed_price >= tp_key
+                else:
+                    exits = signed_price >= tp_key
+                if stop_enabled:
+                    exits |= signed_price <= sl_key
+
+                if exits.any():
+                    open_count -= _close_slots(exits, price, i)
+            if entering is not None and entering.any():
+                direction_long = futures_long if futures else signal_long
+                qty = base_usdt / max(price, 1e-9)
+                numpy.copyto(total_qty, qty, where=entering)
+                numpy.copyto(total_cost, qty * price, where=entering)
+                numpy.copyto(average, price, where=entering)
+                numpy.copyto(last_usdt, base_usdt, where=entering)
+                numpy.copyto(safety_used, 0.0, where=entering)
+                numpy.copyto(entry_bar, i, where=entering)
+                numpy.copyto(is_long, direction_long, where=entering)
+                numpy.copyto(sign, 1.0 if direction_long else -1.0, where=entering)
+                armed &= ~entering
+                in_pos |= entering
+                _refresh_levels(entering)
+                open_count += int(entering.sum())
+
+    bars = len(closes)
+    exposure = held_bars + numpy.where(in_pos, bars - 1 - entry_bar, 0)
+
+    reports: list[dict[str, float | int]] = []
+    for k in range(count):
+        total = int(trades[k])
+        win_count = int(wins[k])
+        loss_count = int(losses[k])
+        gross_profit = float(gross_win[k]) if win_count else 0
+        gross_loss_abs = abs(float(gross_loss[k])) if loss_count else 0
+        sharpe = sortino = 0.0
+        if total:
+            mean = float(cumulative[k]) / total
+            variance = trade_variance(mean, float(pnl_deviation[k]), float(pnl_deviation_sq[k]), total)
+            downside = float(loss_sq[k]) / total
+            sharpe = mean / variance**0.5 if variance > 0 else 0.0
+            sortino = mean / downside**0.5 if downside > 0 else 0.0
+        reports.append(
+            {
+                "total_trades": total,
+                "win_rate": (win_count / total * 100.0) if total else 0.0,
+                "total_profit": float(cumulative[k]),
+                "max_drawdown": float(max_dd[k]),
+                "average_profit": (float(gross_win[k]) / win_count) if win_count else 0.0,
+                "average_loss": (float(gross_loss[k]) / loss_count) if loss_count else 0.0,
+                "profit_factor": (gross_profit / gross_loss_abs) if gross_loss_abs > 0 else 0.0,
+                "sharpe_ratio": sharpe,
+                "sortino_ratio": sortino,
+                "exposure_pct": (int(exposure[k]) / bars * 100.0) if bars else 0.0,
+                "average_trade_bars": (int(held_bars[k]) / total) if total else 0.0,
+                "dca_fills": int(dca_fills[k]),
+            }
+        )
+    return reports
@@ -3,17 +3,26 @@
 from __future__ import annotations
 
 import asyncio
+import tempfile
 import traceback
 from copy import deepcopy
 from dataclasses import asdict
+from itertools import accumulate
 from typing import Any
 from collections.abc import Callable
 
 from core.backtest_engine import BacktestEngine
-from core.optimizer import StrategyOptimizer
+from core.kline_fetcher import KlineFetcher
+from core.kline_store import KlineStore
+from core.monte_carlo import monte_carlo_report
+from core.optimizer import OptimizerProgress, StrategyOptimizer
+from core.optimizer_store import OptimizerStore
 from core.order_manager import OrderManager
 from core.pair_manager import PairWorker
+from core.portfolio_backtest import DEFAULT_INITIAL_BALANCE, DEFAULT_MEMORY_BUDGET_MB, simulate_portfolio
 from core.risk_manager import RiskManager
+from core.search_strategies import SEARCH_STRATEGIES
+from core.signal_engine import SignalEngine
 from core.state_store import StateStore
 from core.websocket_manager import WebSocketManager
 from exchanges.base_exchange import BaseExchange
@@ -32,11 +41,21 @@ class BotManager:
         self.loop = loop
         self.pairs: dict[str, PairWorker] = {}
         self.tasks: dict[str, asyncio.Task] = {}
+        # one batched signal evaluation per candle close across all pairs
+        self.signal_engine = SignalEngine(self.pairs)
         self.websocket_manager = WebSocketManager()
         self.order_manager = OrderManager(self.websocket_manager.prices)
         self.risk_manager = RiskManager()
-        self.backtest_engine = BacktestEngine()
-        self.optimizer = StrategyOptimizer()
+        self.kline_store = KlineStore("klines.db")
+        self.kline_fetcher = KlineFetcher()
+        self.backtest_engine = BacktestEngine(kline_store=self.kline_store, kline_fetcher=self.kline_fetcher)
+        self.optimizer_store = OptimizerStore("optimizer.db")
+        self.optimizer = StrategyOptimizer(
+            kline_store=self.kline_store,
+            kline_fetcher=self.kline_fetcher,
+            result_store=self.optimizer_store,
+        )
+        self.optimizer_top_k = 100
         self.strategy_settings = StrategySettings()
         self.pair_settings: dict[str, StrategySettings] = {}
         self._price_callback: Callable[[str, float], None] | None = None
@@ -222,11 +241,62 @@ class BotManager:
         start_date: str,
         end_date: str,
         settings: StrategySettings,
+        chunk_bars: int | None = None,
     ) -> tuple[dict[str, float | int], list[float]]:
+        """Backtest one pair; ``chunk_bars`` streams the history from the kline store in chunks.
+
+        A streamed run returns the equity after each trade instead of after each bar,
+        so memory follows the chunk size and trade count rather than the history length.
+        """
+        if chunk_bars:
+            report = await self.backtest_engine.run_backtest_from_store(
+                pair, timeframe, start_date, end_date, settings, chunk_bars=chunk_bars, keep_equity_curve=False
+            )
+            return report, list(accumulate(self.backtest_engine.trade_results, initial=0.0))
         await self.backtest_engine.load_historical_data(pair, timeframe, start_date, end_date)
         report = self.backtest_engine.run_backtest(settings)
         return report, list(self.backtest_engine.equity_curve)
 
+    async def run_monte_carlo(
+        self,
+        paths: int = 10_000,
+        method: str = "bootstrap",
+        seed: int | None = None,
+    ) -> dict[str, Any]:
+        """Resample the trades of the last backtest; see ``core.monte_carlo.monte_carlo_report``."""
+        trades = list(self.backtest_engine.trade_results)
+        return await asyncio.to_thread(monte_carlo_report, trades, paths, method, seed)
+
+    async def run_portfolio_backtest(
+        self,
+        pairs: list[str],
+        timeframe: str,
+        start_date: str,
+        end_date: str,
+        settings: StrategySettings | None = None,
+        initial_balance: float = DEFAULT_INITIAL_BALANCE,
+        memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+    ) -> dict[str, Any]:
+        """Backtest ``pairs`` on one account; see ``core.portfolio_backtest.simulate_portfolio``.
+
+        Without ``settings`` every pair uses its own strategy settings. Candles are
+        spooled to temporary candle files and memory-mapped, so only one pair's
+        history is held in memory at a time.
+        """
+        symbols = [pair.upper() for pair in pairs]
+        pair_settings = settings or {symbol: self.get_pair_strategy_settings(symbol) for symbol in symbols}
+        with tempfile.TemporaryDirectory(prefix="portfolio_", ignore_cleanup_errors=True) as directory:
+            candles = {}
+            for symbol in symbols:
+                engine = BacktestEngine(kline_store=self.kline_store, kline_fetcher=self.kline_fetcher)
+                await engine.load_historical_data(symbol, timeframe, start_date, end_date)
+                path = f"{directory}/{symbol}.candles"
+                engine.save_candle_file(path)
+                candles[symbol] = engine.load_candle_file(path)
+            return await asyncio.to_thread(
+                simulate_portfolio, candles, pair_settings, initial_balance, memory_budget_mb
+            )
+
     async def run_optimization(
         self,
         pair: str,
@@ -235,15 +305,78 @@ class BotManager:
         end_date: str,
         parameter_ranges: dict[str, list[float | int]],
         base_settings: StrategySettings,
+        mode: str = "grid",
+        budget: int = 500,
+        seed: int = 0,
+        on_progress: Callable[[OptimizerProgress], None] | None = None,
+        max_seconds: float | None = None,
     ) -> list[dict[str, float | int | dict]]:
+        if mode in SEARCH_STRATEGIES:
+            return await self.optimizer.run_search(
+                symbol=pair,
+                timeframe=timeframe,
+                date_range=(start_date, end_date),
+                parameter_ranges=parameter_ranges,
+                base_settings=base_settings,
+                strategy=mode,
+                budget=budget,
+                seed=seed,
+                on_progress=on_progress,
+                max_seconds=max_seconds,
+            )
+        if mode == "halving":
+            return await self.optimizer.run_successive_halving(
+                symbol=pair,
+                timeframe=timeframe,
+                date_range=(start_date, end_date),
+                parameter_ranges=parameter_ranges,
+                base_settings=base_settings,
+                on_progress=on_progress,
+                max_seconds=max_seconds,
+            )
         return await self.optimizer.run_grid_search(
             symbol=pair,
             timeframe=timeframe,
             date_range=(start_date, end_date),
             parameter_ranges=parameter_ranges,
             base_settings=base_settings,
+            top_k=self.optimizer_top_k,
+            on_progress=on_progress,
+            max_seconds=max_seconds,
+        )
+
+    async def run_walk_forward(
+        self,
+        pair: str,
+        timeframe: str,
+        start_date: str,
+        end_date: str,
+        parameter_ranges: dict[str, list[float | int]],
+        base_settings: StrategySettings,
+        train_bars: int,
+        test_bars: int,
+        max_seconds: float | None = None,
+    ) -> dict[str, Any]:
+        return await self.optimizer.run_walk_forward(
+            symbol=pair,
+            timeframe=timeframe,
+            date_range=(start_date, end_date),
+            parameter_ranges=parameter_ranges,
+            base_settings=base_settings,
+            train_bars=train_bars,
+            test_bars=test_bars,
+            max_seconds=max_seconds,
         )
 
+    def stop_optimization(self) -> None:
+        self.optimizer.cancel()
+
+    async def list_optimization_runs(self) -> list[dict[str, Any]]:
+        return await self.optimizer.list_runs()
+
+    async def load_optimization_run(self, run_id: str) -> list[dict[str, float | int | dict]]:
+        return await self.optimizer.load_run(run_id)
+
     async def stop_all_pairs(self) -> None:
         for pair_name in list(self.tasks.keys()):
             await self.stop_pair(pair_name)
@@ -284,6 +417,7 @@ class BotManager:
                 self._price_callback,
                 self.get_total_open_exposure_usdt,
                 self.schedule_runtime_save,
+                self.signal_engine,
             )
             if exchange_name == "Binance":
                 self._spawn_background(
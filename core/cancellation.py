@@ -0,0 +1,19 @@
+"""Cooperative cancellation shared by backtests and optimizer runs."""
+
+from __future__ import annotations
+
+from typing import Protocol
+
+# backtest loops poll the cancel flag once per this many bars (power of two, checked with a mask)
+CANCEL_CHECK_BARS = 4096
+CANCEL_CHECK_MASK = CANCEL_CHECK_BARS - 1
+
+
+class CancelEvent(Protocol):
+    """Anything with ``is_set`` - ``threading.Event`` or a ``multiprocessing`` event for pool workers."""
+
+    def is_set(self) -> bool: ...
+
+
+class BacktestCancelled(RuntimeError):
+    """Raised when a backtest is stopped at a bar-chunk boundary; its partial state is discarded."""
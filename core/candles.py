@@ -0,0 +1,158 @@
+"""Columnar OHLCV candle arrays and a compact memory-mapped file format for them."""
+
+from __future__ import annotations
+
+import importlib
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# header: magic, format version, bytes per price value, reserved, row count (padded to 64 bytes)
+_HEADER = struct.Struct("<8sHHIQ")
+_HEADER_SIZE = 64
+_MAGIC = b"BUCNDL01"
+_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CandleArrays:
+    """OHLCV history as contiguous NumPy columns (open_time in epoch milliseconds)."""
+
+    open_time: Any
+    open: Any
+    high: Any
+    low: Any
+    close: Any
+    volume: Any
+
+    def __len__(self) -> int:
+        return int(self.close.shape[0])
+
+    @classmethod
+    def from_rows(cls, rows: list[Any], dtype: str = "float64") -> CandleArrays:
+        """Build arrays straight from kline rows ``[open_time, open, high, low, close, volume, ...]``.
+
+        Values may be numbers or Binance's numeric strings. Rows with a missing or
+        unparsable price are dropped, like the previous ``to_numeric`` + ``dropna`` path.
+        """
+        numpy = importlib.import_module("numpy")
+        if not rows:
+            return cls.empty(dtype)
+
+        open_time = numpy.fromiter((int(row[0]) for row in rows), dtype=numpy.int64, count=len(rows))
+        try:
+            prices = numpy.array([row[1:6] for row in rows], dtype=numpy.float64)
+        except (TypeError, ValueError):
+            prices = numpy.array([[_to_float(value) for value in row[1:6]] for row in rows], dtype=numpy.float64)
+
+        valid = numpy.isfinite(prices).all(axis=1)
+        if not valid.all():
+            open_time = open_time[valid]
+            prices = prices[valid]
+        columns = [numpy.ascontiguousarray(prices[:, i], dtype=dtype) for i in range(len(PRICE_COLUMNS))]
+        return cls(open_time, *columns)
+
+    @classmethod
+    def from_dataframe(cls, dataframe: Any) -> CandleArrays:
+        """Wrap DataFrame columns without copying when they are already float64."""
+        numpy = importlib.import_module("numpy")
+        columns = [dataframe[name].to_numpy(dtype=numpy.float64) for name in PRICE_COLUMNS]
+        if "open_time" in dataframe.columns:
+            open_time = dataframe["open_time"]
+            if hasattr(open_time, "dt"):
+                open_time = open_time.to_numpy(dtype="datetime64[ms]").view(numpy.int64)
+            else:
+                open_time = open_time.to_numpy(dtype=numpy.int64)
+        else:
+            open_time = numpy.arange(len(dataframe.index), dtype=numpy.int64)
+        return cls(open_time, *columns)
+
+    @classmethod
+    def empty(cls, dtype: str = "float64") -> CandleArrays:
+        numpy = importlib.import_module("numpy")
+        return cls(numpy.empty(0, dtype=numpy.int64), *(numpy.empty(0, dtype=dtype) for _ in PRICE_COLUMNS))
+
+    @classmethod
+    def concatenate(cls, parts: tuple[CandleArrays, ...] | list[CandleArrays]) -> CandleArrays:
+        """Join consecutive histories into new contiguous arrays (a single part is copied)."""
+        numpy = importlib.import_module("numpy")
+        columns = [numpy.concatenate([getattr(part, name) for part in parts]) for name in ("open_time", *PRICE_COLUMNS)]
+        return cls(*columns)
+
+    def readonly(self) -> CandleArrays:
+        """Return views of the same memory that refuse writes, safe to share across evaluations."""
+        views = []
+        for name in ("open_time", *PRICE_COLUMNS):
+            view = getattr(self, name).view()
+            view.flags.writeable = False
+            views.append(view)
+        return CandleArrays(*views)
+
+    def slice(self, start: int | None = None, stop: int | None = None) -> CandleArrays:
+        """Return a view over rows [start, stop) sharing the same memory."""
+        window = slice(start, stop)
+        return CandleArrays(
+            self.open_time[window],
+            self.open[window],
+            self.high[window],
+            self.low[window],
+            self.close[window],
+            self.volume[window],
+        )
+
+    def to_dataframe(self) -> Any:
+        """Build a pandas DataFrame over the arrays (price columns are not copied)."""
+        pandas = importlib.import_module("pandas")
+        data = {"open_time": pandas.to_datetime(self.open_time, unit="ms", utc=True)}
+        data.update({name: getattr(self, name) for name in PRICE_COLUMNS})
+        return pandas.DataFrame(data, copy=False)
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def write_candle_file(path: str | Path, candles: CandleArrays, dtype: str = "float64") -> None:
+    """Write candles as int64 open_time followed by five float32/float64 price columns."""
+    numpy = importlib.import_module("numpy")
+    item_size = numpy.dtype(dtype).itemsize
+    if item_size not in (4, 8):
+        raise ValueError(f"Unsupported candle dtype: {dtype}")
+
+    rows = len(candles)
+    header = _HEADER.pack(_MAGIC, _VERSION, item_size, 0, rows).ljust(_HEADER_SIZE, b"\0")
+    target = Path(path)
+    tmp_path = target.with_suffix(target.suffix + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(header)
+        handle.write(numpy.ascontiguousarray(candles.open_time, dtype="<i8").tobytes())
+        for name in PRICE_COLUMNS:
+            handle.write(numpy.ascontiguousarray(getattr(candles, name), dtype=f"<f{item_size}").tobytes())
+    tmp_path.replace(target)
+
+
+def open_candle_file(path: str | Path) -> CandleArrays:
+    """Memory-map a candle file read-only; the OS page cache is shared between processes."""
+    numpy = importlib.import_module("numpy")
+    with open(path, "rb") as handle:
+        magic, version, item_size, _, rows = _HEADER.unpack(handle.read(_HEADER.size))
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"Not a candle file: {path}")
+
+    if rows == 0:
+        return CandleArrays.empty(f"<f{item_size}")
+    buffer = numpy.memmap(path, dtype=numpy.uint8, mode="r")
+    offset = _HEADER_SIZE
+    open_time = buffer[offset : offset + rows * 8].view("<i8")
+    offset += rows * 8
+    columns = []
+    for _ in PRICE_COLUMNS:
+        columns.append(buffer[offset : offset + rows * item_size].view(f"<f{item_size}"))
+        offset += rows * item_size
+    return CandleArrays(open_time, *columns)
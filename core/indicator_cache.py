@@ -0,0 +1,95 @@
+"""Thread-safe memo of indicator arrays shared across backtest evaluations."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from core.candles import PRICE_COLUMNS, CandleArrays
+
+
+def candles_fingerprint(candles: CandleArrays) -> str:
+    """Content hash of the candle columns, so equal histories share cache entries."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(len(candles).to_bytes(8, "little"))
+    for name in ("open_time", *PRICE_COLUMNS):
+        column = getattr(candles, name)
+        digest.update(str(column.dtype).encode())
+        digest.update(memoryview(column if column.flags.c_contiguous else column.copy()).cast("B"))
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """Memoizes indicator arrays keyed by (indicator, period, data fingerprint).
+
+    Concurrent callers asking for the same key wait for the first computation
+    instead of repeating it, so each key is computed exactly once while cached.
+    Histories are only weakly referenced: the cache never keeps candles alive.
+    """
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._values: OrderedDict[tuple[str, int, str], Any] = OrderedDict()
+        self._pending: dict[tuple[str, int, str], threading.Event] = {}
+        # id(candles) -> (weak reference, fingerprint); the reference guards against id reuse
+        self._fingerprints: dict[int, tuple[weakref.ref[CandleArrays], str]] = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, candles: CandleArrays) -> str:
+        with self._lock:
+            known = self._fingerprints.get(id(candles))
+            if known is not None and known[0]() is candles:
+                return known[1]
+        value = candles_fingerprint(candles)
+        with self._lock:
+            if len(self._fingerprints) >= self.max_entries:
+                self._fingerprints = {key: entry for key, entry in self._fingerprints.items() if entry[0]() is not None}
+                if len(self._fingerprints) >= self.max_entries:
+                    self._fingerprints.clear()
+            self._fingerprints[id(candles)] = (weakref.ref(candles), value)
+        return value
+
+    def get_or_compute(self, candles: CandleArrays, name: str, period: int, compute: Callable[[], Any]) -> Any:
+        key = (name, int(period), self.fingerprint(candles))
+        while True:
+            with self._lock:
+                if key in self._values:
+                    self.hits += 1
+                    self._values.move_to_end(key)
+                    return self._values[key]
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = threading.Event()
+                    self._pending[key] = pending
+                    self.misses += 1
+                    break
+            pending.wait()
+
+        try:
+            value = compute()
+            if hasattr(value, "flags"):
+                value.flags.writeable = False
+            with self._lock:
+                self._values[key] = value
+                while len(self._values) > self.max_entries:
+                    self._values.popitem(last=False)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.set()
+        return value
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._values)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._fingerprints.clear()
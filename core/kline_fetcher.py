@@ -0,0 +1,141 @@
+"""Concurrent windowed downloader for Binance historical klines."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import time
+from collections import deque
+from typing import Any
+
+from core.kline_store import KLINE_COLUMNS, timeframe_to_ms
+from utils.logger import log
+
+
+class RequestWeightBudget:
+    """Sliding one-minute request-weight budget shared by all concurrent fetches."""
+
+    def __init__(self, weight_per_minute: int = 1200, window_sec: float = 60.0) -> None:
+        self.weight_per_minute = weight_per_minute
+        self.window_sec = window_sec
+        self._spent: deque[tuple[float, int]] = deque()
+        self._lock = asyncio.Lock()
+
+    def used_weight(self, now: float | None = None) -> int:
+        now = time.monotonic() if now is None else now
+        while self._spent and now - self._spent[0][0] >= self.window_sec:
+            self._spent.popleft()
+        return sum(weight for _, weight in self._spent)
+
+    async def acquire(self, weight: int) -> None:
+        """Wait until ``weight`` fits into the current window, then reserve it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self.used_weight(now) + weight <= self.weight_per_minute or not self._spent:
+                    self._spent.append((now, weight))
+                    return
+                await asyncio.sleep(self.window_sec - (now - self._spent[0][0]))
+
+
+class KlineFetcher:
+    """Splits a time range into page-sized windows and downloads them with bounded fan-out."""
+
+    KLINES_URL = "https://api.binance.com/api/v3/klines"
+    REQUEST_WEIGHT = 2
+
+    def __init__(
+        self,
+        url: str | None = None,
+        max_concurrency: int = 8,
+        budget: RequestWeightBudget | None = None,
+        page_limit: int = 1000,
+        max_retries: int = 3,
+    ) -> None:
+        self.url = url or self.KLINES_URL
+        self.max_concurrency = max_concurrency
+        self.budget = budget or RequestWeightBudget()
+        self.page_limit = page_limit
+        self.max_retries = max_retries
+        self._aiohttp = None
+
+    def plan_windows(self, start_ms: int, end_ms: int, interval_ms: int) -> list[tuple[int, int]]:
+        """Return inclusive [start, end] windows holding at most ``page_limit`` candles each."""
+        span = self.page_limit * interval_ms
+        windows: list[tuple[int, int]] = []
+        cursor = start_ms
+        while cursor <= end_ms:
+            window_end = min(cursor + span - 1, end_ms)
+            windows.append((cursor, window_end))
+            cursor = window_end + 1
+        return windows
+
+    async def fetch(self, symbol: str, timeframe: str, start_ms: int, end_ms: int) -> list[list[Any]]:
+        """Download all klines in [start_ms, end_ms], ordered and de-duplicated by open_time."""
+        if self._aiohttp is None:
+            self._aiohttp = importlib.import_module("aiohttp")
+
+        windows = self.plan_windows(start_ms, end_ms, timeframe_to_ms(timeframe))
+        if not windows:
+            return []
+
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        timeout = self._aiohttp.ClientTimeout(total=20)
+        async with self._aiohttp.ClientSession(timeout=timeout) as session:
+
+            async def _run_window(window: tuple[int, int]) -> list[list[Any]]:
+                async with semaphore:
+                    return await self._fetch_window(session, symbol, timeframe, window[0], window[1])
+
+            pages = await asyncio.gather(*(_run_window(window) for window in windows))
+
+        by_open_time: dict[int, list[Any]] = {}
+        for page in pages:
+            for row in page:
+                by_open_time[int(row[0])] = row[: len(KLINE_COLUMNS)]
+        if len(windows) > 1:
+            log(f"Fetched {len(by_open_time)} klines for {symbol} {timeframe} in {len(windows)} windows")
+        return [by_open_time[key] for key in sorted(by_open_time)]
+
+    async def _fetch_window(
+        self,
+        session: Any,
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: int,
+    ) -> list[list[Any]]:
+        params = {
+            "symbol": symbol,
+            "interval": timeframe,
+            "startTime": start_ms,
+            "endTime": end_ms,
+            "limit": self.page_limit,
+        }
+        rows: list[list[Any]] = []
+        while True:
+            payload = await self._get_page(session, params)
+            if not payload:
+                break
+            rows.extend(payload)
+            last_open = int(payload[-1][0])
+            # windows are sized to one page, this only loops for irregular intervals such as 1M
+            if len(payload) < self.page_limit or last_open >= end_ms:
+                break
+            params["startTime"] = last_open + 1
+        return rows
+
+    async def _get_page(self, session: Any, params: dict[str, Any]) -> list[list[Any]]:
+        for attempt in range(self.max_retries + 1):
+            await self.budget.acquire(self.REQUEST_WEIGHT)
+            async with session.get(self.url, params=params) as response:
+                payload = await response.json(content_type=None)
+                if response.status in (418, 429) and attempt < self.max_retries:
+                    retry_after = float(response.headers.get("Retry-After", 1) or 1)
+                    log(f"Kline fetch rate limited, retrying in {retry_after:.0f}s")
+                    await asyncio.sleep(retry_after)
+                    continue
+                if response.status >= 400:
+                    raise RuntimeError(f"Failed to load historical data: {payload}")
+                return payload
+        return []
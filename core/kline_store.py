@@ -0,0 +1,236 @@
+"""SQLite-backed on-disk cache of historical klines per symbol and timeframe."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+KLINE_COLUMNS = [
+    "open_time",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "close_time",
+    "quote_asset_volume",
+    "number_of_trades",
+    "taker_buy_base",
+    "taker_buy_quote",
+]
+
+TIMEFRAME_MS = {
+    "1s": 1_000,
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "6h": 21_600_000,
+    "8h": 28_800_000,
+    "12h": 43_200_000,
+    "1d": 86_400_000,
+    "3d": 259_200_000,
+    "1w": 604_800_000,
+    "1M": 2_678_400_000,
+}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Return Binance kline interval length in milliseconds (1M uses 31 days)."""
+    try:
+        return TIMEFRAME_MS[timeframe]
+    except KeyError as exc:
+        raise ValueError(f"Unsupported timeframe: {timeframe}") from exc
+
+
+class KlineStore:
+    """Candle cache keyed by (symbol, timeframe, open_time) with fetched-range bookkeeping.
+
+    Besides the candles themselves the store remembers which [start, end] open_time
+    ranges were already requested from the exchange, so ranges without trading
+    (before listing, maintenance) are not fetched again on every run.
+    """
+
+    def __init__(self, db_path: str = "klines.db") -> None:
+        self.db_path = Path(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def init_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS klines (
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    open_time INTEGER NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    volume REAL NOT NULL,
+                    close_time INTEGER NOT NULL,
+                    quote_asset_volume REAL,
+                    number_of_trades INTEGER,
+                    taker_buy_base REAL,
+                    taker_buy_quote REAL,
+                    PRIMARY KEY (symbol, timeframe, open_time)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS kline_coverage (
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    start_ms INTEGER NOT NULL,
+                    end_ms INTEGER NOT NULL,
+                    PRIMARY KEY (symbol, timeframe, start_ms)
+                )
+                """
+            )
+
+    def _coverage(self, conn: sqlite3.Connection, symbol: str, timeframe: str) -> list[tuple[int, int]]:
+        rows = conn.execute(
+            "SELECT start_ms, end_ms FROM kline_coverage WHERE symbol = ? AND timeframe = ? ORDER BY start_ms",
+            (symbol, timeframe),
+        ).fetchall()
+        return [(int(start), int(end)) for start, end in rows]
+
+    def missing_ranges(self, symbol: str, timeframe: str, start_ms: int, end_ms: int) -> list[tuple[int, int]]:
+        """Return inclusive open_time ranges inside [start_ms, end_ms] not fetched yet."""
+        with self._connect() as conn:
+            coverage = self._coverage(conn, symbol, timeframe)
+
+        gaps: list[tuple[int, int]] = []
+        cursor = start_ms
+        for cov_start, cov_end in coverage:
+            if cov_end < cursor:
+                continue
+            if cov_start > end_ms:
+                break
+            if cov_start > cursor:
+                gaps.append((cursor, cov_start - 1))
+            cursor = max(cursor, cov_end + 1)
+            if cursor > end_ms:
+                break
+        if cursor <= end_ms:
+            gaps.append((cursor, end_ms))
+        return gaps
+
+    def save_klines(
+        self,
+        symbol: str,
+        timeframe: str,
+        rows: list[list[Any]],
+        start_ms: int,
+        end_ms: int,
+        now_ms: int | None = None,
+    ) -> int:
+        """Upsert fetched klines and mark [start_ms, end_ms] as fetched.
+
+        Candles that were still open at ``now_ms`` are skipped and the fetched range is
+        capped before them, so the next run picks them up once they have closed.
+        """
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        closed = [row[: len(KLINE_COLUMNS)] for row in rows if int(row[6]) < now_ms]
+        covered_until = min(end_ms, now_ms - timeframe_to_ms(timeframe))
+
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO klines(
+                    symbol, timeframe, open_time, open, high, low, close, volume, close_time,
+                    quote_asset_volume, number_of_trades, taker_buy_base, taker_buy_quote
+                )
+                VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        symbol,
+                        timeframe,
+                        int(row[0]),
+                        float(row[1]),
+                        float(row[2]),
+                        float(row[3]),
+                        float(row[4]),
+                        float(row[5]),
+                        int(row[6]),
+                        float(row[7]),
+                        int(row[8]),
+                        float(row[9]),
+                        float(row[10]),
+                    )
+                    for row in closed
+                ],
+            )
+            if covered_until >= start_ms:
+                self._merge_coverage(conn, symbol, timeframe, start_ms, covered_until)
+        return len(closed)
+
+    def _merge_coverage(self, conn: sqlite3.Connection, symbol: str, timeframe: str, start_ms: int, end_ms: int) -> None:
+        merged_start, merged_end = start_ms, end_ms
+        for cov_start, cov_end in self._coverage(conn, symbol, timeframe):
+            if cov_end + 1 < merged_start or cov_start > merged_end + 1:
+                continue
+            merged_start = min(merged_start, cov_start)
+            merged_end = max(merged_end, cov_end)
+            conn.execute(
+                "DELETE FROM kline_coverage WHERE symbol = ? AND timeframe = ? AND start_ms = ?",
+                (symbol, timeframe, cov_start),
+            )
+        conn.execute(
+            "INSERT INTO kline_coverage(symbol, timeframe, start_ms, end_ms) VALUES(?, ?, ?, ?)",
+            (symbol, timeframe, merged_start, merged_end),
+        )
+
+    def load_klines(self, symbol: str, timeframe: str, start_ms: int, end_ms: int) -> list[tuple[Any, ...]]:
+        """Return cached rows ordered by open_time, in ``KLINE_COLUMNS`` order."""
+        with self._connect() as conn:
+            return conn.execute(
+                f"""
+                SELECT {", ".join(KLINE_COLUMNS)} FROM klines
+                WHERE symbol = ? AND timeframe = ? AND open_time BETWEEN ? AND ?
+                ORDER BY open_time
+                """,
+                (symbol, timeframe, start_ms, end_ms),
+            ).fetchall()
+
+    def iter_klines(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: int,
+        chunk_rows: int,
+    ) -> Iterator[list[tuple[Any, ...]]]:
+        """Yield cached rows in open_time order, at most ``chunk_rows`` per list.
+
+        Pages by open_time instead of holding a cursor open, so only one chunk is in memory.
+        """
+        chunk_rows = max(1, int(chunk_rows))
+        cursor = start_ms
+        while cursor <= end_ms:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    f"""
+                    SELECT {", ".join(KLINE_COLUMNS)} FROM klines
+                    WHERE symbol = ? AND timeframe = ? AND open_time BETWEEN ? AND ?
+                    ORDER BY open_time LIMIT ?
+                    """,
+                    (symbol, timeframe, cursor, end_ms, chunk_rows),
+                ).fetchall()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunk_rows:
+                return
+            cursor = int(rows[-1][0]) + 1
@@ -0,0 +1,102 @@
+"""Vectorized Monte Carlo resampling of backtest trade sequences."""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+MONTE_CARLO_METHODS = ("bootstrap", "shuffle")
+DEFAULT_PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+# paths simulated together; their state vectors stay cache-resident while trades are stepped through
+_BLOCK_PATHS = 8192
+
+
+def simulate_trade_paths(
+    trade_results: list[float] | Any,
+    paths: int = 10_000,
+    method: str = "bootstrap",
+    seed: int | None = None,
+) -> dict[str, Any]:
+    """Resample the trade sequence ``paths`` times and measure every path.
+
+    ``bootstrap`` draws trades with replacement, ``shuffle`` permutes the actual
+    trades (final PnL is then fixed and only the ordering risk varies). Each
+    path starts at zero equity, like ``BacktestEngine.equity_curve``. Returns
+    per-path arrays ``max_drawdown``, ``final_pnl`` and ``longest_losing_streak``.
+
+    Paths are processed in blocks as a trades x paths matrix: equity, peak,
+    drawdown and losing-streak state are vectors over the block's paths, advanced
+    one trade position at a time with in-place ufuncs.
+    """
+    numpy = importlib.import_module("numpy")
+    if method not in MONTE_CARLO_METHODS:
+        raise ValueError(f"Unknown Monte Carlo method: {method}")
+    trades = numpy.asarray(trade_results, dtype=numpy.float64)
+    count = int(trades.shape[0])
+    paths = max(1, int(paths))
+    max_drawdown = numpy.zeros(paths)
+    final_pnl = numpy.zeros(paths)
+    longest_streak = numpy.zeros(paths, dtype=numpy.int64)
+    if count == 0:
+        return {"max_drawdown": max_drawdown, "final_pnl": final_pnl, "longest_losing_streak": longest_streak}
+
+    rng = numpy.random.default_rng(seed)
+    losing = trades < 0
+    order = numpy.arange(count, dtype=numpy.int32)
+    for start in range(0, paths, _BLOCK_PATHS):
+        stop = min(paths, start + _BLOCK_PATHS)
+        block = stop - start
+        if method == "bootstrap":
+            picks = rng.integers(0, count, size=(count, block), dtype=numpy.int32)
+        else:
+            picks = rng.permuted(numpy.broadcast_to(order, (block, count)), axis=1).T
+        sample = trades[picks]
+        sample_losing = losing[picks]
+
+        equity = numpy.zeros(block)
+        peak = numpy.zeros(block)
+        drawdown = numpy.zeros(block)
+        scratch = numpy.empty(block)
+        streak = numpy.zeros(block, dtype=numpy.int32)
+        best_streak = numpy.zeros(block, dtype=numpy.int32)
+        for position in range(count):
+            equity += sample[position]
+            numpy.maximum(peak, equity, out=peak)
+            numpy.subtract(peak, equity, out=scratch)
+            numpy.maximum(drawdown, scratch, out=drawdown)
+            streak += 1
+            streak *= sample_losing[position]
+            numpy.maximum(best_streak, streak, out=best_streak)
+
+        max_drawdown[start:stop] = drawdown
+        final_pnl[start:stop] = equity
+        longest_streak[start:stop] = best_streak
+
+    return {"max_drawdown": max_drawdown, "final_pnl": final_pnl, "longest_losing_streak": longest_streak}
+
+
+def monte_carlo_report(
+    trade_results: list[float] | Any,
+    paths: int = 10_000,
+    method: str = "bootstrap",
+    seed: int | None = None,
+    percentiles: tuple[float, ...] = DEFAULT_PERCENTILES,
+) -> dict[str, Any]:
+    """Percentile bands of drawdown, final PnL and longest losing streak over resampled paths.
+
+    Returns ``{"paths", "trades", "method", "percentiles", "max_drawdown",
+    "final_pnl", "longest_losing_streak"}`` where each metric maps ``"p5"``-style
+    keys to values.
+    """
+    numpy = importlib.import_module("numpy")
+    samples = simulate_trade_paths(trade_results, paths=paths, method=method, seed=seed)
+    report: dict[str, Any] = {
+        "paths": int(samples["final_pnl"].shape[0]),
+        "trades": len(trade_results),
+        "method": method,
+        "percentiles": list(percentiles),
+    }
+    for name, values in samples.items():
+        bands = numpy.percentile(values, percentiles)
+        report[name] = {f"p{percentile:g}": float(value) for percentile, value in zip(percentiles, bands, strict=True)}
+    return report
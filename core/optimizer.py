@@ -3,21 +3,256 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import itertools
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager, contextmanager, nullcontext
 from copy import deepcopy
+from dataclasses import dataclass
 from typing import Any
 
 from core.backtest_engine import BacktestEngine
+from core.batch_kernel import EXIT_PARAMETERS
+from core.cancellation import BacktestCancelled, CancelEvent
+from core.candles import CandleArrays, open_candle_file, write_candle_file
+from core.indicator_cache import IndicatorCache
+from core.kline_fetcher import KlineFetcher
+from core.kline_store import KlineStore
+from core.optimizer_store import OptimizerStore, combo_key, range_is_open, run_key
+from core.search_strategies import make_search_strategy, rank_key
+from core.walk_forward import WalkForwardWindow, plan_windows, stitch_equity, window_dates
 from strategy.base_strategy import StrategySettings
 from utils.logger import log
 
+EXECUTORS = ("thread", "process", "inline")
+PROGRESS_TOP_RESULTS = 10
+PROGRESS_LOG_INTERVAL_SEC = 5.0
+
+# candle view and indicator memo of the current worker process, set up once by the pool initializer
+_worker_candles: CandleArrays | None = None
+_worker_cache: IndicatorCache | None = None
+_worker_cancel: CancelEvent | None = None
+
+
+def _init_worker(candle_file: str, cancel_event: CancelEvent | None = None) -> None:
+    global _worker_candles, _worker_cache, _worker_cancel
+    _worker_candles = open_candle_file(candle_file).readonly()
+    _worker_cache = IndicatorCache()
+    _worker_cancel = cancel_event
+
+
+def _evaluate_in_worker(
+    settings_list: list[StrategySettings],
+    params_list: list[dict[str, Any]],
+    window: tuple[int, int] | None = None,
+) -> tuple[list[dict[str, Any]], int, int]:
+    """Evaluate one job and return its results with this call's indicator cache hits/misses."""
+    if _worker_candles is None or _worker_cache is None:
+        raise RuntimeError("Optimizer worker has no candle data")
+    hits, misses = _worker_cache.hits, _worker_cache.misses
+    results = _evaluate_job(_worker_candles, settings_list, params_list, _worker_cache, _worker_cancel, window)
+    return results, _worker_cache.hits - hits, _worker_cache.misses - misses
+
+
+def _evaluate_job(
+    candles: CandleArrays,
+    settings_list: list[StrategySettings],
+    params_list: list[dict[str, Any]],
+    indicator_cache: IndicatorCache | None = None,
+    cancel_event: CancelEvent | None = None,
+    window: tuple[int, int] | None = None,
+) -> list[dict[str, Any]]:
+    """Evaluate a single combination, or a group sharing entry parameters with the batched kernel."""
+    if len(settings_list) == 1:
+        return [_evaluate(candles, settings_list[0], params_list[0], indicator_cache, cancel_event, window)]
+    engine = BacktestEngine(indicator_cache=indicator_cache, cancel_event=cancel_event)
+    engine.candles = candles
+    reports = engine.run_backtest_batch(settings_list, window)
+    return [_result_from_report(params, report) for params, report in zip(params_list, reports, strict=True)]
+
+
+def _evaluate(
+    candles: CandleArrays,
+    settings: StrategySettings,
+    params: dict[str, Any],
+    indicator_cache: IndicatorCache | None = None,
+    cancel_event: CancelEvent | None = None,
+    window: tuple[int, int] | None = None,
+) -> dict[str, Any]:
+    engine = BacktestEngine(indicator_cache=indicator_cache, cancel_event=cancel_event)
+    engine.candles = candles
+    return _result_from_report(params, engine.run_backtest(settings, window))
+
+
+def _backtest_window(
+    candles: CandleArrays,
+    settings: StrategySettings,
+    window: tuple[int, int],
+    indicator_cache: IndicatorCache | None = None,
+    cancel_event: CancelEvent | None = None,
+) -> tuple[dict[str, Any], BacktestEngine]:
+    """Full backtest of one bar window; the engine keeps its equity curve and trade stats."""
+    engine = BacktestEngine(indicator_cache=indicator_cache, cancel_event=cancel_event)
+    engine.candles = candles
+    report = engine.run_backtest(settings, window)
+    return report, engine
+
+
+def _result_from_report(params: dict[str, Any], report: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "params": params,
+        "total_profit": float(report.get("total_profit", 0.0)),
+        "win_rate": float(report.get("win_rate", 0.0)),
+        "max_drawdown": float(report.get("max_drawdown", 0.0)),
+        "profit_factor": float(report.get("profit_factor", 0.0)),
+        "total_trades": int(report.get("total_trades", 0)),
+    }
+
+
+def _apply_params(base_settings: StrategySettings, params: dict[str, Any]) -> StrategySettings:
+    settings = deepcopy(base_settings)
+    for key, value in params.items():
+        setattr(settings, key, value)
+    return settings
+
+
+class TopResults:
+    """Bounded best-``k`` results under ``rank_key``; ties keep the lower combination index."""
+
+    def __init__(self, k: int) -> None:
+        self.k = max(1, k)
+        # min-heap of the worst kept result: inverted rank key, inverted index
+        self._heap: list[tuple[tuple[float, ...], int, dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, result: dict[str, Any]) -> None:
+        entry = (tuple(-value for value in rank_key(result)), -int(result.get("index", 0)), result)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def ranked(self) -> list[dict[str, Any]]:
+        return [entry[2] for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+@dataclass
+class OptimizerProgress:
+    """Snapshot passed to progress callbacks after each finished job."""
+
+    completed: int
+    total: int
+    resumed: int
+    elapsed_sec: float
+    combos_per_sec: float
+    eta_sec: float
+    latest: list[dict[str, Any]]
+    top_results: list[dict[str, Any]]
+
+    @classmethod
+    def measure(
+        cls,
+        completed: int,
+        total: int,
+        resumed: int,
+        elapsed_sec: float,
+        latest: list[dict[str, Any]],
+        top: TopResults,
+    ) -> OptimizerProgress:
+        evaluated = completed - resumed
+        rate = evaluated / elapsed_sec if elapsed_sec > 0 else 0.0
+        eta = (total - completed) / rate if rate > 0 else 0.0
+        return cls(completed, total, resumed, elapsed_sec, rate, eta, latest, top.ranked())
+
 
 class StrategyOptimizer:
-    """Runs asynchronous grid search over strategy parameter ranges."""
+    """Runs asynchronous grid search over strategy parameter ranges.
+
+    ``executor`` selects where backtests run: ``"thread"`` (asyncio.to_thread),
+    ``"process"`` (a process pool whose workers memory-map the candles once) or
+    ``"inline"`` (on the calling thread, for debugging and deterministic CI runs).
+
+    With ``batched`` enabled, combinations that differ only in exit/DCA parameters
+    are grouped (up to ``batch_size`` per job) and simulated together by the
+    vectorized kernel in ``core.batch_kernel``.
 
-    def __init__(self, max_parallel_tasks: int = 4) -> None:
+    ``cancel()`` (or an expired ``max_seconds`` budget) stops dispatching new jobs
+    and interrupts running backtests at the next bar chunk; the run then returns
+    the results finished so far, ranked as usual.
+    """
+
+    def __init__(
+        self,
+        max_parallel_tasks: int = 4,
+        kline_store: KlineStore | None = None,
+        kline_fetcher: KlineFetcher | None = None,
+        executor: str = "thread",
+        max_workers: int | None = None,
+        batched: bool = True,
+        batch_size: int = 1024,
+        result_store: OptimizerStore | None = None,
+    ) -> None:
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown optimizer executor: {executor}")
         self.max_parallel_tasks = max_parallel_tasks
+        self.kline_store = kline_store
+        self.kline_fetcher = kline_fetcher
+        self.executor = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batched = batched
+        self.batch_size = max(1, batch_size)
+        self.result_store = result_store
+        self.indicator_cache = IndicatorCache()
         self.results: list[dict[str, Any]] = []
+        self.summary: dict[str, Any] = {}
+        self._worker_hits = 0
+        self._worker_misses = 0
+        self._cancel_event: CancelEvent | None = None
+        self._stop_reason: str | None = None
+
+    def cancel(self) -> None:
+        """Stop the current run; it returns partial results once in-flight jobs unwind."""
+        self._stop("cancelled")
+
+    def _stop(self, reason: str) -> None:
+        if self._stop_reason is None:
+            self._stop_reason = reason
+            log(f"Optimizer stopping: {reason}")
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_reason is not None
+
+    @contextmanager
+    def _running(self, executor: str, max_seconds: float | None) -> Iterator[None]:
+        """Arm a fresh cancel event (and the optional wall-clock budget) for one run.
+
+        The indicator cache is emptied when the run ends, so its arrays do not
+        outlive the run on the long-lived optimizer.
+        """
+        # pool workers need an event that survives the process boundary
+        self._cancel_event = multiprocessing.Event() if executor == "process" else threading.Event()
+        self._stop_reason = None
+        deadline = None
+        if max_seconds is not None:
+            deadline = asyncio.get_running_loop().call_later(max_seconds, self._stop, "time_budget")
+        try:
+            yield
+        finally:
+            if deadline is not None:
+                deadline.cancel()
+            self.indicator_cache.clear()
 
     async def run_grid_search(
         self,
@@ -26,65 +261,744 @@ class StrategyOptimizer:
         date_range: tuple[str, str],
         parameter_ranges: dict[str, list[Any]],
         base_settings: StrategySettings,
+        candle_file: str | None = None,
+        executor: str | None = None,
+        top_k: int | None = None,
+        on_progress: Callable[[OptimizerProgress], None] | None = None,
+        max_seconds: float | None = None,
+        max_evaluations: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Evaluate every combination of ``parameter_ranges`` and return them ranked.
+
+        Combinations are generated lazily, so with ``top_k`` set only the best
+        ``top_k`` results are kept in memory however large the grid is.
+        ``on_progress`` is called on the event loop after every finished job.
+        ``max_seconds`` bounds wall-clock time and ``max_evaluations`` the number of
+        new backtests; either one ends the run early with partial results.
+        """
+        self.results = []
+        self.summary = {}
+        executor = self._resolve_executor(executor)
+        with self._running(executor, max_seconds):
+            total = math.prod(len(values) for values in parameter_ranges.values())
+            top = TopResults(top_k or PROGRESS_TOP_RESULTS)
+            kept: list[dict[str, Any]] | None = None if top_k else []
+
+            run_id = run_key(symbol, timeframe, date_range, base_settings, candle_file)
+            stored = await self._start_checkpoint(
+                run_id, symbol, timeframe, date_range, base_settings, parameter_ranges, total
+            )
+            resumed = 0
+            for index, params in self._grid_combinations(parameter_ranges) if stored else ():
+                result = stored.get(combo_key(params))
+                if result is not None:
+                    result["index"] = index
+                    top.push(result)
+                    if kept is not None:
+                        kept.append(result)
+                    resumed += 1
+            done = set(stored)
+            del stored
+            if resumed:
+                log(f"Optimizer resumed run {run_id}: {resumed}/{total} combinations already done")
+
+            cache_before = self.indicator_cache.stats()
+            self._worker_hits = 0
+            self._worker_misses = 0
+            jobs = 0
+            completed = resumed
+            if resumed < total:
+                candles = await self._load_candles(symbol, timeframe, date_range, candle_file)
+                log(f"Optimizer started for {symbol}: {total - resumed} combinations ({executor} executor)")
+                started = time.monotonic()
+                last_log = started
+
+                async def _on_results(results: list[dict[str, Any]]) -> None:
+                    nonlocal completed, jobs, last_log
+                    for result in results:
+                        top.push(result)
+                    if kept is not None:
+                        kept.extend(results)
+                    if self.result_store is not None:
+                        await asyncio.to_thread(self.result_store.save_results, run_id, results)
+                    completed += len(results)
+                    jobs += 1
+                    now = time.monotonic()
+                    progress = OptimizerProgress.measure(completed, total, resumed, now - started, results, top)
+                    if now - last_log >= PROGRESS_LOG_INTERVAL_SEC or completed == total:
+                        last_log = now
+                        log(
+                            f"Optimizer progress: {completed}/{total} | "
+                            f"{progress.combos_per_sec:.1f} combos/sec | ETA {progress.eta_sec:.0f}s"
+                        )
+                    if on_progress is not None:
+                        on_progress(progress)
+
+                async with self._worker_pool(executor, candles, candle_file) as pool:
+                    await self._run_jobs(
+                        executor,
+                        pool,
+                        candles,
+                        base_settings,
+                        self._grid_jobs(parameter_ranges, done),
+                        _on_results,
+                        max_evaluations=max_evaluations,
+                    )
+
+            if self.result_store is not None:
+                status = "complete" if completed == total else "stopped"
+                await asyncio.to_thread(self.result_store.finish_run, run_id, status)
+            if kept is not None:
+                self.results = kept
+                self.rank_results()
+            else:
+                self.results = top.ranked()
+
+            cache_after = self.indicator_cache.stats()
+            self.summary = {
+                "symbol": symbol,
+                "run_id": run_id,
+                "combinations": total,
+                "resumed": resumed,
+                "evaluated": completed,
+                "stopped": self._stop_reason,
+                "executor": executor,
+                "jobs": jobs,
+                "indicator_cache_hits": cache_after["hits"] - cache_before["hits"] + self._worker_hits,
+                "indicator_cache_misses": cache_after["misses"] - cache_before["misses"] + self._worker_misses,
+            }
+            log(
+                f"Optimizer finished for {symbol}: indicator cache "
+                f"{self.summary['indicator_cache_hits']} hits / {self.summary['indicator_cache_misses']} misses"
+            )
+            return self.results
+
+    async def iter_grid_search(
+        self,
+        symbol: str,
+        timeframe: str,
+        date_range: tuple[str, str],
+        parameter_ranges: dict[str, list[Any]],
+        base_settings: StrategySettings,
+        candle_file: str | None = None,
+        executor: str | None = None,
+        top_k: int | None = None,
+        max_seconds: float | None = None,
+        max_evaluations: int | None = None,
+    ) -> AsyncIterator[OptimizerProgress]:
+        """Run ``run_grid_search`` and yield an ``OptimizerProgress`` for every finished job.
+
+        The final ranking is available in ``self.results`` once the iterator is exhausted.
+        """
+        queue: asyncio.Queue[OptimizerProgress | None] = asyncio.Queue()
+        task = asyncio.create_task(
+            self.run_grid_search(
+                symbol,
+                timeframe,
+                date_range,
+                parameter_ranges,
+                base_settings,
+                candle_file=candle_file,
+                executor=executor,
+                top_k=top_k,
+                on_progress=queue.put_nowait,
+                max_seconds=max_seconds,
+                max_evaluations=max_evaluations,
+            )
+        )
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (progress := await queue.get()) is not None:
+                yield progress
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def run_successive_halving(
+        self,
+        symbol: str,
+        timeframe: str,
+        date_range: tuple[str, str],
+        parameter_ranges: dict[str, list[Any]],
+        base_settings: StrategySettings,
+        candle_file: str | None = None,
+        executor: str | None = None,
+        eta: int = 3,
+        min_fraction: float = 0.1,
+        min_bars: int = 500,
+        on_progress: Callable[[OptimizerProgress], None] | None = None,
+        max_seconds: float | None = None,
     ) -> list[dict[str, Any]]:
+        """Early-stopping grid search over growing prefixes of the history.
+
+        Every combination is first backtested on the first ``min_fraction`` of the
+        candles; the best ``1/eta`` (by the ``rank_results`` key) move on to a window
+        ``eta`` times longer, until the survivors run on the full history. Results
+        have the ``run_grid_search`` shape plus ``bars``, the length of the last window
+        a combination was evaluated on. They are ranked by that window first, so the
+        fully evaluated survivors come out on top.
+
+        ``on_progress`` is called after every finished job; its total counts the
+        evaluations of all planned rungs and its top results are the current rung's.
+        """
+        if eta < 2:
+            raise ValueError("eta must be >= 2")
         self.results = []
-        start_date, end_date = date_range
+        self.summary = {}
+        executor = self._resolve_executor(executor)
+        with self._running(executor, max_seconds):
+            keys = list(parameter_ranges.keys())
+            values = [parameter_ranges[k] for k in keys]
+            combinations = [dict(zip(keys, combo, strict=False)) for combo in itertools.product(*values)]
+            candles = await self._load_candles(symbol, timeframe, date_range, candle_file)
+            total_bars = len(candles)
 
-        data_engine = BacktestEngine()
-        dataframe = await data_engine.load_historical_data(symbol, timeframe, start_date, end_date)
+            rung_bars: list[int] = []
+            fraction = min(max(min_fraction, 0.0), 1.0)
+            while True:
+                bars = min(total_bars, max(int(total_bars * fraction), min_bars))
+                if bars * 2 > total_bars:
+                    # a window covering most of the history is not worth a separate rung
+                    bars = total_bars
+                if not rung_bars or bars > rung_bars[-1]:
+                    rung_bars.append(bars)
+                if bars >= total_bars:
+                    break
+                fraction *= eta
 
-        keys = list(parameter_ranges.keys())
-        values = [parameter_ranges[k] for k in keys]
-        combinations = [dict(zip(keys, combo, strict=False)) for combo in itertools.product(*values)]
+            cache_before = self.indicator_cache.stats()
+            self._worker_hits = 0
+            self._worker_misses = 0
+            log(
+                f"Successive halving started for {symbol}: {len(combinations)} combinations, "
+                f"windows {rung_bars} bars ({executor} executor)"
+            )
+
+            latest: dict[int, dict[str, Any]] = {}
+            rung_results: list[dict[str, Any]] = []
+            survivors = list(range(1, len(combinations) + 1))
+            bars_simulated = 0
+            jobs_total = 0
+            total = 0
+            kept_count = len(combinations)
+            for _ in rung_bars:
+                total += kept_count
+                kept_count = max(1, math.ceil(kept_count / eta))
+            completed = 0
+            started = time.monotonic()
+
+            async def _on_results(results: list[dict[str, Any]]) -> None:
+                nonlocal completed
+                rung_results.extend(results)
+                completed += len(results)
+                if on_progress is not None:
+                    for result in results:
+                        top.push(result)
+                    on_progress(
+                        OptimizerProgress.measure(completed, total, 0, time.monotonic() - started, results, top)
+                    )
+
+            async with self._worker_pool(executor, candles, candle_file) as pool:
+                for rung, bars in enumerate(rung_bars):
+                    rung_results.clear()
+                    top = TopResults(PROGRESS_TOP_RESULTS)
+                    jobs = self._build_jobs(combinations, survivors)
+                    jobs_total += len(jobs)
+                    await self._run_jobs(executor, pool, candles, base_settings, jobs, _on_results, (0, bars))
+                    bars_simulated += bars * len(survivors)
+                    for result in rung_results:
+                        result["bars"] = bars
+                        latest[result["index"]] = result
+                    if rung == len(rung_bars) - 1 or self.stopped:
+                        break
+                    rung_results.sort(key=rank_key)
+                    keep = max(1, math.ceil(len(rung_results) / eta))
+                    survivors = sorted(result["index"] for result in rung_results[:keep])
+                    log(f"Successive halving rung {rung + 1}/{len(rung_bars)}: {keep} of {len(rung_results)} kept")
+
+            self.results = sorted(latest.values(), key=lambda result: (-result["bars"], *rank_key(result)))
+            bars_exhaustive = total_bars * len(combinations)
+            cache_after = self.indicator_cache.stats()
+            self.summary = {
+                "symbol": symbol,
+                "mode": "successive_halving",
+                "combinations": len(combinations),
+                "executor": executor,
+                "jobs": jobs_total,
+                "rungs": rung_bars,
+                "finalists": len(survivors),
+                "stopped": self._stop_reason,
+                "bars_simulated": bars_simulated,
+                "bars_exhaustive": bars_exhaustive,
+                "indicator_cache_hits": cache_after["hits"] - cache_before["hits"] + self._worker_hits,
+                "indicator_cache_misses": cache_after["misses"] - cache_before["misses"] + self._worker_misses,
+            }
+            log(
+                f"Successive halving finished for {symbol}: {bars_simulated} bars simulated "
+                f"vs {bars_exhaustive} exhaustive"
+            )
+            return self.results
 
-        log(f"Optimizer started for {symbol}: {len(combinations)} combinations")
-        semaphore = asyncio.Semaphore(self.max_parallel_tasks)
+    async def run_search(
+        self,
+        symbol: str,
+        timeframe: str,
+        date_range: tuple[str, str],
+        parameter_ranges: dict[str, list[Any]],
+        base_settings: StrategySettings,
+        strategy: str = "random",
+        budget: int = 500,
+        seed: int = 0,
+        candle_file: str | None = None,
+        executor: str | None = None,
+        on_progress: Callable[[OptimizerProgress], None] | None = None,
+        max_seconds: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """Evaluate ``budget`` grid points proposed by a search strategy (see ``core.search_strategies``).
 
-        async def _run_combination(index: int, combo: dict[str, Any]) -> None:
-            async with semaphore:
-                result = await self.evaluate_combination(dataframe, base_settings, combo)
-                result["index"] = index
-                self.results.append(result)
-                if index % 10 == 0:
-                    log(f"Optimizer progress: {index}/{len(combinations)}")
+        Proposals are evaluated in rounds and fed back to the strategy in index
+        order, so a given ``seed`` reproduces the same candidates on any executor.
+        ``on_progress`` is called after every finished job, out of ``budget``.
+        """
+        self.results = []
+        self.summary = {}
+        executor = self._resolve_executor(executor)
+        with self._running(executor, max_seconds):
+            searcher = make_search_strategy(strategy, parameter_ranges, seed)
+            budget = min(budget, searcher.grid_size)
+            candles = await self._load_candles(symbol, timeframe, date_range, candle_file)
+
+            cache_before = self.indicator_cache.stats()
+            self._worker_hits = 0
+            self._worker_misses = 0
+            log(
+                f"Optimizer {strategy} search started for {symbol}: {budget} of "
+                f"{searcher.grid_size} combinations ({executor} executor)"
+            )
+
+            combinations: list[dict[str, Any]] = []
+            round_results: list[dict[str, Any]] = []
+            jobs_total = 0
+            top = TopResults(PROGRESS_TOP_RESULTS)
+            started = time.monotonic()
+
+            async def _on_results(results: list[dict[str, Any]]) -> None:
+                round_results.extend(results)
+                if on_progress is not None:
+                    for result in results:
+                        top.push(result)
+                    completed = len(self.results) + len(round_results)
+                    on_progress(
+                        OptimizerProgress.measure(completed, budget, 0, time.monotonic() - started, results, top)
+                    )
+
+            async with self._worker_pool(executor, candles, candle_file) as pool:
+                while len(combinations) < budget:
+                    proposals = searcher.ask(min(searcher.round_size or budget, budget - len(combinations)))
+                    if not proposals:
+                        break
+                    first = len(combinations) + 1
+                    combinations.extend(proposals)
+                    round_results.clear()
+                    jobs = self._build_jobs(combinations, list(range(first, len(combinations) + 1)))
+                    jobs_total += len(jobs)
+                    await self._run_jobs(executor, pool, candles, base_settings, jobs, _on_results)
+                    round_results.sort(key=lambda result: result["index"])
+                    searcher.tell(round_results)
+                    self.results.extend(round_results)
+                    log(f"Optimizer progress: {len(self.results)}/{budget}")
+                    if self.stopped:
+                        break
+
+            self.rank_results()
+            cache_after = self.indicator_cache.stats()
+            self.summary = {
+                "symbol": symbol,
+                "mode": strategy,
+                "seed": seed,
+                "combinations": len(self.results),
+                "grid_size": searcher.grid_size,
+                "stopped": self._stop_reason,
+                "executor": executor,
+                "jobs": jobs_total,
+                "indicator_cache_hits": cache_after["hits"] - cache_before["hits"] + self._worker_hits,
+                "indicator_cache_misses": cache_after["misses"] - cache_before["misses"] + self._worker_misses,
+            }
+            log(f"Optimizer {strategy} search finished for {symbol}: {len(self.results)} combinations evaluated")
+            return self.results
+
+    async def run_walk_forward(
+        self,
+        symbol: str,
+        timeframe: str,
+        date_range: tuple[str, str],
+        parameter_ranges: dict[str, list[Any]],
+        base_settings: StrategySettings,
+        train_bars: int,
+        test_bars: int,
+        step_bars: int | None = None,
+        anchored: bool = False,
+        candle_file: str | None = None,
+        executor: str | None = None,
+        max_seconds: float | None = None,
+    ) -> dict[str, Any]:
+        """Walk-forward optimization over rolling train/test windows of the loaded history.
+
+        For each window the grid is searched on the train bars, and the best
+        combination (``rank_results`` order) is backtested on the following test
+        bars. All windows share one candle view and one indicator cache, and their
+        jobs run concurrently within the executor's usual parallelism. Returns the
+        per-window picks, a report over all out-of-sample trades and the stitched
+        out-of-sample equity curve. ``self.results`` lists one row per window with
+        the out-of-sample metrics.
+        """
+        self.results = []
+        self.summary = {}
+        executor = self._resolve_executor(executor)
+        with self._running(executor, max_seconds):
+            candles = await self._load_candles(symbol, timeframe, date_range, candle_file)
+            windows = plan_windows(len(candles), train_bars, test_bars, step_bars, anchored)
+            if not windows:
+                raise ValueError(f"{len(candles)} bars are too few for {train_bars} train + {test_bars} test bars")
+            grid_size = math.prod(len(values) for values in parameter_ranges.values())
+
+            cache_before = self.indicator_cache.stats()
+            self._worker_hits = 0
+            self._worker_misses = 0
+            log(
+                f"Walk-forward started for {symbol}: {len(windows)} windows x {grid_size} combinations "
+                f"({executor} executor)"
+            )
+            slots = asyncio.Semaphore(self._parallelism(executor))
+
+            async def _run_window(window: WalkForwardWindow) -> dict[str, Any] | None:
+                top = TopResults(1)
+
+                async def _on_results(results: list[dict[str, Any]]) -> None:
+                    for result in results:
+                        top.push(result)
+
+                jobs = self._grid_jobs(parameter_ranges, set())
+                await self._run_jobs(
+                    executor, pool, candles, base_settings, jobs, _on_results, window.train, slots=slots
+                )
+                if self.stopped or not len(top):
+                    return None
+                best = top.ranked()[0]
+                settings = _apply_params(base_settings, best["params"])
+                try:
+                    async with slots:
+                        report, engine = await asyncio.to_thread(
+                            _backtest_window, candles, settings, window.test, self.indicator_cache, self._cancel_event
+                        )
+                except BacktestCancelled:
+                    return None
+                log(
+                    f"Walk-forward window {window.index}/{len(windows)}: "
+                    f"out-of-sample profit {report['total_profit']:.4f}"
+                )
+                train = {key: value for key, value in best.items() if key not in ("params", "index")}
+                return {
+                    "window": window.index,
+                    **window_dates(candles.open_time, window),
+                    "params": best["params"],
+                    "train": train,
+                    "test": report,
+                    "engine": engine,
+                }
+
+            async with self._worker_pool(executor, candles, candle_file) as pool:
+                outcomes = await asyncio.gather(*(_run_window(window) for window in windows))
+
+            finished = [outcome for outcome in outcomes if outcome is not None]
+            engines = [outcome.pop("engine") for outcome in finished]
+            oos_equity = stitch_equity([engine.equity_curve for engine in engines])
+            oos_engine = BacktestEngine()
+            oos_engine.trade_results = [pnl for engine in engines for pnl in engine.trade_results]
+            oos_engine.trade_bars = [bars for engine in engines for bars in engine.trade_bars]
+            oos_engine.dca_fills = sum(engine.dca_fills for engine in engines)
+            oos_engine.exposure_bars = sum(engine.exposure_bars for engine in engines)
+            oos_engine.bars_simulated = sum(engine.bars_simulated for engine in engines)
+            oos_engine.equity_curve = oos_equity
+            oos_report = oos_engine.generate_report()
+
+            self.results = [
+                {"params": outcome["params"], "window": outcome["window"], **outcome["test"]} for outcome in finished
+            ]
+            cache_after = self.indicator_cache.stats()
+            self.summary = {
+                "symbol": symbol,
+                "mode": "walk_forward",
+                "windows": len(windows),
+                "windows_completed": len(finished),
+                "combinations": grid_size * len(windows),
+                "stopped": self._stop_reason,
+                "executor": executor,
+                "oos_total_profit": oos_report["total_profit"],
+                "indicator_cache_hits": cache_after["hits"] - cache_before["hits"] + self._worker_hits,
+                "indicator_cache_misses": cache_after["misses"] - cache_before["misses"] + self._worker_misses,
+            }
+            log(
+                f"Walk-forward finished for {symbol}: {len(finished)}/{len(windows)} windows, "
+                f"out-of-sample profit {oos_report['total_profit']:.4f}"
+            )
+            return {"windows": finished, "oos_report": oos_report, "oos_equity": oos_equity}
+
+    async def list_runs(self) -> list[dict[str, Any]]:
+        """Return checkpointed runs, most recently updated first."""
+        if self.result_store is None:
+            return []
+        await asyncio.to_thread(self.result_store.init_db)
+        return await asyncio.to_thread(self.result_store.list_runs)
 
-        await asyncio.gather(*(_run_combination(idx + 1, combo) for idx, combo in enumerate(combinations)))
+    async def load_run(self, run_id: str) -> list[dict[str, Any]]:
+        """Reopen a checkpointed run and rank its stored results without recomputing them."""
+        if self.result_store is None:
+            return []
+        await asyncio.to_thread(self.result_store.init_db)
+        stored = await asyncio.to_thread(self.result_store.load_results, run_id)
+        self.results = list(stored.values())
         self.rank_results()
+        self.summary = {"run_id": run_id, "combinations": len(self.results), "resumed": len(self.results)}
         return self.results
 
+    def _parallelism(self, executor: str) -> int:
+        if executor == "process":
+            return self.max_workers
+        if executor == "inline":
+            return 1
+        return self.max_parallel_tasks
+
+    def _resolve_executor(self, executor: str | None) -> str:
+        executor = executor or self.executor
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown optimizer executor: {executor}")
+        return executor
+
+    async def _start_checkpoint(
+        self,
+        run_id: str,
+        symbol: str,
+        timeframe: str,
+        date_range: tuple[str, str],
+        base_settings: StrategySettings,
+        parameter_ranges: dict[str, list[Any]],
+        combinations: int,
+    ) -> dict[str, dict[str, Any]]:
+        if self.result_store is None:
+            return {}
+        store = self.result_store
+        await asyncio.to_thread(store.init_db)
+        await asyncio.to_thread(
+            store.start_run, run_id, symbol, timeframe, date_range, base_settings, parameter_ranges, combinations
+        )
+        if range_is_open(date_range):
+            log(f"Optimizer run {run_id} covers candles that are not closed yet: starting over")
+            await asyncio.to_thread(store.clear_results, run_id)
+            return {}
+        return await asyncio.to_thread(store.load_results, run_id)
+
+    async def _load_candles(
+        self,
+        symbol: str,
+        timeframe: str,
+        date_range: tuple[str, str],
+        candle_file: str | None,
+    ) -> CandleArrays:
+        data_engine = BacktestEngine(kline_store=self.kline_store, kline_fetcher=self.kline_fetcher)
+        if candle_file is not None:
+            # memory-mapped history: every evaluation (and every optimizer process) reads the same pages
+            data_engine.load_candle_file(candle_file)
+        else:
+            await data_engine.load_historical_data(symbol, timeframe, date_range[0], date_range[1])
+        # one immutable view shared by all combinations; indicators live in per-run side arrays
+        return data_engine.candles.readonly()
+
+    @asynccontextmanager
+    async def _worker_pool(
+        self,
+        executor: str,
+        candles: CandleArrays,
+        candle_file: str | None,
+    ) -> AsyncIterator[ProcessPoolExecutor | None]:
+        """Yield a process pool whose workers map the candles once, or None for other executors."""
+        if executor != "process":
+            yield None
+            return
+
+        temp_file: str | None = None
+        worker_file = candle_file
+        if worker_file is None:
+            # workers map a temporary candle file instead of receiving pickled arrays per task
+            fd, temp_file = tempfile.mkstemp(suffix=".candles")
+            os.close(fd)
+            await asyncio.to_thread(write_candle_file, temp_file, candles)
+            worker_file = temp_file
+        pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(worker_file, self._cancel_event),
+        )
+        try:
+            yield pool
+        finally:
+            # workers may still be finishing a backtest: wait for them off the event loop
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+            if temp_file is not None:
+                os.remove(temp_file)
+
+    async def _run_jobs(
+        self,
+        executor: str,
+        pool: ProcessPoolExecutor | None,
+        candles: CandleArrays,
+        base_settings: StrategySettings,
+        jobs: Iterable[list[tuple[int, dict[str, Any]]]],
+        on_results: Callable[[list[dict[str, Any]]], Awaitable[None]],
+        window: tuple[int, int] | None = None,
+        max_evaluations: int | None = None,
+        slots: asyncio.Semaphore | None = None,
+    ) -> None:
+        """Evaluate jobs of ``(index, params)`` pairs and hand each job's results to ``on_results``.
+
+        Jobs are pulled from the iterable only when a slot is free, so a lazily
+        generated grid is never materialized and nothing new is dispatched once
+        the run is stopped. ``window`` restricts every backtest to bars
+        ``(start, stop)``; ``max_evaluations`` caps the combinations dispatched.
+        ``slots`` shares one concurrency limit between several concurrent calls.
+        Jobs interrupted by cancellation are dropped.
+        """
+        parallel = self._parallelism(executor)
+        loop = asyncio.get_running_loop()
+        pending_jobs = iter(jobs)
+        cancel_event = self._cancel_event
+        dispatched = 0
+
+        async def _worker() -> None:
+            nonlocal dispatched
+            while not self.stopped:
+                job = next(pending_jobs, None)
+                if job is None:
+                    return
+                if max_evaluations is not None:
+                    if dispatched >= max_evaluations:
+                        self._stop_reason = self._stop_reason or "evaluation_budget"
+                        return
+                    job = job[: max_evaluations - dispatched]
+                dispatched += len(job)
+                indices = [index for index, _ in job]
+                params_list = [params for _, params in job]
+                settings_list = [_apply_params(base_settings, params) for params in params_list]
+                try:
+                    async with slots or nullcontext():
+                        if pool is not None:
+                            results, hits, misses = await loop.run_in_executor(
+                                pool, _evaluate_in_worker, settings_list, params_list, window
+                            )
+                            self._worker_hits += hits
+                            self._worker_misses += misses
+                        elif executor == "inline":
+                            results = _evaluate_job(
+                                candles, settings_list, params_list, self.indicator_cache, cancel_event, window
+                            )
+                        else:
+                            results = await asyncio.to_thread(
+                                _evaluate_job,
+                                candles,
+                                settings_list,
+                                params_list,
+                                self.indicator_cache,
+                                cancel_event,
+                                window,
+                            )
+                except BacktestCancelled:
+                    return
+                for index, result in zip(indices, results, strict=True):
+                    result["index"] = index
+                await on_results(results)
+
+        try:
+            await asyncio.gather(*(_worker() for _ in range(parallel)))
+        except asyncio.CancelledError:
+            # let threads and pool workers abandon their backtests instead of finishing them
+            self._stop("cancelled")
+            raise
+
     async def evaluate_combination(
         self,
-        dataframe: Any,
+        candles: CandleArrays | Any,
         base_settings: StrategySettings,
         params: dict[str, Any],
     ) -> dict[str, Any]:
-        settings = deepcopy(base_settings)
-        for key, value in params.items():
-            setattr(settings, key, value)
-
-        def _run() -> dict[str, Any]:
-            engine = BacktestEngine()
-            engine.dataframe = dataframe.copy()
-            report = engine.run_backtest(settings)
-            return {
-                "params": params,
-                "total_profit": float(report.get("total_profit", 0.0)),
-                "win_rate": float(report.get("win_rate", 0.0)),
-                "max_drawdown": float(report.get("max_drawdown", 0.0)),
-                "profit_factor": float(report.get("profit_factor", 0.0)),
-                "total_trades": int(report.get("total_trades", 0)),
-            }
+        settings = _apply_params(base_settings, params)
+        if not isinstance(candles, CandleArrays):
+            candles = CandleArrays.from_dataframe(candles).readonly()
+        return await asyncio.to_thread(_evaluate, candles, settings, params, self.indicator_cache)
+
+    def _build_jobs(
+        self, combinations: list[dict[str, Any]], indices: list[int]
+    ) -> list[list[tuple[int, dict[str, Any]]]]:
+        """Split 1-based combination indices into jobs, grouping by entry parameters when batched."""
+        if not self.batched:
+            return [[(index, combinations[index - 1])] for index in indices]
 
-        return await asyncio.to_thread(_run)
+        groups: dict[tuple[Any, ...], list[tuple[int, dict[str, Any]]]] = {}
+        for index in indices:
+            combo = combinations[index - 1]
+            key = tuple((name, value) for name, value in combo.items() if name not in EXIT_PARAMETERS)
+            groups.setdefault(key, []).append((index, combo))
+
+        jobs: list[list[tuple[int, dict[str, Any]]]] = []
+        for group in groups.values():
+            for start in range(0, len(group), self.batch_size):
+                jobs.append(group[start : start + self.batch_size])
+        return jobs
+
+    @staticmethod
+    def _grid_combinations(parameter_ranges: dict[str, list[Any]]) -> Iterator[tuple[int, dict[str, Any]]]:
+        keys = list(parameter_ranges.keys())
+        for index, combo in enumerate(itertools.product(*parameter_ranges.values()), start=1):
+            yield index, dict(zip(keys, combo, strict=True))
+
+    def _grid_jobs(
+        self, parameter_ranges: dict[str, list[Any]], done: set[str]
+    ) -> Iterator[list[tuple[int, dict[str, Any]]]]:
+        """Lazily yield grid jobs, skipping combinations whose ``combo_key`` is in ``done``.
+
+        Indices match ``itertools.product`` order. When batched, entry parameters
+        form the outer loop so each job shares them and fits the batch kernel.
+        """
+        keys = list(parameter_ranges.keys())
+        values = [list(parameter_ranges[key]) for key in keys]
+        strides = [math.prod(len(v) for v in values[position + 1 :]) for position in range(len(keys))]
+        if self.batched:
+            outer = [position for position, key in enumerate(keys) if key not in EXIT_PARAMETERS]
+            inner = [position for position, key in enumerate(keys) if key in EXIT_PARAMETERS]
+        else:
+            outer, inner = list(range(len(keys))), []
+
+        for outer_choice in itertools.product(*(range(len(values[position])) for position in outer)):
+            job: list[tuple[int, dict[str, Any]]] = []
+            for inner_choice in itertools.product(*(range(len(values[position])) for position in inner)):
+                choice = [0] * len(keys)
+                for position, value_index in zip(outer, outer_choice, strict=True):
+                    choice[position] = value_index
+                for position, value_index in zip(inner, inner_choice, strict=True):
+                    choice[position] = value_index
+                params = {key: values[position][choice[position]] for position, key in enumerate(keys)}
+                if done and combo_key(params) in done:
+                    continue
+                index = 1 + sum(value_index * stride for value_index, stride in zip(choice, strides, strict=True))
+                job.append((index, params))
+                if len(job) >= self.batch_size:
+                    yield job
+                    job = []
+            if job:
+                yield job
 
     def rank_results(self) -> None:
-        self.results.sort(
-            key=lambda x: (
-                -float(x["profit_factor"]),
-                float(x["max_drawdown"]),
-                -float(x["total_profit"]),
-            )
-        )
+        self.results.sort(key=rank_key)
 
     def get_top_results(self, n: int = 10) -> list[dict[str, Any]]:
         if n <= 0:
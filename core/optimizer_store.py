@@ -0,0 +1,168 @@
+"""SQLite checkpoint store for optimizer runs and their evaluated combinations."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from strategy.base_strategy import StrategySettings
+
+# part of every run key: bump whenever backtest or report semantics change, so
+# checkpoints holding metrics from older simulation rules are never resumed
+# (keys written before the version existed count as 1)
+RESULTS_VERSION = 2
+
+
+def run_key(
+    symbol: str,
+    timeframe: str,
+    date_range: tuple[str, str],
+    base_settings: StrategySettings,
+    candle_file: str | None = None,
+) -> str:
+    """Hash identifying an optimizer run independently of the parameter ranges searched."""
+    payload = {
+        "results_version": RESULTS_VERSION,
+        "symbol": symbol.upper(),
+        "timeframe": timeframe,
+        "date_range": list(date_range),
+        "base_settings": asdict(base_settings),
+        "candle_file": candle_file,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:32]
+
+
+def range_is_open(date_range: tuple[str, str], now_ms: int | None = None) -> bool:
+    """Whether the range ends at or after now: its candles can still change, so it is never resumed."""
+    end_ms = int(datetime.fromisoformat(date_range[1]).replace(tzinfo=timezone.utc).timestamp() * 1000)
+    return end_ms >= (int(time.time() * 1000) if now_ms is None else now_ms)
+
+
+def combo_key(params: dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+class OptimizerStore:
+    """Persists each evaluated combination as soon as it completes so runs can resume."""
+
+    def __init__(self, db_path: str = "optimizer.db") -> None:
+        self.db_path = Path(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS optimizer_runs (
+                    run_id TEXT PRIMARY KEY,
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    start_date TEXT NOT NULL,
+                    end_date TEXT NOT NULL,
+                    base_settings_json TEXT NOT NULL,
+                    parameter_ranges_json TEXT NOT NULL,
+                    combinations INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS optimizer_results (
+                    run_id TEXT NOT NULL,
+                    combo_key TEXT NOT NULL,
+                    result_json TEXT NOT NULL,
+                    PRIMARY KEY (run_id, combo_key)
+                )
+                """
+            )
+
+    def start_run(
+        self,
+        run_id: str,
+        symbol: str,
+        timeframe: str,
+        date_range: tuple[str, str],
+        base_settings: StrategySettings,
+        parameter_ranges: dict[str, list[Any]],
+        combinations: int,
+    ) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO optimizer_runs(
+                    run_id, symbol, timeframe, start_date, end_date,
+                    base_settings_json, parameter_ranges_json, combinations, status, updated_at
+                )
+                VALUES(?, ?, ?, ?, ?, ?, ?, ?, 'running', CURRENT_TIMESTAMP)
+                ON CONFLICT(run_id) DO UPDATE SET
+                    parameter_ranges_json = excluded.parameter_ranges_json,
+                    combinations = excluded.combinations,
+                    status = 'running',
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (
+                    run_id,
+                    symbol.upper(),
+                    timeframe,
+                    date_range[0],
+                    date_range[1],
+                    json.dumps(asdict(base_settings)),
+                    json.dumps(parameter_ranges),
+                    combinations,
+                ),
+            )
+
+    def save_results(self, run_id: str, results: list[dict[str, Any]]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO optimizer_results(run_id, combo_key, result_json) VALUES(?, ?, ?)",
+                [(run_id, combo_key(result["params"]), json.dumps(result)) for result in results],
+            )
+            conn.execute("UPDATE optimizer_runs SET updated_at = CURRENT_TIMESTAMP WHERE run_id = ?", (run_id,))
+
+    def clear_results(self, run_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM optimizer_results WHERE run_id = ?", (run_id,))
+
+    def finish_run(self, run_id: str, status: str = "complete") -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE optimizer_runs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE run_id = ?",
+                (status, run_id),
+            )
+
+    def load_results(self, run_id: str) -> dict[str, dict[str, Any]]:
+        """Return stored results of a run keyed by ``combo_key(params)``."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT combo_key, result_json FROM optimizer_results WHERE run_id = ?",
+                (run_id,),
+            ).fetchall()
+        return {str(row["combo_key"]): json.loads(row["result_json"]) for row in rows}
+
+    def list_runs(self) -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT r.run_id, r.symbol, r.timeframe, r.start_date, r.end_date, r.combinations, r.status,
+                       r.updated_at, COUNT(res.combo_key) AS evaluated
+                FROM optimizer_runs r
+                LEFT JOIN optimizer_results res ON res.run_id = r.run_id
+                GROUP BY r.run_id
+                ORDER BY r.updated_at DESC
+                """
+            ).fetchall()
+        return [dict(row) for row in rows]
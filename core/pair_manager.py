@@ -6,14 +6,26 @@ import asyncio
 import importlib
 import traceback
 from collections.abc import Callable
+from typing import TYPE_CHECKING
 
+from core.candles import PRICE_COLUMNS, CandleArrays
 from core.order_manager import OrderManager
 from core.websocket_manager import Candle, WebSocketManager
 from exchanges.base_exchange import BaseExchange
 from strategy.base_strategy import BaseStrategy, StrategySettings
-from strategy.indicators import IndicatorEngine
+from strategy.indicators import IncrementalIndicatorEngine
+from strategy.signals import (
+    VOLUME_LOOKBACK,
+    IndicatorSnapshot,
+    condition_indicators,
+    condition_lookback,
+    uses_expressions,
+)
 from utils.logger import log
 
+if TYPE_CHECKING:
+    from core.signal_engine import SignalEngine
+
 
 class PairWorker:
     """Independent async worker for one trading pair."""
@@ -31,6 +43,7 @@ class PairWorker:
         on_price_update: Callable[[str, float], None] | None = None,
         exposure_provider: Callable[[], float] | None = None,
         on_runtime_update: Callable[[str], None] | None = None,
+        signal_engine: SignalEngine | None = None,
     ) -> None:
         self.pair_name = pair_name
         self.mode = mode
@@ -44,11 +57,14 @@ class PairWorker:
         self._on_runtime_update = on_runtime_update
         self.strategy_settings = settings
         self.strategy = BaseStrategy(settings)
-        self.indicator_engine = IndicatorEngine()
+        self.signal_engine = signal_engine
 
         self.running = False
         self.candles: list[Candle] = []
         self._last_candle_version = 0
+        self._indicator_version = 0
+        # indicator state advanced once per closed candle instead of recomputed over the window
+        self.indicators = IncrementalIndicatorEngine()
 
         self.position_open = False
         self.order_in_progress = False
@@ -118,8 +134,8 @@ class PairWorker:
         if self.position_open:
             self._pending_strategy_settings = settings
             return
-        self.strategy_settings = settings
         self.strategy = BaseStrategy(settings)
+        self.strategy_settings = settings
 
     async def start(self) -> None:
         self.running = True
@@ -169,22 +185,22 @@ class PairWorker:
             return
 
         self._last_candle_version = version
-        min_len = max(self.strategy_settings.ema_period, self.strategy_settings.rsi_period, self.strategy_settings.adx_period)
-        if len(self.candles) < min_len:
-            return
-
         try:
-            pandas = importlib.import_module("pandas")
-        except ModuleNotFoundError:
-            log("pandas is not installed. Install dependencies from requirements.txt")
+            if self.signal_engine is not None:
+                # evaluated together with every other pair whose candle closed in this tick
+                signal = self.signal_engine.signal_for(self, version)
+            elif self.prepare_signal(version):
+                # only the volume filter looks back; indicators come from the incremental state
+                candles = self._candle_arrays(max(VOLUME_LOOKBACK, condition_lookback(self.strategy_settings)) + 1)
+                size = len(candles)
+                signal = self.strategy.generate_signal(
+                    candles, lambda name, period: self.indicators.latest_column(name, period, size), version
+                )
+            else:
+                signal = None
+        except ModuleNotFoundError as exc:
+            log(f"{exc.name} is not installed. Install dependencies from requirements.txt")
             return
-
-        df = pandas.DataFrame(
-            [{"open": c.open, "high": c.high, "low": c.low, "close": c.close, "volume": c.volume} for c in self.candles]
-        )
-
-        _ = self.indicator_engine.calculate_atr(df, self.strategy_settings.adx_period)
-        signal = self.strategy.generate_signal(df)
         if signal:
             report_key = "LONG_TEXT" if signal == "LONG" else "SHORT_TEXT"
             report_text = str(self.strategy.last_condition_report.get(report_key, ""))
@@ -196,6 +212,47 @@ class PairWorker:
             await self._open_initial_position()
 
 
+    def prepare_signal(self, version: int) -> bool:
+        """Advance the indicators to candle ``version`` (once per version); False while they warm up."""
+        if version != self._indicator_version:
+            self._sync_latest_candles()
+            try:
+                self._advance_indicators(version - self._indicator_version)
+            except Exception:
+                # some states may have taken the candle already: start over from the cache next time
+                self.indicators.seed([])
+                raise
+            self._indicator_version = version
+        settings = self.strategy_settings
+        if uses_expressions(settings):
+            min_len = max((period for _, period in condition_indicators(settings)), default=1)
+        else:
+            min_len = max(settings.ema_period, settings.rsi_period, settings.adx_period)
+        return self.indicators.bars >= min_len
+
+    @property
+    def indicator_snapshot(self) -> IndicatorSnapshot | None:
+        """Indicators and filter checks of the last processed candle (read-only, no recomputation)."""
+        return self.strategy.last_snapshot
+
+    def _advance_indicators(self, new_candles: int) -> None:
+        """Feed the candles closed since the last check, reseeding from the cache when they are not all in it."""
+        if self.indicators.bars == 0 or not 0 < new_candles <= len(self.candles):
+            self.indicators.seed(self.candles)
+            return
+        for candle in self.candles[len(self.candles) - new_candles :]:
+            self.indicators.update(candle)
+
+    def _candle_arrays(self, limit: int | None = None) -> CandleArrays:
+        """Columnar view of the last ``limit`` cached candles for the vectorized condition builder."""
+        numpy = importlib.import_module("numpy")
+        candles = self.candles if limit is None else self.candles[-limit:]
+        prices = numpy.array(
+            [(c.open, c.high, c.low, c.close, c.volume) for c in candles], dtype=numpy.float64
+        ).reshape(-1, len(PRICE_COLUMNS))
+        columns = (numpy.ascontiguousarray(prices[:, i]) for i in range(len(PRICE_COLUMNS)))
+        return CandleArrays(numpy.arange(len(candles), dtype=numpy.int64), *columns)
+
     def _is_entry_blocked(self) -> bool:
         now = asyncio.get_running_loop().time()
         cooldown_sec = max(0.0, self.strategy_settings.cooldown_minutes * 60.0)
@@ -0,0 +1,350 @@
+"""Multi-symbol portfolio backtest: N pairs stepped together under shared exposure and risk limits."""
+
+from __future__ import annotations
+
+import importlib
+from collections.abc import Mapping
+from typing import Any
+
+from core.backtest_engine import BacktestEngine
+from core.batch_kernel import stop_loss_rule
+from core.cancellation import CANCEL_CHECK_MASK, BacktestCancelled, CancelEvent
+from core.candles import CandleArrays
+from core.risk_manager import RiskManager
+from strategy.base_strategy import StrategySettings
+from utils.logger import log
+
+DEFAULT_INITIAL_BALANCE = 1000.0
+# working set of one chunk of the common time index (price/signal matrices and alignment scratch)
+DEFAULT_MEMORY_BUDGET_MB = 256.0
+MIN_CHUNK_ROWS = 1024
+# bytes per symbol per chunk row: close matrix, signal codes, concatenated open times, row positions
+_BYTES_PER_CELL = 8 + 1 + 8 + 8
+
+# per-bar signal codes kept for every symbol between the signal pass and the simulation
+_NOT_READY, _READY, _ENTRY = 0, 1, 2
+
+
+def simulate_portfolio(
+    candles: Mapping[str, CandleArrays],
+    settings: StrategySettings | Mapping[str, StrategySettings],
+    initial_balance: float = DEFAULT_INITIAL_BALANCE,
+    memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+    cancel_event: CancelEvent | None = None,
+    stop_on_loss_streak: bool = True,
+) -> dict[str, Any]:
+    """Backtest several symbols on one account, bar by bar on their common time index.
+
+    Each symbol follows ``BacktestEngine._run_array_loop`` (close fills, DCA, TP,
+    break-even, stop loss, cooldown and anti-reentry), with the couplings live
+    trading adds across pairs:
+
+    * entries are sized like ``OrderManager.calculate_entry_size_usdt`` (fixed or
+      risk-based) against a balance of ``initial_balance`` plus realized PnL, and
+      skipped when open ``total_cost`` plus the new notional would exceed
+      ``max_total_exposure_pct`` of that balance; safety orders are not capped;
+    * every exit is registered with a ``RiskManager`` in bar order (symbols in
+      the given order within a bar). Once it asks to stop all pairs no new
+      position is opened; positions already open keep their exits, since the
+      exchange or the operator still has to close them. ``stop_on_loss_streak=False``
+      keeps trading through loss streaks.
+
+    ``settings`` is shared or given per symbol. Symbols without a bar at a time
+    stamp simply sit that row out. Entry signals are computed per symbol over its
+    whole history and packed to one byte per bar; prices are read from
+    ``candles`` (memory-mapped candle files keep them out of RAM) one chunk of
+    the time index at a time, with chunks sized to ``memory_budget_mb``.
+
+    Returns ``{"symbols", "pairs", "combined", "open_time", "equity_curve"}``:
+    per-pair and combined reports in the ``BacktestEngine.generate_report``
+    format (the combined one adds balance, exposure and halt details) and the
+    account's realized PnL after every row of the time index.
+    """
+    numpy = importlib.import_module("numpy")
+    symbols = list(candles)
+    if not symbols:
+        raise ValueError("Portfolio backtest requires at least one symbol")
+    pair_settings = [settings[symbol] if isinstance(settings, Mapping) else settings for symbol in symbols]
+    if any(s.backtest_fill_model != "Close" for s in pair_settings):
+        raise ValueError("Portfolio backtests support the Close fill model only")
+    count = len(symbols)
+
+    def _param(getter: Any) -> Any:
+        return numpy.array([getter(s) for s in pair_settings], dtype=numpy.float64)
+
+    futures = numpy.array([s.enable_futures for s in pair_settings])
+    futures_long = numpy.array([s.futures_position_side.upper() == "LONG" for s in pair_settings])
+    tp_pct = _param(lambda s: s.take_profit_pct / 100.0)
+    tp_up, tp_down = 1 + tp_pct, 1 - tp_pct
+    step = _param(lambda s: s.safety_step_pct / 100.0)
+    step_down, step_up = 1 - step, 1 + step
+    volume_multiplier = _param(lambda s: s.volume_multiplier)
+    safety_count = _param(lambda s: s.safety_orders_count)
+    break_even_pct = _param(lambda s: s.break_even_after_percent)
+    commission_rate = _param(lambda s: s.commission_pct / 100.0)
+    stop_modes = [stop_loss_rule(s)[0] for s in pair_settings]
+    stop_enabled = numpy.array([mode in ("Always", "After Last Safety") for mode in stop_modes])
+    stop_always = numpy.array([mode == "Always" for mode in stop_modes])
+    stop_pct = _param(lambda s: stop_loss_rule(s)[1])
+    stop_down, stop_up = 1 - stop_pct, 1 + stop_pct
+    cooldown_ms = _param(lambda s: s.cooldown_minutes * 60_000.0)
+    reentry_pct = _param(lambda s: s.anti_reentry_threshold_pct)
+
+    in_pos = numpy.zeros(count, dtype=bool)
+    is_long = numpy.zeros(count, dtype=bool)
+    armed = numpy.zeros(count, dtype=bool)
+    total_qty = numpy.zeros(count)
+    total_cost = numpy.zeros(count)
+    average = numpy.zeros(count)
+    last_usdt = numpy.zeros(count)
+    safety_used = numpy.zeros(count)
+    entry_bar = numpy.zeros(count, dtype=numpy.int64)
+    dca_fills = numpy.zeros(count, dtype=numpy.int64)
+    # signed level keys as in ``simulate_exit_grid``; idle slots hold -inf/+inf
+    sign = numpy.ones(count)
+    dca_key = numpy.full(count, -numpy.inf)
+    tp_key = numpy.full(count, numpy.inf)
+    be_key = numpy.full(count, -numpy.inf)
+    sl_key = numpy.full(count, -numpy.inf)
+    last_exit_time = numpy.full(count, -numpy.inf)
+    last_exit_price = numpy.zeros(count)
+
+    def _refresh_levels(mask: Any) -> None:
+        dca_level = numpy.where(is_long, average * step_down, average * step_up)
+        dca_level = numpy.where(safety_used < safety_count, sign * dca_level, -numpy.inf)
+        numpy.copyto(dca_key, dca_level, where=mask)
+        numpy.copyto(tp_key, sign * numpy.where(is_long, average * tp_up, average * tp_down), where=mask)
+        numpy.copyto(be_key, sign * average, where=mask & armed)
+        active = stop_enabled & ((safety_used >= safety_count) | stop_always)
+        stop_level = numpy.where(is_long, average * stop_down, average * stop_up)
+        numpy.copyto(sl_key, numpy.where(active, sign * stop_level, -numpy.inf), where=mask)
+
+    codes = [_signal_codes(candles[symbol], s, cancel_event) for symbol, s in zip(symbols, pair_settings, strict=True)]
+    open_times = [candles[symbol].open_time for symbol in symbols]
+    closes = [candles[symbol].close for symbol in symbols]
+    lengths = [int(len(candles[symbol])) for symbol in symbols]
+
+    risk_manager = RiskManager()
+    risk_manager.initialize()
+    halted_at: int | None = None
+    realized = 0.0
+    skipped_entries = 0
+    peak_exposure = 0.0
+    trade_results: list[list[float]] = [[] for _ in symbols]
+    trade_bars: list[list[int]] = [[] for _ in symbols]
+    exit_rows: list[int] = []
+    exit_pnl: list[float] = []
+    exit_held: list[int] = []
+    time_chunks: list[Any] = []
+    busy_rows = 0
+    row_offset = 0
+    open_count = 0
+
+    budget_bytes = max(0.0, float(memory_budget_mb)) * 1024 * 1024
+    chunk_rows = max(MIN_CHUNK_ROWS, int(budget_bytes // (count * _BYTES_PER_CELL + 8)))
+    cursors = [0] * count
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        while any(cursor < length for cursor, length in zip(cursors, lengths, strict=True)):
+            # the chunk ends where the first symbol runs out of ``chunk_rows`` bars,
+            # so no symbol contributes more than ``chunk_rows`` bars to it
+            limits = [
+                int(open_times[k][cursors[k] + chunk_rows]) for k in range(count) if cursors[k] + chunk_rows < lengths[k]
+            ]
+            chunk_end = min(limits) if limits else None
+            stops = [
+                lengths[k] if chunk_end is None else max(cursors[k], int(numpy.searchsorted(open_times[k], chunk_end)))
+                for k in range(count)
+            ]
+            slices = [numpy.asarray(open_times[k][cursors[k] : stops[k]]) for k in range(count)]
+            times = numpy.unique(numpy.concatenate(slices))
+            rows = int(times.shape[0])
+            symbol_rows = [numpy.searchsorted(times, times_k) for times_k in slices]
+            close_matrix = numpy.full((rows, count), numpy.nan)
+            code_matrix = numpy.zeros((rows, count), dtype=numpy.int8)
+            for k in range(count):
+                close_matrix[symbol_rows[k], k] = closes[k][cursors[k] : stops[k]]
+                code_matrix[symbol_rows[k], k] = codes[k][cursors[k] : stops[k]]
+            entry_rows = (code_matrix == _ENTRY).any(axis=1).tolist()
+            time_list = times.tolist()
+            del slices
+
+            def _local_bar(k: int, row: int) -> int:
+                return cursors[k] + int(numpy.searchsorted(symbol_rows[k], row))
+
+            for row in range(rows):
+                if cancel_event is not None and not row & CANCEL_CHECK_MASK and cancel_event.is_set():
+                    raise BacktestCancelled(f"Portfolio backtest cancelled at row {row_offset + row}")
+                if open_count:
+                    busy_rows += 1
+                elif not entry_rows[row] or halted_at is not None:
+                    continue
+                price = close_matrix[row]
+                active = code_matrix[row] > _NOT_READY
+                now = time_list[row]
+
+                entering = None
+                if entry_rows[row] and halted_at is None:
+                    moved = numpy.abs(price - last_exit_price) / last_exit_price * 100.0
+                    entering = (code_matrix[row] == _ENTRY) & ~in_pos
+                    entering &= now - last_exit_time >= cooldown_ms
+                    entering &= ~((last_exit_price > 0) & (moved < reentry_pct))
+
+                if open_count:
+                    signed_price = sign * price
+                    # DCA
+                    trigger = active & (signed_price <= dca_key)
+                    if trigger.any():
+                        next_usdt = last_usdt * volume_multiplier
+                        added_qty = next_usdt / numpy.maximum(price, 1e-9)
+                        numpy.add(total_qty, added_qty, out=total_qty, where=trigger)
+                        numpy.add(total_cost, added_qty * price, out=total_cost, where=trigger)
+                        numpy.copyto(average, total_cost / numpy.maximum(total_qty, 1e-9), where=trigger)
+                        numpy.copyto(last_usdt, next_usdt, where=trigger)
+                        numpy.add(safety_used, trigger, out=safety_used)
+                        numpy.add(dca_fills, trigger, out=dca_fills)
+                        _refresh_levels(trigger)
+                        # safety orders are not capped: they can push exposure past any entry-time peak
+                        peak_exposure = max(peak_exposure, float(total_cost[in_pos].sum()))
+
+                    # break-even arming (futures only), then stop loss, break-even and TP at the close
+                    gain = sign * (price - average) / average * 100.0
+                    arm = active & in_pos & futures & ~armed & (gain >= break_even_pct)
+                    if arm.any():
+                        numpy.logical_or(armed, arm, out=armed)
+                        numpy.copyto(be_key, sign * average, where=arm)
+                    exits = (signed_price >= tp_key) | (signed_price <= be_key) | (signed_price <= sl_key)
+                    exits &= active
+
+                    if exits.any():
+                        commission = commission_rate * total_qty * price
+                        gross = numpy.where(is_long, total_qty * price, total_qty * (2 * average - price))
+                        pnl = ((gross - commission) - total_cost).tolist()
+                        for k in numpy.flatnonzero(exits).tolist():
+                            held = _local_bar(k, row) - int(entry_bar[k])
+                            trade_results[k].append(pnl[k])
+                            trade_bars[k].append(held)
+                            exit_rows.append(row_offset + row)
+                            exit_pnl.append(pnl[k])
+                            exit_held.append(held)
+                            realized += pnl[k]
+                            stop = risk_manager.register_trade_result(pnl[k])
+                            if stop and stop_on_loss_streak and halted_at is None:
+                                halted_at = now
+                                log(f"Portfolio backtest: 3 consecutive losses at {now}, no new entries")
+                        numpy.logical_and(in_pos, ~exits, out=in_pos)
+                        numpy.logical_and(armed, ~exits, out=armed)
+                        numpy.copyto(dca_key, -numpy.inf, where=exits)
+                        numpy.copyto(tp_key, numpy.inf, where=exits)
+                        numpy.copyto(be_key, -numpy.inf, where=exits)
+                        numpy.copyto(sl_key, -numpy.inf, where=exits)
+                        numpy.copyto(last_exit_price, price, where=exits)
+                        numpy.copyto(last_exit_time, now, where=exits)
+                        open_count -= int(exits.sum())
+
+                if entering is not None and entering.any() and halted_at is None:
+                    balance = initial_balance + realized
+                    exposure = float(total_cost[in_pos].sum())
+                    opened = numpy.zeros(count, dtype=bool)
+                    for k in numpy.flatnonzero(entering).tolist():
+                        notional = _entry_notional(pair_settings[k], balance, float(price[k]))
+                        if notional is None or exposure + notional > balance * pair_settings[k].max_total_exposure_pct / 100.0:
+                            skipped_entries += 1
+                            continue
+                        entry_price = float(price[k])
+                        qty = notional / max(entry_price, 1e-9)
+                        direction_long = bool(futures_long[k]) if futures[k] else True
+                        total_qty[k] = qty
+                        total_cost[k] = qty * entry_price
+                        average[k] = entry_price
+                        last_usdt[k] = notional
+                        safety_used[k] = 0.0
+                        entry_bar[k] = _local_bar(k, row)
+                        is_long[k] = direction_long
+                        sign[k] = 1.0 if direction_long else -1.0
+                        armed[k] = False
+                        in_pos[k] = True
+                        opened[k] = True
+                        exposure += float(total_cost[k])
+                        open_count += 1
+                    if opened.any():
+                        _refresh_levels(opened)
+                        peak_exposure = max(peak_exposure, exposure)
+
+            time_chunks.append(times)
+            row_offset += rows
+            cursors = stops
+            del close_matrix, code_matrix
+
+    total_rows = row_offset
+    equity_curve = numpy.zeros(total_rows + 1)
+    numpy.add.at(equity_curve, numpy.asarray(exit_rows, dtype=numpy.int64) + 1, exit_pnl)
+    numpy.add.accumulate(equity_curve, out=equity_curve)
+
+    pairs: dict[str, dict[str, float | int]] = {}
+    for k, symbol in enumerate(symbols):
+        open_tail = lengths[k] - 1 - int(entry_bar[k]) if in_pos[k] else 0
+        pairs[symbol] = _report(trade_results[k], trade_bars[k], int(dca_fills[k]), sum(trade_bars[k]) + open_tail, lengths[k])
+
+    combined: dict[str, Any] = _report(exit_pnl, exit_held, int(dca_fills.sum()), busy_rows, total_rows)
+    combined.update(
+        {
+            "pairs": count,
+            "initial_balance": float(initial_balance),
+            "final_balance": float(initial_balance + realized),
+            "open_positions": open_count,
+            "open_exposure_usdt": float(total_cost[in_pos].sum()),
+            "peak_exposure_usdt": peak_exposure,
+            "skipped_entries": skipped_entries,
+            "halted_at": halted_at,
+        }
+    )
+    log(f"Portfolio backtest complete: pairs={count} trades={combined['total_trades']} profit={combined['total_profit']:.4f}")
+    return {
+        "symbols": symbols,
+        "pairs": pairs,
+        "combined": combined,
+        "open_time": numpy.concatenate(time_chunks) if time_chunks else numpy.zeros(0, dtype=numpy.int64),
+        "equity_curve": equity_curve,
+    }
+
+
+def _signal_codes(candles: CandleArrays, settings: StrategySettings, cancel_event: CancelEvent | None) -> Any:
+    """One byte per bar: not ready, ready, or ready with a LONG entry signal."""
+    numpy = importlib.import_module("numpy")
+    engine = BacktestEngine(cancel_event=cancel_event)
+    engine.candles = candles
+    if len(candles) == 0:
+        return numpy.zeros(0, dtype=numpy.int8)
+    _, ready, long_signal, _ = engine.build_entry_signals(settings)
+    codes = ready.astype(numpy.int8)
+    codes[long_signal] = _ENTRY
+    return codes
+
+
+def _report(
+    trade_results: list[float],
+    trade_bars: list[int],
+    dca_fills: int,
+    exposure_bars: int,
+    bars: int,
+) -> dict[str, float | int]:
+    engine = BacktestEngine()
+    engine.trade_results = trade_results
+    engine.trade_bars = trade_bars
+    engine.dca_fills = dca_fills
+    engine.exposure_bars = exposure_bars
+    engine.bars_simulated = bars
+    return engine.generate_report()
+
+
+def _entry_notional(settings: StrategySettings, balance: float, price: float) -> float | None:
+    """Entry size in USDT as ``OrderManager.calculate_entry_size_usdt`` computes it, None when skipped."""
+    if balance <= 0 or price <= 0:
+        return None
+    if settings.position_size_mode != "Risk-based":
+        return settings.base_order_size_usdt
+    risk_amount = balance * (settings.risk_per_trade_pct / 100.0)
+    stop_distance = max(price * (settings.safety_step_pct / 100.0), price * 0.001)
+    notional = risk_amount / max(stop_distance, 1e-9) * price
+    return notional * max(settings.leverage, 1) if settings.enable_futures else notional
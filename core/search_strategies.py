@@ -0,0 +1,163 @@
+"""Sampling strategies that propose optimizer parameter sets instead of walking the full grid."""
+
+from __future__ import annotations
+
+import math
+import random
+from typing import Any
+
+
+def rank_key(result: dict[str, Any]) -> tuple[float, float, float]:
+    """Ranking used everywhere in the optimizer: profit factor, then drawdown, then profit."""
+    return (
+        -float(result["profit_factor"]),
+        float(result["max_drawdown"]),
+        -float(result["total_profit"]),
+    )
+
+
+class SearchStrategy:
+    """Proposes parameter sets from ``parameter_ranges`` without repeating one.
+
+    The optimizer calls ``ask`` for a batch of candidates, evaluates them and
+    reports the results back with ``tell``. Candidates are drawn from the same
+    value lists a grid search would use, so every proposal is also a grid point.
+    ``round_size`` is how many candidates to ask for between ``tell`` calls
+    (None: the whole budget at once).
+    """
+
+    round_size: int | None = None
+
+    def __init__(self, parameter_ranges: dict[str, list[Any]], seed: int = 0) -> None:
+        self.names = list(parameter_ranges.keys())
+        self.values = [list(dict.fromkeys(parameter_ranges[name])) for name in self.names]
+        self.grid_size = math.prod(len(values) for values in self.values)
+        self.rng = random.Random(seed)
+        self.seen: set[tuple[int, ...]] = set()
+        self.history: list[tuple[tuple[int, ...], dict[str, Any]]] = []
+
+    def ask(self, count: int) -> list[dict[str, Any]]:
+        proposals: list[dict[str, Any]] = []
+        while len(proposals) < count and len(self.seen) < self.grid_size:
+            point = self._propose()
+            self.seen.add(point)
+            proposals.append(self._params(point))
+        return proposals
+
+    def tell(self, results: list[dict[str, Any]]) -> None:
+        for result in results:
+            self.history.append((self._point(result["params"]), result))
+
+    def _propose(self) -> tuple[int, ...]:
+        return self._random_unseen()
+
+    def _random_unseen(self) -> tuple[int, ...]:
+        for _ in range(64):
+            point = tuple(self.rng.randrange(len(values)) for values in self.values)
+            if point not in self.seen:
+                return point
+        # nearly exhausted grid: pick among the remaining points directly
+        remaining = [index for index in range(self.grid_size) if self._decode(index) not in self.seen]
+        return self._decode(self.rng.choice(remaining))
+
+    def _decode(self, index: int) -> tuple[int, ...]:
+        point: list[int] = []
+        for values in reversed(self.values):
+            index, position = divmod(index, len(values))
+            point.append(position)
+        return tuple(reversed(point))
+
+    def _params(self, point: tuple[int, ...]) -> dict[str, Any]:
+        return {name: values[i] for name, values, i in zip(self.names, self.values, point, strict=True)}
+
+    def _point(self, params: dict[str, Any]) -> tuple[int, ...]:
+        return tuple(values.index(params[name]) for name, values in zip(self.names, self.values, strict=True))
+
+
+class RandomSearch(SearchStrategy):
+    """Uniform sampling of grid points without replacement."""
+
+
+class TPESearch(SearchStrategy):
+    """Tree-structured Parzen estimator over the discrete grid.
+
+    After ``n_startup`` random points, completed results are split into the best
+    ``gamma`` fraction and the rest. Each parameter gets a smoothed density over its
+    value positions for both groups; the candidate (out of ``n_candidates`` drawn
+    from the "good" densities) with the highest good/bad likelihood ratio is proposed.
+    """
+
+    round_size = 32
+
+    def __init__(
+        self,
+        parameter_ranges: dict[str, list[Any]],
+        seed: int = 0,
+        n_startup: int = 20,
+        gamma: float = 0.25,
+        n_candidates: int = 24,
+    ) -> None:
+        super().__init__(parameter_ranges, seed)
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self._densities: tuple[list[list[float]], list[list[float]]] | None = None
+
+    def tell(self, results: list[dict[str, Any]]) -> None:
+        super().tell(results)
+        self._densities = None
+
+    def _propose(self) -> tuple[int, ...]:
+        if len(self.history) < self.n_startup:
+            return self._random_unseen()
+        if self._densities is None:
+            ordered = sorted(self.history, key=lambda item: rank_key(item[1]))
+            split = max(1, math.ceil(self.gamma * len(ordered)))
+            good = [point for point, _ in ordered[:split]]
+            bad = [point for point, _ in ordered[split:]]
+            self._densities = (self._fit(good), self._fit(bad))
+        good_density, bad_density = self._densities
+
+        best: tuple[int, ...] | None = None
+        best_score = -math.inf
+        for _ in range(self.n_candidates):
+            point = tuple(self._sample(weights) for weights in good_density)
+            if point in self.seen:
+                continue
+            score = sum(
+                math.log(good_density[dim][i]) - math.log(bad_density[dim][i]) for dim, i in enumerate(point)
+            )
+            if score > best_score:
+                best, best_score = point, score
+        return best if best is not None else self._random_unseen()
+
+    def _fit(self, points: list[tuple[int, ...]]) -> list[list[float]]:
+        """Per-parameter Gaussian-kernel density over value positions, mixed with a uniform prior."""
+        densities: list[list[float]] = []
+        for dim, values in enumerate(self.values):
+            size = len(values)
+            bandwidth = max(0.5, size / (2.0 * math.sqrt(len(points) + 1)))
+            weights = [1.0 / size] * size
+            for point in points:
+                center = point[dim]
+                kernel = [math.exp(-0.5 * ((k - center) / bandwidth) ** 2) for k in range(size)]
+                total = sum(kernel)
+                for k in range(size):
+                    weights[k] += kernel[k] / total
+            norm = sum(weights)
+            densities.append([weight / norm for weight in weights])
+        return densities
+
+    def _sample(self, weights: list[float]) -> int:
+        return self.rng.choices(range(len(weights)), weights=weights)[0]
+
+
+SEARCH_STRATEGIES: dict[str, type[SearchStrategy]] = {"random": RandomSearch, "tpe": TPESearch}
+
+
+def make_search_strategy(name: str, parameter_ranges: dict[str, list[Any]], seed: int = 0) -> SearchStrategy:
+    try:
+        strategy_cls = SEARCH_STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown search strategy: {name}") from None
+    return strategy_cls(parameter_ranges, seed)
@@ -0,0 +1,192 @@
+"""Cross-pair signal evaluation: every pair whose candle closed is evaluated in one batch."""
+
+from __future__ import annotations
+
+import importlib
+import time
+import traceback
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
+
+from core.candles import PRICE_COLUMNS
+from strategy.signals import (
+    VOLUME_LOOKBACK,
+    ConditionArrays,
+    IndicatorSnapshot,
+    build_condition_arrays,
+    condition_key,
+    condition_lookback,
+    uses_expressions,
+    volume_spike,
+)
+from utils.logger import log
+
+if TYPE_CHECKING:
+    from core.pair_manager import PairWorker
+    from strategy.base_strategy import StrategySettings
+
+
+class SignalEngine:
+    """Evaluates entry conditions for all pairs with a new closed candle at once.
+
+    On 1m timeframes most pairs close on the same minute boundary. The first
+    worker to ask triggers one batch over every running pair with a new candle
+    version; the others find their snapshot ready. Pairs with equal condition
+    settings share a single ``build_condition_arrays`` call where each array row
+    is one pair: latest close, incremental indicator values and a 2-D volume
+    window stacked across pairs. Condition expressions get (pairs, window)
+    candle matrices instead and keep only the last column of each check.
+    """
+
+    def __init__(self, workers: Mapping[str, PairWorker]) -> None:
+        self.workers = workers
+        self.batches = 0
+        self.evaluated = 0
+        self.last_batch_pairs = 0
+        self.last_batch_ms = 0.0
+        # candle version per pair whose evaluation failed: retried on the next candle, not on every request
+        self._failed: dict[str, int] = {}
+
+    def signal_for(self, worker: PairWorker, version: int) -> str | None:
+        """Signal of ``worker`` at candle ``version``, running the pending batch when it is not evaluated yet."""
+        snapshot = worker.strategy.last_snapshot
+        if snapshot is None or snapshot.version != version:
+            self.evaluate_pending(worker)
+            snapshot = worker.strategy.last_snapshot
+        if snapshot is None or snapshot.version != version:
+            return None
+        return snapshot.signal
+
+    def evaluate_pending(self, requester: PairWorker | None = None) -> int:
+        """Evaluate every running pair (and ``requester``) whose latest candle has no snapshot yet.
+
+        Returns the number of pairs evaluated; pairs still warming up are skipped,
+        and so are pairs whose evaluation fails (logged, the rest of the batch still runs).
+        """
+        started = time.perf_counter()
+        groups: dict[tuple[Any, ...], list[tuple[PairWorker, int]]] = {}
+        for worker in self.workers.values():
+            if worker is not requester and not worker.running:
+                continue
+            self._collect(worker, groups)
+        if requester is not None and self.workers.get(requester.pair_name) is not requester:
+            self._collect(requester, groups)
+
+        evaluated = 0
+        for members in groups.values():
+            evaluated += self._evaluate_isolated(members)
+        if evaluated:
+            self.batches += 1
+            self.evaluated += evaluated
+            self.last_batch_pairs = evaluated
+            self.last_batch_ms = (time.perf_counter() - started) * 1e3
+        return evaluated
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "batches": self.batches,
+            "evaluated": self.evaluated,
+            "last_batch_pairs": self.last_batch_pairs,
+            "last_batch_ms": self.last_batch_ms,
+        }
+
+    def _collect(self, worker: PairWorker, groups: dict[tuple[Any, ...], list[tuple[PairWorker, int]]]) -> None:
+        version = worker.websocket_manager.candle_versions.get(worker.pair_name, 0)
+        if version == 0 or self._failed.get(worker.pair_name) == version:
+            return
+        snapshot = worker.strategy.last_snapshot
+        if snapshot is not None and snapshot.version == version:
+            return
+        try:
+            ready = worker.prepare_signal(version)
+        except ModuleNotFoundError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            log(f"Signal preparation error {worker.pair_name}: {exc}\n{traceback.format_exc()}")
+            self._failed[worker.pair_name] = version
+            return
+        if ready:
+            groups.setdefault(condition_key(worker.strategy.settings), []).append((worker, version))
+
+    def _evaluate_isolated(self, members: list[tuple[PairWorker, int]]) -> int:
+        """Evaluate a group; when it fails, evaluate each pair alone so only the failing ones are skipped."""
+        try:
+            self._evaluate_group(members)
+            return len(members)
+        except ModuleNotFoundError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            if len(members) == 1:
+                worker, version = members[0]
+                log(f"Signal evaluation error {worker.pair_name}: {exc}\n{traceback.format_exc()}")
+                self._failed[worker.pair_name] = version
+                return 0
+        return sum(self._evaluate_isolated([member]) for member in members)
+
+    def _evaluate_group(self, members: list[tuple[PairWorker, int]]) -> None:
+        numpy = importlib.import_module("numpy")
+        settings = members[0][0].strategy.settings
+        values: dict[str, Any] = {}
+
+        def _stacked(name: str, period: int) -> Any:
+            column = numpy.array([worker.indicators.value(name, period) for worker, _ in members], dtype=numpy.float64)
+            values[f"{name.upper()}_{period}"] = column
+            return column
+
+        if uses_expressions(settings):
+            # expressions may look back: one (pairs, window) matrix per candle column
+            matrices = self._candle_matrices(members, condition_lookback(settings) + 1)
+            close = matrices["close"][:, -1]
+            conditions = build_condition_arrays(
+                settings, matrices["close"], matrices["volume"], lambda name, period: _stacked(name, period)[:, None], columns=matrices
+            )
+            conditions = ConditionArrays(
+                {name: check[:, -1] for name, check in conditions.long_checks.items()},
+                {name: check[:, -1] for name, check in conditions.short_checks.items()},
+                conditions.long_signal[:, -1],
+                conditions.short_signal[:, -1],
+                conditions.ready[:, -1],
+            )
+        else:
+            close = numpy.array([worker.candles[-1].close for worker, _ in members], dtype=numpy.float64)
+            spikes = self._volume_spikes(members, settings) if settings.use_volume_filter else None
+            conditions = build_condition_arrays(settings, close, None, _stacked, spikes)
+
+        for row, (worker, version) in enumerate(members):
+            long_checks = {name: None if check is None else bool(check[row]) for name, check in conditions.long_checks.items()}
+            short_checks = {name: None if check is None else bool(check[row]) for name, check in conditions.short_checks.items()}
+            signal = "LONG" if conditions.long_signal[row] else "SHORT" if conditions.short_signal[row] else None
+            snapshot_values = {name: float(column[row]) for name, column in values.items()}
+            snapshot = IndicatorSnapshot(version, float(close[row]), snapshot_values, long_checks, short_checks, signal)
+            worker.strategy.apply_snapshot(snapshot)
+
+    @staticmethod
+    def _candle_matrices(members: list[tuple[PairWorker, int]], window: int) -> dict[str, Any]:
+        """Last ``window`` candles per pair as (pairs, window) columns, NaN-padded on the left."""
+        numpy = importlib.import_module("numpy")
+        matrices = {name: numpy.full((len(members), window), numpy.nan) for name in PRICE_COLUMNS}
+        for row, (worker, _) in enumerate(members):
+            candles = worker.candles[-window:]
+            for name, matrix in matrices.items():
+                matrix[row, window - len(candles) :] = [getattr(candle, name) for candle in candles]
+        return matrices
+
+    @staticmethod
+    def _volume_spikes(members: list[tuple[PairWorker, int]], settings: StrategySettings) -> Any:
+        """Latest-bar volume spike per pair from a (pairs, lookback + 1) volume matrix."""
+        numpy = importlib.import_module("numpy")
+        window = VOLUME_LOOKBACK + 1
+        spikes = numpy.zeros(len(members), dtype=bool)
+        full = [row for row, (worker, _) in enumerate(members) if len(worker.candles) >= window]
+        if full:
+            volume = numpy.array(
+                [[candle.volume for candle in members[row][0].candles[-window:]] for row in full], dtype=numpy.float64
+            )
+            previous_mean = volume[:, :-1].mean(axis=1)
+            spikes[full] = (previous_mean > 0) & (volume[:, -1] > previous_mean * settings.volume_spike_multiplier)
+        for row, (worker, _) in enumerate(members):
+            if 0 < len(worker.candles) < window:
+                # short history right after start: same averaging as the single-pair filter
+                volume = [candle.volume for candle in worker.candles]
+                spikes[row] = bool(volume_spike(volume, settings.volume_spike_multiplier)[-1])
+        return spikes
@@ -0,0 +1,76 @@
+"""Rolling train/test window planning and out-of-sample stitching for walk-forward runs."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class WalkForwardWindow:
+    """Bar ranges ``[start, stop)`` of one train slice and the test slice right after it."""
+
+    index: int
+    train_start: int
+    train_stop: int
+    test_start: int
+    test_stop: int
+
+    @property
+    def train(self) -> tuple[int, int]:
+        return self.train_start, self.train_stop
+
+    @property
+    def test(self) -> tuple[int, int]:
+        return self.test_start, self.test_stop
+
+
+def plan_windows(
+    total_bars: int,
+    train_bars: int,
+    test_bars: int,
+    step_bars: int | None = None,
+    anchored: bool = False,
+) -> list[WalkForwardWindow]:
+    """Split ``total_bars`` into consecutive train/test windows.
+
+    Windows advance by ``step_bars`` (default ``test_bars``, so test slices tile the
+    history without overlap). With ``anchored`` every train slice starts at bar 0.
+    """
+    if train_bars <= 0 or test_bars <= 0:
+        raise ValueError("train_bars and test_bars must be positive")
+    step = step_bars or test_bars
+    windows: list[WalkForwardWindow] = []
+    start = 0
+    while start + train_bars + test_bars <= total_bars:
+        train_stop = start + train_bars
+        windows.append(
+            WalkForwardWindow(
+                index=len(windows) + 1,
+                train_start=0 if anchored else start,
+                train_stop=train_stop,
+                test_start=train_stop,
+                test_stop=train_stop + test_bars,
+            )
+        )
+        start += step
+    return windows
+
+
+def stitch_equity(curves: list[Any]) -> list[float]:
+    """Chain per-window equity curves (each starting at 0.0) into one cumulative curve."""
+    stitched = [0.0]
+    for curve in curves:
+        offset = stitched[-1]
+        stitched.extend(offset + float(value) for value in curve[1:])
+    return stitched
+
+
+def window_dates(open_time: Any, window: WalkForwardWindow) -> dict[str, int]:
+    """Open times (epoch ms) of the first and last bar of both slices."""
+    return {
+        "train_from": int(open_time[window.train_start]),
+        "train_to": int(open_time[window.train_stop - 1]),
+        "test_from": int(open_time[window.test_start]),
+        "test_to": int(open_time[window.test_stop - 1]),
+    }
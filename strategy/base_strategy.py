@@ -2,10 +2,19 @@
 
 from __future__ import annotations
 
+import importlib
 from dataclasses import dataclass
 from typing import Any
 
-from strategy.indicators import IndicatorEngine
+from strategy.indicators import indicator_array
+from strategy.expressions import compile_condition
+from strategy.signals import (
+    ConditionArrays,
+    IndicatorSnapshot,
+    IndicatorSource,
+    build_condition_arrays,
+    uses_expressions,
+)
 
 
 @dataclass
@@ -37,6 +46,8 @@ class StrategySettings:
     cooldown_minutes: float = 0.0
     anti_reentry_threshold_pct: float = 0.2
     run_mode: str = "Live"  # Live / Paper / Backtest
+    backtest_fill_model: str = "Close"  # Close / Intrabar
+    intrabar_order: str = "Adverse first"  # Adverse first / Favorable first
 
     use_rsi: bool = True
     use_ema_trend_filter: bool = True
@@ -54,65 +65,93 @@ class StrategySettings:
     stop_loss_mode: str = "Off"  # Off / Always / After Last Safety
     stop_loss_pct: float = 1.0
     auto_resume_running_pairs: bool = False
+    # condition expressions (strategy.expressions); each one replaces the use_* filters of its side
+    long_condition: str = ""
+    short_condition: str = ""
 
 
 class ConditionEngine:
-    """Evaluates enabled strategy conditions and builds signal diagnostics."""
+    """Evaluates enabled strategy conditions and builds signal diagnostics.
+
+    Every filter is computed as a boolean array by ``build_condition_arrays``, the
+    same code the backtest uses; live trading reads the last bar.
+    """
 
     def __init__(self) -> None:
-        self.indicators = IndicatorEngine()
+        self._snapshot: IndicatorSnapshot | None = None
+        self._snapshot_settings: StrategySettings | None = None
+
+    def build(
+        self,
+        candles: Any,
+        settings: StrategySettings,
+        indicator: IndicatorSource | None = None,
+    ) -> ConditionArrays:
+        """Evaluate all filters over OHLCV ``candles`` (a DataFrame or ``CandleArrays``).
+
+        ``indicator`` supplies indicator columns aligned with ``candles`` instead of
+        computing them from these candles (live workers pass incremental values).
+        """
+        close, high, low, volume = _ohlcv_columns(candles)
+        source = indicator or (lambda name, period: indicator_array(name, period, close, high, low))
+        columns = _expression_columns(candles, settings, high, low)
+        return build_condition_arrays(settings, close, volume, source, columns=columns)
+
+    def snapshot(
+        self,
+        candles: Any,
+        settings: StrategySettings,
+        indicator: IndicatorSource | None = None,
+        version: int | None = None,
+    ) -> IndicatorSnapshot:
+        """Indicators and both directions' checks for the last candle in one pass.
+
+        With a candle ``version`` the result is cached: asking again for the same
+        version and settings returns it without touching the indicators.
+        """
+        cached = self._snapshot
+        if version is not None and cached is not None and cached.version == version and self._snapshot_settings is settings:
+            return cached
+
+        close, high, low, volume = _ohlcv_columns(candles)
+        source = indicator or (lambda name, period: indicator_array(name, period, close, high, low))
+        values: dict[str, float] = {}
+
+        def _recorded(name: str, period: int) -> Any:
+            column = source(name, period)
+            values[f"{name.upper()}_{period}"] = float(column[-1])
+            return column
+
+        columns = _expression_columns(candles, settings, high, low)
+        conditions = build_condition_arrays(settings, close, volume, _recorded, columns=columns)
+        long_ok, long_checks = conditions.latest("LONG")
+        short_ok, short_checks = conditions.latest("SHORT")
+        signal = "LONG" if long_ok else "SHORT" if short_ok else None
+        snapshot = IndicatorSnapshot(version, float(close[-1]), values, long_checks, short_checks, signal)
+        self._snapshot = snapshot
+        self._snapshot_settings = settings
+        return snapshot
 
     def evaluate_conditions(self, df: Any, settings: StrategySettings, direction: str) -> tuple[bool, dict[str, bool | None]]:
-        checks: dict[str, bool | None] = {
-            "RSI": self.check_rsi(df, settings, direction) if settings.use_rsi else None,
-            "EMA": self.check_ema_trend(df, settings, direction) if settings.use_ema_trend_filter else None,
-            "ADX": self.check_adx(df, settings) if settings.use_adx_filter else None,
-            "Volume": self.check_volume_spike(df, settings) if settings.use_volume_filter else None,
-            "ATR": self.check_atr_filter(df, settings) if settings.use_atr_filter else None,
-        }
+        return self.build(df, settings).latest(direction)
+
+
+def _ohlcv_columns(candles: Any) -> tuple[Any, Any, Any, Any]:
+    return tuple(_column(candles, name) for name in ("close", "high", "low", "volume"))
+
 
-        enabled = [value for value in checks.values() if value is not None]
-        if not enabled:
-            return False, checks
-        return all(enabled), checks
-
-    def check_rsi(self, df: Any, settings: StrategySettings, direction: str) -> bool:
-        rsi = self.indicators.calculate_rsi(df, settings.rsi_period)
-        if rsi is None:
-            return False
-        if direction == "LONG":
-            return rsi < settings.rsi_level
-        return rsi > settings.rsi_level
-
-    def check_ema_trend(self, df: Any, settings: StrategySettings, direction: str) -> bool:
-        ema = self.indicators.calculate_ema(df, settings.ema_period)
-        if ema is None:
-            return False
-        close_price = float(df["close"].iloc[-1])
-        if direction == "LONG":
-            return close_price > ema
-        return close_price < ema
-
-    def check_adx(self, df: Any, settings: StrategySettings) -> bool:
-        adx = self.indicators.calculate_adx(df, settings.adx_period)
-        if adx is None:
-            return False
-        return adx > settings.adx_threshold
-
-    def check_volume_spike(self, df: Any, settings: StrategySettings) -> bool:
-        if len(df.index) < 2:
-            return False
-        current_volume = float(df["volume"].iloc[-1])
-        avg_volume = float(df["volume"].iloc[:-1].tail(20).mean())
-        if avg_volume <= 0:
-            return False
-        return current_volume > avg_volume * settings.volume_spike_multiplier
-
-    def check_atr_filter(self, df: Any, settings: StrategySettings) -> bool:
-        atr = self.indicators.calculate_atr(df, settings.adx_period)
-        if atr is None:
-            return False
-        return atr > settings.atr_min_value
+def _expression_columns(candles: Any, settings: StrategySettings, high: Any, low: Any) -> dict[str, Any] | None:
+    """Extra candle columns condition expressions may read (only converted when expressions are set)."""
+    if not uses_expressions(settings):
+        return None
+    return {"open": _column(candles, "open"), "high": high, "low": low}
+
+
+def _column(candles: Any, name: str) -> Any:
+    numpy = importlib.import_module("numpy")
+    if hasattr(candles, "columns"):
+        return candles[name].to_numpy(dtype=numpy.float64)
+    return numpy.asarray(getattr(candles, name), dtype=numpy.float64)
 
 
 class BaseStrategy:
@@ -120,8 +159,13 @@ class BaseStrategy:
 
     def __init__(self, settings: StrategySettings) -> None:
         self.settings = settings
+        # expressions are parsed once per settings change; a bad one fails here, not on the next candle
+        for text in (settings.long_condition, settings.short_condition):
+            if text.strip():
+                compile_condition(text)
         self.condition_engine = ConditionEngine()
         self.last_condition_report: dict[str, dict[str, bool | None] | str] = {}
+        self.last_snapshot: IndicatorSnapshot | None = None
 
     def _format_report(self, checks: dict[str, bool | None]) -> str:
         parts: list[str] = []
@@ -134,23 +178,30 @@ class BaseStrategy:
                 parts.append(f"{name} -")
         return " ".join(parts)
 
-    def generate_signal(self, df: Any) -> str | None:
-        """Return LONG/SHORT signal or None based on enabled condition filters."""
-        if df is None or df.empty:
+    def generate_signal(
+        self,
+        df: Any,
+        indicator: IndicatorSource | None = None,
+        version: int | None = None,
+    ) -> str | None:
+        """Return LONG/SHORT signal or None based on enabled condition filters.
+
+        ``version`` identifies the candle set (the websocket candle version); repeated
+        calls for the same version reuse ``last_snapshot``.
+        """
+        if df is None or len(df) == 0:
             return None
 
-        long_ok, long_checks = self.condition_engine.evaluate_conditions(df, self.settings, "LONG")
-        short_ok, short_checks = self.condition_engine.evaluate_conditions(df, self.settings, "SHORT")
+        snapshot = self.condition_engine.snapshot(df, self.settings, indicator, version)
+        self.apply_snapshot(snapshot)
+        return snapshot.signal
 
+    def apply_snapshot(self, snapshot: IndicatorSnapshot) -> None:
+        """Publish a snapshot evaluated elsewhere (the cross-pair signal engine) as the latest one."""
+        self.last_snapshot = snapshot
         self.last_condition_report = {
-            "LONG": long_checks,
-            "SHORT": short_checks,
-            "LONG_TEXT": self._format_report(long_checks),
-            "SHORT_TEXT": self._format_report(short_checks),
+            "LONG": snapshot.long_checks,
+            "SHORT": snapshot.short_checks,
+            "LONG_TEXT": self._format_report(snapshot.long_checks),
+            "SHORT_TEXT": self._format_report(snapshot.short_checks),
         }
-
-        if long_ok:
-            return "LONG"
-        if short_ok:
-            return "SHORT"
-        return None
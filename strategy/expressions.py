@@ -0,0 +1,361 @@
+"""Condition expression language compiled into vectorized array programs.
+
+An expression such as ``rsi(14) < 30 and close > ema(200) and adx(adx_period) > adx_threshold``
+is parsed once into a program of array operations. Equal subexpressions share
+one slot, so every indicator is requested once however often it appears. The
+same program runs over a whole history (backtests) or over the latest bar (live).
+
+Grammar: ``or``/``and``/``not``, comparisons (``< <= > >= == !=``), ``+ - * /``,
+parentheses and numbers. Names are candle columns (``open high low close volume``)
+or numeric ``StrategySettings`` fields read at evaluation time. Functions:
+``rsi(n) ema(n) adx(n) atr(n)`` and ``avg_volume(n)`` (mean of up to ``n``
+previous volumes); ``n`` is an integer or an integer setting such as ``rsi_period``.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import importlib
+import operator
+import re
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from strategy import numpy_indicators
+
+INDICATOR_FUNCTIONS = ("rsi", "ema", "adx", "atr")
+COLUMN_NAMES = ("open", "high", "low", "close", "volume")
+
+_TOKEN = re.compile(r"\s*(?:(?P<number>\d+\.?\d*|\.\d+)|(?P<name>[A-Za-z_]\w*)|(?P<op><=|>=|==|!=|[<>()+\-*/,]))")
+_COMPARISONS = ("<", "<=", ">", ">=", "==", "!=")
+_KEYWORDS = ("and", "or", "not")
+_OPERATORS: dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class _Parser:
+    """Recursive descent parser producing nested tuples (the expression tree).
+
+    The last item of every node is the text position where the subexpression starts.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.tokens: list[tuple[str, str, int]] = []
+        position = 0
+        while text[position:].strip():
+            match = _TOKEN.match(text, position)
+            if match is None:
+                rest = text[position:]
+                raise self.error("unexpected character", position + len(rest) - len(rest.lstrip()))
+            kind = match.lastgroup or ""
+            self.tokens.append((kind, match.group(kind), match.start(kind)))
+            position = match.end()
+        self.index = 0
+
+    def error(self, message: str, position: int | None = None) -> ValueError:
+        if position is None:
+            position = self.tokens[self.index][2] if self.index < len(self.tokens) else len(self.text)
+        return ValueError(f"Invalid condition expression {self.text!r}: {message} at position {position}")
+
+    def peek(self) -> tuple[str, str, int] | None:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def position(self) -> int:
+        token = self.peek()
+        return len(self.text) if token is None else token[2]
+
+    def accept(self, value: str) -> bool:
+        token = self.peek()
+        if token is not None and token[0] != "number" and token[1] == value:
+            self.index += 1
+            return True
+        return False
+
+    def expect(self, value: str) -> None:
+        if not self.accept(value):
+            raise self.error(f"expected {value!r}")
+
+    def parse(self) -> tuple:
+        if not self.tokens:
+            raise self.error("empty expression")
+        tree = self.logical("or")
+        if self.peek() is not None:
+            raise self.error("unexpected token")
+        return tree
+
+    def logical(self, keyword: str) -> tuple:
+        parse_operand = (lambda: self.logical("and")) if keyword == "or" else self.negation
+        operands = [parse_operand()]
+        while self.accept(keyword):
+            operands.append(parse_operand())
+        return operands[0] if len(operands) == 1 else (keyword, tuple(operands), operands[0][-1])
+
+    def negation(self) -> tuple:
+        position = self.position()
+        if self.accept("not"):
+            return ("not", self.negation(), position)
+        return self.comparison()
+
+    def comparison(self) -> tuple:
+        left = self.arithmetic(("+", "-"), lambda: self.arithmetic(("*", "/"), self.unary))
+        token = self.peek()
+        if token is not None and token[0] == "op" and token[1] in _COMPARISONS:
+            self.index += 1
+            right = self.arithmetic(("+", "-"), lambda: self.arithmetic(("*", "/"), self.unary))
+            return (token[1], left, right, left[-1])
+        return left
+
+    def arithmetic(self, operators: tuple[str, ...], parse_operand: Callable[[], tuple]) -> tuple:
+        tree = parse_operand()
+        while True:
+            token = self.peek()
+            if token is None or token[0] != "op" or token[1] not in operators:
+                return tree
+            self.index += 1
+            tree = (token[1], tree, parse_operand(), tree[-1])
+
+    def unary(self) -> tuple:
+        position = self.position()
+        if self.accept("-"):
+            return ("neg", self.unary(), position)
+        token = self.peek()
+        if token is None:
+            raise self.error("unexpected end")
+        kind, value, _ = token
+        if kind == "number":
+            self.index += 1
+            return ("num", float(value), position)
+        if kind == "name" and value not in _KEYWORDS:
+            self.index += 1
+            if not self.accept("("):
+                return ("name", value, position)
+            arguments = []
+            if not self.accept(")"):
+                arguments.append(self.logical("or"))
+                while self.accept(","):
+                    arguments.append(self.logical("or"))
+                self.expect(")")
+            return ("call", value, tuple(arguments), position)
+        if self.accept("("):
+            tree = self.logical("or")
+            self.expect(")")
+            return tree
+        raise self.error("unexpected token")
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    """Flat program of array operations; every distinct subexpression is one slot.
+
+    ``clauses`` are the top-level ``and`` operands as (label, slot), reported as
+    separate checks like the built-in filters.
+    """
+
+    text: str
+    program: tuple[tuple[Any, ...], ...]
+    clauses: tuple[tuple[str, int], ...]
+    indicators: tuple[tuple[str, tuple[str, Any]], ...]
+    lookbacks: tuple[tuple[str, Any], ...]
+
+    def indicator_periods(self, settings: Any) -> list[tuple[str, int]]:
+        """Indicators as (name, period) with setting periods resolved."""
+        return [(name, _period(settings, spec)) for name, spec in self.indicators]
+
+    def lookback(self, settings: Any) -> int:
+        """Previous bars of raw columns the program reads (``avg_volume``)."""
+        return max((_period(settings, spec) for spec in self.lookbacks), default=0)
+
+    def evaluate(
+        self,
+        settings: Any,
+        columns: Mapping[str, Any],
+        indicator: Callable[[str, int], Any],
+    ) -> dict[str, Any]:
+        """Boolean array per clause, shaped like ``columns["close"]``.
+
+        ``columns`` may hold one history or a (rows, bars) matrix per name;
+        indicator columns must broadcast against them.
+        """
+        numpy = importlib.import_module("numpy")
+        shape = numpy.shape(columns["close"])
+        slots: list[Any] = []
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            for operation, *operands in self.program:
+                # NumPy scalars, so constant arithmetic follows errstate (1/0 is inf) like the arrays
+                if operation == "num":
+                    value = numpy.float64(operands[0])
+                elif operation == "setting":
+                    value = numpy.float64(getattr(settings, operands[0]))
+                elif operation == "column":
+                    value = numpy.asarray(columns[operands[0]], dtype=numpy.float64)
+                elif operation == "indicator":
+                    value = indicator(operands[0], _period(settings, operands[1]))
+                elif operation == "avg_volume":
+                    value = numpy_indicators.previous_mean(columns["volume"], _period(settings, operands[0]))
+                elif operation == "neg":
+                    value = -slots[operands[0]]
+                elif operation == "not":
+                    value = numpy.logical_not(slots[operands[0]])
+                elif operation in ("and", "or"):
+                    reduce = numpy.logical_and if operation == "and" else numpy.logical_or
+                    value = reduce.reduce([numpy.broadcast_to(slots[slot], shape) for slot in operands[0]])
+                else:
+                    value = _OPERATORS[operation](slots[operands[0]], slots[operands[1]])
+                slots.append(value)
+        return {label: numpy.broadcast_to(numpy.asarray(slots[slot], dtype=bool), shape) for label, slot in self.clauses}
+
+
+@functools.lru_cache(maxsize=256)
+def compile_condition(text: str) -> CompiledCondition:
+    """Parse and compile ``text``; cached, so settings objects sharing an expression share the program.
+
+    Raises ``ValueError`` on syntax errors, unknown names or type mismatches.
+    """
+    parser = _Parser(text)
+    tree = parser.parse()
+    compiler = _Compiler(parser)
+    clauses = tree[1] if tree[0] == "and" else (tree,)
+    compiled = []
+    for clause in clauses:
+        slot, kind = compiler.compile(clause)
+        if kind != "bool":
+            raise parser.error(f"{_render(clause)!r} is not a condition", clause[-1])
+        compiled.append((_render(clause), slot))
+    return CompiledCondition(
+        text,
+        tuple(compiler.program),
+        tuple(compiled),
+        tuple(compiler.indicators),
+        tuple(compiler.lookbacks),
+    )
+
+
+def condition_error(text: str) -> str | None:
+    """Compile error of ``text`` for display, None when it is empty or valid."""
+    if not text.strip():
+        return None
+    try:
+        compile_condition(text)
+    except ValueError as exc:
+        return str(exc)
+    return None
+
+
+class _Compiler:
+    def __init__(self, parser: _Parser) -> None:
+        self.parser = parser
+        self.program: list[tuple[Any, ...]] = []
+        self.slots: dict[tuple[Any, ...], int] = {}
+        self.indicators: list[tuple[str, tuple[str, Any]]] = []
+        self.lookbacks: list[tuple[str, Any]] = []
+        self.settings = _numeric_settings()
+
+    def emit(self, instruction: tuple[Any, ...]) -> int:
+        slot = self.slots.get(instruction)
+        if slot is None:
+            slot = len(self.program)
+            self.program.append(instruction)
+            self.slots[instruction] = slot
+        return slot
+
+    def compile(self, tree: tuple) -> tuple[int, str]:
+        kind = tree[0]
+        if kind == "num":
+            return self.emit(("num", tree[1])), "number"
+        if kind == "name":
+            name = tree[1]
+            if name in COLUMN_NAMES:
+                return self.emit(("column", name)), "number"
+            if name in self.settings:
+                return self.emit(("setting", name)), "number"
+            raise self.parser.error(f"unknown name {name!r}", tree[-1])
+        if kind == "call":
+            return self.call(tree), "number"
+        if kind == "neg":
+            return self.emit(("neg", self.operand(tree[1], "number"))), "number"
+        if kind == "not":
+            return self.emit(("not", self.operand(tree[1], "bool"))), "bool"
+        if kind in ("and", "or"):
+            return self.emit((kind, tuple(self.operand(item, "bool") for item in tree[1]))), "bool"
+        left, right = self.operand(tree[1], "number"), self.operand(tree[2], "number")
+        return self.emit((kind, left, right)), "bool" if kind in _COMPARISONS else "number"
+
+    def operand(self, tree: tuple, expected: str) -> int:
+        slot, kind = self.compile(tree)
+        if kind != expected:
+            wanted = "a condition" if expected == "bool" else "a number"
+            raise self.parser.error(f"{_render(tree)!r} must be {wanted}", tree[-1])
+        return slot
+
+    def call(self, tree: tuple) -> int:
+        _, name, arguments, position = tree
+        if name not in (*INDICATOR_FUNCTIONS, "avg_volume"):
+            raise self.parser.error(f"unknown function {name!r}", position)
+        if len(arguments) != 1:
+            raise self.parser.error(f"{name}() takes one period", position)
+        spec = self.period_spec(name, arguments[0])
+        if name == "avg_volume":
+            if spec not in self.lookbacks:
+                self.lookbacks.append(spec)
+            return self.emit(("avg_volume", spec))
+        if (name, spec) not in self.indicators:
+            self.indicators.append((name, spec))
+        return self.emit(("indicator", name, spec))
+
+    def period_spec(self, name: str, tree: tuple) -> tuple[str, Any]:
+        if tree[0] == "num" and tree[1] >= 1 and float(tree[1]).is_integer():
+            return ("num", int(tree[1]))
+        if tree[0] == "name" and self.settings.get(tree[1]) == "int":
+            return ("setting", tree[1])
+        raise self.parser.error(f"{name}() period must be a positive integer or an integer setting", tree[-1])
+
+
+def _period(settings: Any, spec: tuple[str, Any]) -> int:
+    kind, value = spec
+    return int(value) if kind == "num" else int(getattr(settings, value))
+
+
+@functools.lru_cache(maxsize=1)
+def _numeric_settings() -> dict[str, str]:
+    base_strategy = importlib.import_module("strategy.base_strategy")
+    return {
+        field.name: str(field.type)
+        for field in dataclasses.fields(base_strategy.StrategySettings)
+        if str(field.type) in ("int", "float")
+    }
+
+
+def _render(tree: tuple) -> str:
+    """Canonical source text of a subtree (used as the check label)."""
+    kind = tree[0]
+    if kind == "num":
+        return f"{tree[1]:g}"
+    if kind == "name":
+        return tree[1]
+    if kind == "call":
+        return f"{tree[1]}({', '.join(_render(argument) for argument in tree[2])})"
+    if kind == "neg":
+        return f"-{_render_operand(tree[1])}"
+    if kind == "not":
+        return f"not {_render_operand(tree[1])}"
+    if kind in ("and", "or"):
+        return f" {kind} ".join(_render_operand(item) for item in tree[1])
+    return f"{_render_operand(tree[1])} {kind} {_render_operand(tree[2])}"
+
+
+def _render_operand(tree: tuple) -> str:
+    text = _render(tree)
+    return f"({text})" if tree[0] not in ("num", "name", "call", "neg") else text
@@ -1,71 +1,323 @@
-"""Technical indicators engine based on pandas and pandas-ta."""
+"""Technical indicators: built-in NumPy backend, pandas-ta as an optional reference backend."""
 
 from __future__ import annotations
 
 import importlib
+import math
+import sys
+from collections import deque
 from typing import Any
 
+from strategy import numpy_indicators
+
+INDICATOR_NAMES = ("rsi", "ema", "adx", "atr")
+INDICATOR_BACKENDS = ("numpy", "pandas_ta")
+DEFAULT_INDICATOR_BACKEND = "numpy"
+
+_backend = DEFAULT_INDICATOR_BACKEND
+
+
+def indicator_backend() -> str:
+    """Backend used by ``indicator_array`` when none is passed."""
+    return _backend
+
+
+def set_indicator_backend(backend: str) -> None:
+    """Select the process-wide indicator backend (``"numpy"`` or ``"pandas_ta"``)."""
+    global _backend
+    if backend not in INDICATOR_BACKENDS:
+        raise ValueError(f"Unknown indicator backend: {backend}")
+    if backend == "pandas_ta":
+        # fail here rather than on the first indicator request
+        importlib.import_module("pandas_ta")
+    _backend = backend
+
 
 class IndicatorEngine:
-    """Calculates technical indicators from OHLCV candle DataFrames."""
+    """Calculates the latest indicator values from OHLCV candle DataFrames."""
 
-    def _load_pandas(self) -> Any | None:
-        try:
-            return importlib.import_module("pandas")
-        except ModuleNotFoundError:
+    def _latest(self, dataframe: Any, name: str, period: int) -> float | None:
+        if dataframe is None or len(dataframe) == 0:
             return None
-
-    def _ensure_ta(self) -> bool:
-        try:
-            importlib.import_module("pandas_ta")
-            return True
-        except ModuleNotFoundError:
-            return False
+        numpy = importlib.import_module("numpy")
+        close, high, low = (dataframe[column].to_numpy(dtype=numpy.float64) for column in ("close", "high", "low"))
+        column = indicator_array(name, period, close, high, low)
+        valid = column[~numpy.isnan(column)]
+        return float(valid[-1]) if valid.size else None
 
     def calculate_rsi(self, dataframe: Any, period: int) -> float | None:
         """Return RSI value of the latest candle."""
-        if self._load_pandas() is None or not self._ensure_ta():
-            return None
-
-        series = dataframe.ta.rsi(close="close", length=period)
-        if series is None or series.dropna().empty:
-            return None
-        return float(series.dropna().iloc[-1])
+        return self._latest(dataframe, "rsi", period)
 
     def calculate_ema(self, dataframe: Any, period: int) -> float | None:
         """Return EMA value of the latest candle."""
-        if self._load_pandas() is None or not self._ensure_ta():
-            return None
-
-        series = dataframe.ta.ema(close="close", length=period)
-        if series is None or series.dropna().empty:
-            return None
-        return float(series.dropna().iloc[-1])
+        return self._latest(dataframe, "ema", period)
 
     def calculate_adx(self, dataframe: Any, period: int) -> float | None:
         """Return ADX value of the latest candle."""
-        if self._load_pandas() is None or not self._ensure_ta():
-            return None
+        return self._latest(dataframe, "adx", period)
 
-        adx_df = dataframe.ta.adx(high="high", low="low", close="close", length=period)
-        if adx_df is None or adx_df.empty:
-            return None
+    def calculate_atr(self, dataframe: Any, period: int) -> float | None:
+        """Return ATR value of the latest candle."""
+        return self._latest(dataframe, "atr", period)
 
-        adx_column = f"ADX_{period}"
-        if adx_column not in adx_df.columns:
-            return None
 
-        series = adx_df[adx_column].dropna()
-        if series.empty:
-            return None
-        return float(series.iloc[-1])
+def indicator_array(name: str, period: int, close: Any, high: Any, low: Any, backend: str | None = None) -> Any:
+    """Full-history indicator column as a float64 array (NaN during warm-up).
 
-    def calculate_atr(self, dataframe: Any, period: int) -> float | None:
-        """Return ATR value of the latest candle."""
-        if self._load_pandas() is None or not self._ensure_ta():
-            return None
+    The backtest and live trading both read indicator values from here.
+    ``backend`` overrides ``indicator_backend()`` for this call.
+    """
+    backend = backend or _backend
+    if backend == "numpy":
+        return _numpy_array(name, period, close, high, low)
+    if backend == "pandas_ta":
+        return _pandas_ta_array(name, period, close, high, low)
+    raise ValueError(f"Unknown indicator backend: {backend}")
 
-        series = dataframe.ta.atr(high="high", low="low", close="close", length=period)
-        if series is None or series.dropna().empty:
-            return None
-        return float(series.dropna().iloc[-1])
+
+def _numpy_array(name: str, period: int, close: Any, high: Any, low: Any) -> Any:
+    if name == "rsi":
+        return numpy_indicators.rsi(close, period)
+    if name == "ema":
+        return numpy_indicators.ema(close, period)
+    if name == "adx":
+        return numpy_indicators.adx(high, low, close, period)
+    if name == "atr":
+        return numpy_indicators.atr(high, low, close, period)
+    raise ValueError(f"Unknown indicator: {name}")
+
+
+def _pandas_ta_array(name: str, period: int, close: Any, high: Any, low: Any) -> Any:
+    """Reference implementation; inputs are wrapped as Series views, nothing is copied into a frame."""
+    pandas = importlib.import_module("pandas")
+    numpy = importlib.import_module("numpy")
+    ta = importlib.import_module("pandas_ta")
+
+    close_series = pandas.Series(numpy.asarray(close, dtype=numpy.float64), copy=False)
+    if name == "rsi":
+        series = ta.rsi(close=close_series, length=period)
+    elif name == "ema":
+        series = ta.ema(close=close_series, length=period)
+    elif name in ("adx", "atr"):
+        high_series = pandas.Series(numpy.asarray(high, dtype=numpy.float64), copy=False)
+        low_series = pandas.Series(numpy.asarray(low, dtype=numpy.float64), copy=False)
+        if name == "atr":
+            series = ta.atr(high=high_series, low=low_series, close=close_series, length=period)
+        else:
+            adx_df = ta.adx(high=high_series, low=low_series, close=close_series, length=period)
+            adx_col = f"ADX_{period}"
+            series = adx_df[adx_col] if adx_df is not None and adx_col in adx_df.columns else None
+    else:
+        raise ValueError(f"Unknown indicator: {name}")
+
+    if series is None:
+        return numpy.full(len(close_series), numpy.nan)
+    return numpy.asarray(series, dtype=numpy.float64)
+
+
+# recent candles kept by IncrementalIndicatorEngine: the window its indicator values cover
+INCREMENTAL_HISTORY_BARS = 1000
+_EPSILON = sys.float_info.epsilon
+
+
+class EwmMean:
+    """``Series.ewm(alpha=..., adjust=..., min_periods=...).mean()`` fed one value at a time.
+
+    Repeats the float operations of pandas' EWM loop, so values equal the
+    vectorized result. NaN inputs are skipped for the mean but still age the weights.
+    """
+
+    __slots__ = ("_factor", "_new_weight", "_adjust", "_min_periods", "_weighted", "_old_weight", "_observations")
+
+    def __init__(self, alpha: float, adjust: bool = True, min_periods: int = 0) -> None:
+        self._factor = 1.0 - alpha
+        self._new_weight = 1.0 if adjust else alpha
+        self._adjust = adjust
+        self._min_periods = max(int(min_periods), 1)
+        self._weighted = math.nan
+        self._old_weight = 1.0
+        self._observations = 0
+
+    def update(self, value: float) -> float:
+        observed = value == value
+        self._observations += observed
+        weighted = self._weighted
+        if weighted == weighted:
+            self._old_weight *= self._factor
+            if observed:
+                if weighted != value:
+                    weighted = self._old_weight * weighted + self._new_weight * value
+                    weighted /= self._old_weight + self._new_weight
+                self._old_weight = self._old_weight + self._new_weight if self._adjust else 1.0
+        elif observed:
+            weighted = value
+        self._weighted = weighted
+        return weighted if self._observations >= self._min_periods else math.nan
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    """``numerator / denominator`` with NaN for a zero denominator, as the vectorized indicators give."""
+    return numerator / denominator if denominator != 0 else math.nan
+
+
+class RsiState:
+    """pandas_ta RSI: Wilder (RMA) averages of gains and losses."""
+
+    __slots__ = ("_gains", "_losses", "_previous", "value")
+
+    def __init__(self, period: int) -> None:
+        self._gains = EwmMean(1.0 / period, min_periods=period)
+        self._losses = EwmMean(1.0 / period, min_periods=period)
+        self._previous = math.nan
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        change = close - self._previous
+        self._previous = close
+        gain = self._gains.update(0.0 if change < 0 else change)
+        loss = self._losses.update(0.0 if change > 0 else change)
+        self.value = _ratio(100 * gain, gain + abs(loss))
+        return self.value
+
+
+class EmaState:
+    """pandas_ta EMA: SMA of the first ``period`` closes, then ``ewm(span=period, adjust=False)``."""
+
+    __slots__ = ("_period", "_seed", "_average", "value")
+
+    def __init__(self, period: int) -> None:
+        self._period = period
+        self._seed: list[float] | None = []
+        self._average = EwmMean(2.0 / (period + 1.0), adjust=False)
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self._seed is not None:
+            self._seed.append(close)
+            if len(self._seed) < self._period:
+                self._average.update(math.nan)
+                return self.value
+            numpy = importlib.import_module("numpy")
+            close = float(numpy.asarray(self._seed, dtype=numpy.float64).sum() / self._period)
+            self._seed = None
+        self.value = self._average.update(close)
+        return self.value
+
+
+class AtrState:
+    """pandas_ta ATR: RMA of the true range (the first bar has none)."""
+
+    __slots__ = ("_average", "_previous", "true_range", "value")
+
+    def __init__(self, period: int) -> None:
+        self._average = EwmMean(1.0 / period, min_periods=period)
+        self._previous = math.nan
+        self.true_range = math.nan
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        previous = self._previous
+        self._previous = close
+        if previous != previous:
+            self.true_range = math.nan
+        else:
+            # pandas_ta nudges zero ranges by epsilon; here per bar rather than for the whole frame
+            high_low = high - low or _EPSILON
+            self.true_range = max(abs(high_low), abs(high - previous), abs(previous - low))
+        self.value = self._average.update(self.true_range)
+        return self.value
+
+
+class AdxState:
+    """pandas_ta ADX: RMA of DX built from RMA-smoothed directional movement over ATR."""
+
+    __slots__ = ("_atr", "_plus", "_minus", "_adx", "_previous_high", "_previous_low", "value")
+
+    def __init__(self, period: int) -> None:
+        self._atr = AtrState(period)
+        self._plus = EwmMean(1.0 / period, min_periods=period)
+        self._minus = EwmMean(1.0 / period, min_periods=period)
+        self._adx = EwmMean(1.0 / period, min_periods=period)
+        self._previous_high = math.nan
+        self._previous_low = math.nan
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        atr = self._atr.update(high, low, close)
+        up = high - self._previous_high
+        down = self._previous_low - low
+        self._previous_high = high
+        self._previous_low = low
+        plus = (up if up > down and up > 0 else 0.0) if up == up else math.nan
+        minus = (down if down > up and down > 0 else 0.0) if down == down else math.nan
+        scale = _ratio(100, atr)
+        plus_di = scale * self._plus.update(0 if abs(plus) < _EPSILON else plus)
+        minus_di = scale * self._minus.update(0 if abs(minus) < _EPSILON else minus)
+        dx = _ratio(100 * abs(plus_di - minus_di), plus_di + minus_di)
+        self.value = self._adx.update(dx)
+        return self.value
+
+
+_INCREMENTAL_STATES = {"rsi": RsiState, "ema": EmaState, "adx": AdxState, "atr": AtrState}
+
+
+class IncrementalIndicatorEngine:
+    """Indicator state for one pair, advanced in constant time per closed candle.
+
+    Values repeat the pandas-ta arithmetic over the candles seen since ``seed``
+    (the NumPy backend of ``indicator_array`` agrees to rounding). States are
+    created on first request and replay the retained history, so a settings
+    change to new periods needs no reseed. Once more than ``history_bars``
+    candles were seen, a new state rebuilds every state from the retained
+    history: all values then cover the same last ``history_bars`` candles, and
+    long EWMs such as ``ema(200)`` or ADX match ``indicator_array`` over that
+    window rather than over the full history.
+    """
+
+    def __init__(self, history_bars: int = INCREMENTAL_HISTORY_BARS) -> None:
+        self.history: deque[Any] = deque(maxlen=history_bars)
+        self.bars = 0
+        self._states: dict[tuple[str, int], Any] = {}
+
+    def seed(self, candles: list[Any]) -> None:
+        """Restart from ``candles`` (objects with ``high``/``low``/``close``/``volume``, oldest first)."""
+        self.history.clear()
+        self.bars = 0
+        self._states.clear()
+        for candle in candles:
+            self.update(candle)
+
+    def update(self, candle: Any) -> None:
+        self.history.append(candle)
+        self.bars += 1
+        high, low, close = float(candle.high), float(candle.low), float(candle.close)
+        for state in self._states.values():
+            state.update(high, low, close)
+
+    def value(self, name: str, period: int) -> float:
+        """Latest value, NaN during warm-up."""
+        key = (name, int(period))
+        state = self._states.get(key)
+        if state is None:
+            if name not in _INCREMENTAL_STATES:
+                raise ValueError(f"Unknown indicator: {name}")
+            state = _INCREMENTAL_STATES[name](int(period))
+            if self.bars > len(self.history):
+                # older states have seen candles that are gone: restart them on the retained window too
+                self._states = {known: _INCREMENTAL_STATES[known[0]](known[1]) for known in self._states}
+            self._states[key] = state
+            states = [state] if self.bars == len(self.history) else list(self._states.values())
+            for candle in self.history:
+                high, low, close = float(candle.high), float(candle.low), float(candle.close)
+                for replayed in states:
+                    replayed.update(high, low, close)
+        return state.value
+
+    def latest_column(self, name: str, period: int, size: int) -> Any:
+        """``size``-long column with the latest value last and NaN before, for ``build_condition_arrays``."""
+        numpy = importlib.import_module("numpy")
+        column = numpy.full(size, numpy.nan)
+        if size:
+            column[-1] = self.value(name, period)
+        return column
@@ -0,0 +1,180 @@
+"""Vectorized NumPy indicators matching the pandas-ta formulas on plain float arrays."""
+
+from __future__ import annotations
+
+import importlib
+import math
+import sys
+from typing import Any
+
+_EPSILON = sys.float_info.epsilon
+# bars per block of the exponential filter: one small matmul per block, then a carry per block
+_FILTER_BLOCK = 32
+# decay powers below this are flushed to zero: subnormal floats make pow and matmul crawl
+_TINY_POWER = 1e-300
+
+
+def ewm_mean(values: Any, alpha: float, adjust: bool = True, min_periods: int = 0) -> Any:
+    """``Series.ewm(alpha=..., adjust=..., min_periods=...).mean()`` over a float64 array.
+
+    NaN inputs age the weights without contributing (pandas' ``ignore_na=False``).
+    With ``adjust=False`` only leading NaNs are supported, which is all the EMA feeds it.
+    """
+    numpy = importlib.import_module("numpy")
+    values = numpy.asarray(values, dtype=numpy.float64)
+    observed = ~numpy.isnan(values)
+    filled = numpy.where(observed, values, 0.0)
+    decay = 1.0 - alpha
+    if adjust:
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            mean = _decay_filter(filled, decay) / _decay_filter(observed.astype(numpy.float64), decay)
+    else:
+        first = int(observed.argmax()) if observed.any() else len(values)
+        # y[first] = x[first], then y[t] = decay * y[t-1] + alpha * x[t]
+        scaled = filled * alpha
+        scaled[first : first + 1] = filled[first : first + 1]
+        mean = _decay_filter(scaled, decay)
+        mean[:first] = numpy.nan
+    mean[numpy.cumsum(observed) < max(int(min_periods), 1)] = numpy.nan
+    return mean
+
+
+def rma(values: Any, period: int) -> Any:
+    """Wilder's moving average as pandas-ta computes it."""
+    return ewm_mean(values, 1.0 / period, min_periods=period)
+
+
+def rsi(close: Any, period: int) -> Any:
+    numpy = importlib.import_module("numpy")
+    close = numpy.asarray(close, dtype=numpy.float64)
+    if len(close) < period:
+        return numpy.full(len(close), numpy.nan)
+    change = numpy.concatenate(([numpy.nan], numpy.diff(close)))
+    gains = rma(numpy.where(change < 0, 0.0, change), period)
+    losses = rma(numpy.where(change > 0, 0.0, change), period)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return 100 * gains / (gains + numpy.abs(losses))
+
+
+def ema(close: Any, period: int) -> Any:
+    """SMA of the first ``period`` closes, then ``ewm(span=period, adjust=False)``."""
+    numpy = importlib.import_module("numpy")
+    close = numpy.asarray(close, dtype=numpy.float64)
+    if len(close) < period:
+        return numpy.full(len(close), numpy.nan)
+    seeded = close.copy()
+    seeded[: period - 1] = numpy.nan
+    seeded[period - 1] = close[:period].sum() / period
+    return ewm_mean(seeded, 2.0 / (period + 1.0), adjust=False)
+
+
+def true_range(high: Any, low: Any, close: Any) -> Any:
+    """pandas-ta true range; a zero high-low range anywhere nudges the whole column by epsilon."""
+    numpy = importlib.import_module("numpy")
+    high = numpy.asarray(high, dtype=numpy.float64)
+    low = numpy.asarray(low, dtype=numpy.float64)
+    close = numpy.asarray(close, dtype=numpy.float64)
+    high_low = high - low
+    if (high_low == 0).any():
+        high_low = high_low + _EPSILON
+    previous = numpy.concatenate(([numpy.nan], close[:-1]))
+    ranges = numpy.maximum(numpy.abs(high_low), numpy.abs(high - previous))
+    ranges = numpy.maximum(ranges, numpy.abs(previous - low))
+    ranges[:1] = numpy.nan
+    return ranges
+
+
+def atr(high: Any, low: Any, close: Any, period: int) -> Any:
+    numpy = importlib.import_module("numpy")
+    if len(high) < period:
+        return numpy.full(len(high), numpy.nan)
+    return rma(true_range(high, low, close), period)
+
+
+def adx(high: Any, low: Any, close: Any, period: int) -> Any:
+    numpy = importlib.import_module("numpy")
+    high = numpy.asarray(high, dtype=numpy.float64)
+    low = numpy.asarray(low, dtype=numpy.float64)
+    if len(high) < period:
+        return numpy.full(len(high), numpy.nan)
+    up = numpy.concatenate(([numpy.nan], numpy.diff(high)))
+    down = numpy.concatenate(([numpy.nan], -numpy.diff(low)))
+    # bool * move keeps the leading NaN, like pandas-ta
+    plus = ((up > down) & (up > 0)) * up
+    minus = ((down > up) & (down > 0)) * down
+    plus[numpy.abs(plus) < _EPSILON] = 0.0
+    minus[numpy.abs(minus) < _EPSILON] = 0.0
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        scale = 100 / atr(high, low, close, period)
+        plus_di = scale * rma(plus, period)
+        minus_di = scale * rma(minus, period)
+        dx = 100 * numpy.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return rma(dx, period)
+
+
+def volume_mean(volume: Any, lookback: int) -> Any:
+    """Mean volume of up to ``lookback`` previous bars (NaN on the first bar)."""
+    numpy = importlib.import_module("numpy")
+    volume = numpy.asarray(volume, dtype=numpy.float64)
+    size = int(volume.shape[0])
+    previous_mean = numpy.full(size, numpy.nan)
+    head = min(lookback, size - 1)
+    if head > 0:
+        # short history at the start: average whatever precedes the bar
+        previous_mean[1 : head + 1] = numpy.cumsum(volume[:head]) / numpy.arange(1, head + 1)
+    if size > lookback:
+        windows = numpy.lib.stride_tricks.sliding_window_view(volume[:-1], lookback)
+        previous_mean[lookback:] = windows.mean(axis=1)
+    return previous_mean
+
+
+def previous_mean(values: Any, lookback: int) -> Any:
+    """Mean of up to ``lookback`` previous non-NaN values along the last axis (NaN when there are none).
+
+    Works on one history or on a (rows, bars) matrix; a bar sums the same window
+    in the same order either way, so both layouts give identical values.
+    """
+    numpy = importlib.import_module("numpy")
+    values = numpy.asarray(values, dtype=numpy.float64)
+    if values.shape[-1] == 0:
+        return values.copy()
+    present = ~numpy.isnan(values)
+    padding = [(0, 0)] * (values.ndim - 1) + [(lookback, 0)]
+    filled = numpy.pad(numpy.where(present, values, 0.0), padding)[..., :-1]
+    counts = numpy.pad(present.astype(numpy.float64), padding)[..., :-1]
+    window = numpy.lib.stride_tricks.sliding_window_view
+    with numpy.errstate(invalid="ignore"):
+        return window(filled, lookback, axis=-1).sum(axis=-1) / window(counts, lookback, axis=-1).sum(axis=-1)
+
+
+def _decay_filter(values: Any, decay: float) -> Any:
+    """``y[t] = decay * y[t-1] + values[t]`` from ``y[-1] = 0``, without a per-bar Python loop.
+
+    Each block is filtered by one lower-triangular matmul; block end states form
+    the same recurrence with ``decay ** block`` and are solved recursively.
+    """
+    numpy = importlib.import_module("numpy")
+    size = len(values)
+    block = min(_FILTER_BLOCK, max(size, 1))
+    blocks = -(-size // block)
+    padded = numpy.zeros(blocks * block)
+    padded[:size] = values
+    padded = padded.reshape(blocks, block)
+
+    steps = numpy.arange(block)
+    lag = steps[:, None] - steps[None, :]
+    kernel = numpy.where(lag >= 0, _powers(decay, numpy.maximum(lag, 0).astype(numpy.float64)), 0.0)
+    filtered = padded @ kernel.T
+    if blocks > 1:
+        ends = _decay_filter(filtered[:, -1], float(_powers(decay, numpy.array([float(block)]))[0]))
+        filtered[1:] += ends[:-1, None] * _powers(decay, steps + 1.0)
+    return filtered.reshape(-1)[:size]
+
+
+def _powers(decay: float, exponents: Any) -> Any:
+    """``decay ** exponents`` with the terms that would underflow set to zero."""
+    numpy = importlib.import_module("numpy")
+    if not 0.0 < decay < 1.0:
+        return decay**exponents
+    limit = math.log(_TINY_POWER) / math.log(decay)
+    return numpy.where(exponents <= limit, decay ** numpy.minimum(exponents, limit), 0.0)
@@ -0,0 +1,253 @@
+"""Vectorized ConditionEngine filters: every condition as a boolean array over the whole history."""
+
+from __future__ import annotations
+
+import importlib
+import math
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from strategy.expressions import compile_condition
+from strategy.numpy_indicators import volume_mean
+
+if TYPE_CHECKING:
+    from strategy.base_strategy import StrategySettings
+
+# previous candles averaged by the volume spike filter
+VOLUME_LOOKBACK = 20
+
+IndicatorSource = Callable[[str, int], Any]
+
+# the built-in use_* filters in the expression language, for a side left without an expression
+_BUILTIN_CLAUSES = (
+    ("use_rsi", "rsi(rsi_period) < rsi_level", "rsi(rsi_period) > rsi_level"),
+    ("use_ema_trend_filter", "close > ema(ema_period)", "close < ema(ema_period)"),
+    ("use_adx_filter", "adx(adx_period) > adx_threshold", "adx(adx_period) > adx_threshold"),
+    (
+        "use_volume_filter",
+        f"avg_volume({VOLUME_LOOKBACK}) > 0 and volume > avg_volume({VOLUME_LOOKBACK}) * volume_spike_multiplier",
+        f"avg_volume({VOLUME_LOOKBACK}) > 0 and volume > avg_volume({VOLUME_LOOKBACK}) * volume_spike_multiplier",
+    ),
+    ("use_atr_filter", "atr(adx_period) > atr_min_value", "atr(adx_period) > atr_min_value"),
+)
+
+# settings read by build_condition_arrays: equal values give equal conditions
+CONDITION_FIELDS = (
+    "use_rsi",
+    "rsi_period",
+    "rsi_level",
+    "use_ema_trend_filter",
+    "ema_period",
+    "use_adx_filter",
+    "adx_period",
+    "adx_threshold",
+    "use_volume_filter",
+    "volume_spike_multiplier",
+    "use_atr_filter",
+    "atr_min_value",
+    "long_condition",
+    "short_condition",
+)
+
+
+@dataclass(frozen=True)
+class ConditionArrays:
+    """Per-bar outcome of each enabled filter for both directions (``None``: filter disabled).
+
+    ``long_signal``/``short_signal`` follow ``BaseStrategy.generate_signal``: a bar is
+    LONG when every enabled LONG check passes, SHORT only when it is not LONG.
+    ``ready`` marks bars where every enabled indicator is past its warm-up.
+    """
+
+    long_checks: dict[str, Any | None]
+    short_checks: dict[str, Any | None]
+    long_signal: Any
+    short_signal: Any
+    ready: Any
+
+    def latest(self, direction: str) -> tuple[bool, dict[str, bool | None]]:
+        """Outcome on the last bar in the ``evaluate_conditions`` format."""
+        checks = self.long_checks if direction == "LONG" else self.short_checks
+        values = {name: None if check is None else bool(check[-1]) for name, check in checks.items()}
+        enabled = [value for value in values.values() if value is not None]
+        return bool(enabled) and all(enabled), values
+
+
+@dataclass(frozen=True)
+class IndicatorSnapshot:
+    """Indicator values and filter outcomes of the latest candle, computed once per candle version.
+
+    ``values`` holds the indicators the enabled filters read, keyed like pandas_ta
+    columns (``"RSI_14"``); ``signal`` follows ``BaseStrategy.generate_signal``.
+    """
+
+    version: int | None
+    close: float
+    values: dict[str, float]
+    long_checks: dict[str, bool | None]
+    short_checks: dict[str, bool | None]
+    signal: str | None
+
+    def describe_values(self) -> str:
+        parts = [f"close={self.close:.6g}"]
+        parts.extend(f"{name}={value:.4f}" if not math.isnan(value) else f"{name}=-" for name, value in self.values.items())
+        return " ".join(parts)
+
+
+def build_condition_arrays(
+    settings: StrategySettings,
+    close: Any,
+    volume: Any,
+    indicator: IndicatorSource,
+    volume_spikes: Any | None = None,
+    columns: Mapping[str, Any] | None = None,
+) -> ConditionArrays:
+    """Evaluate every ConditionEngine filter on all bars at once.
+
+    ``indicator(name, period)`` returns a float64 column aligned with ``close``
+    (``strategy.indicators.indicator_array`` or a cached wrapper around it); only
+    indicators of enabled filters are requested. ``volume_spikes`` replaces the
+    spike flags computed from ``volume`` when the rows are not consecutive bars
+    (one row per pair in a cross-pair batch).
+
+    With ``long_condition``/``short_condition`` set, the compiled expressions
+    replace the built-in filters (a side left empty keeps them, see
+    ``condition_texts``); ``columns`` supplies the other candle columns
+    (``open``/``high``/``low``) they may read.
+    """
+    numpy = importlib.import_module("numpy")
+    close = numpy.asarray(close, dtype=numpy.float64)
+    if uses_expressions(settings):
+        return _expression_arrays(settings, close, volume, indicator, columns or {})
+    size = int(close.shape[0])
+    ready = numpy.ones(size, dtype=bool)
+    long_checks: dict[str, Any | None] = dict.fromkeys(("RSI", "EMA", "ADX", "Volume", "ATR"))
+    short_checks: dict[str, Any | None] = dict.fromkeys(long_checks)
+
+    with numpy.errstate(invalid="ignore"):
+        if settings.use_rsi:
+            rsi = indicator("rsi", settings.rsi_period)
+            ready &= ~numpy.isnan(rsi)
+            long_checks["RSI"] = rsi < settings.rsi_level
+            short_checks["RSI"] = rsi > settings.rsi_level
+        if settings.use_ema_trend_filter:
+            ema = indicator("ema", settings.ema_period)
+            ready &= ~numpy.isnan(ema)
+            long_checks["EMA"] = close > ema
+            short_checks["EMA"] = close < ema
+        if settings.use_adx_filter:
+            adx = indicator("adx", settings.adx_period)
+            ready &= ~numpy.isnan(adx)
+            long_checks["ADX"] = short_checks["ADX"] = adx > settings.adx_threshold
+        if settings.use_volume_filter:
+            if volume_spikes is None:
+                volume_spikes = volume_spike(volume, settings.volume_spike_multiplier)
+            long_checks["Volume"] = short_checks["Volume"] = numpy.asarray(volume_spikes, dtype=bool)
+        if settings.use_atr_filter:
+            # the live filter has always used the ADX period for ATR
+            atr = indicator("atr", settings.adx_period)
+            ready &= ~numpy.isnan(atr)
+            long_checks["ATR"] = short_checks["ATR"] = atr > settings.atr_min_value
+
+    long_signal = _all_enabled(long_checks, size)
+    short_signal = _all_enabled(short_checks, size) & ~long_signal
+    return ConditionArrays(long_checks, short_checks, long_signal, short_signal, ready)
+
+
+def _expression_arrays(
+    settings: StrategySettings,
+    close: Any,
+    volume: Any,
+    indicator: IndicatorSource,
+    columns: Mapping[str, Any],
+) -> ConditionArrays:
+    """Conditions from the compiled long/short expressions of ``condition_texts``."""
+    numpy = importlib.import_module("numpy")
+    computed: dict[tuple[str, int], Any] = {}
+
+    def _shared(name: str, period: int) -> Any:
+        # both directions read each indicator once
+        key = (name, period)
+        if key not in computed:
+            computed[key] = indicator(name, period)
+        return computed[key]
+
+    data = {**columns, "close": close, "volume": volume}
+    ready = numpy.ones(close.shape, dtype=bool)
+    checks = []
+    for text in condition_texts(settings):
+        if not text:
+            # no built-in filter enabled either: that side never signals
+            checks.append({})
+            continue
+        compiled = compile_condition(text)
+        for name, period in compiled.indicator_periods(settings):
+            ready &= ~numpy.isnan(_shared(name, period))
+        checks.append(compiled.evaluate(settings, data, _shared))
+    long_checks, short_checks = checks
+    long_signal = _all_enabled(long_checks, close.shape)
+    short_signal = _all_enabled(short_checks, close.shape) & ~long_signal
+    return ConditionArrays(long_checks, short_checks, long_signal, short_signal, ready)
+
+
+def uses_expressions(settings: StrategySettings) -> bool:
+    """Whether condition expressions replace the built-in ``use_*`` filters."""
+    return bool(settings.long_condition.strip() or settings.short_condition.strip())
+
+
+def condition_texts(settings: StrategySettings) -> tuple[str, str]:
+    """Long and short expressions, a side left empty spelled out from its enabled ``use_*`` filters."""
+    texts = []
+    for index, text in enumerate((settings.long_condition, settings.short_condition), start=1):
+        if not text.strip():
+            text = " and ".join(clauses[index] for clauses in _BUILTIN_CLAUSES if getattr(settings, clauses[0]))
+        texts.append(text)
+    return texts[0], texts[1]
+
+
+def condition_indicators(settings: StrategySettings) -> list[tuple[str, int]]:
+    """Indicators (name, period) the enabled conditions read."""
+    if uses_expressions(settings):
+        required: list[tuple[str, int]] = []
+        for text in condition_texts(settings):
+            if text:
+                required.extend(compile_condition(text).indicator_periods(settings))
+        return list(dict.fromkeys(required))
+    builtin = (
+        (settings.use_rsi, "rsi", settings.rsi_period),
+        (settings.use_ema_trend_filter, "ema", settings.ema_period),
+        (settings.use_adx_filter, "adx", settings.adx_period),
+        (settings.use_atr_filter, "atr", settings.adx_period),
+    )
+    return [(name, period) for enabled, name, period in builtin if enabled]
+
+
+def condition_lookback(settings: StrategySettings) -> int:
+    """Previous bars of raw candle columns the conditions read (the volume average)."""
+    if uses_expressions(settings):
+        texts = [text for text in condition_texts(settings) if text]
+        return max((compile_condition(text).lookback(settings) for text in texts), default=0)
+    return VOLUME_LOOKBACK if settings.use_volume_filter else 0
+
+
+def condition_key(settings: StrategySettings) -> tuple[Any, ...]:
+    """Settings identity for ``build_condition_arrays``: pairs with equal keys can share one evaluation."""
+    return tuple(getattr(settings, name) for name in CONDITION_FIELDS)
+
+
+def volume_spike(volume: Any, multiplier: float) -> Any:
+    """Bars whose volume exceeds ``multiplier`` x the mean of up to 20 previous bars."""
+    numpy = importlib.import_module("numpy")
+    volume = numpy.asarray(volume, dtype=numpy.float64)
+    previous_mean = volume_mean(volume, VOLUME_LOOKBACK)
+    with numpy.errstate(invalid="ignore"):
+        return (previous_mean > 0) & (volume > previous_mean * multiplier)
+
+
+def _all_enabled(checks: dict[str, Any | None], size: int | tuple[int, ...]) -> Any:
+    numpy = importlib.import_module("numpy")
+    enabled = [check for check in checks.values() if check is not None]
+    if not enabled:
+        return numpy.zeros(size, dtype=bool)
+    return numpy.logical_and.reduce(enabled)
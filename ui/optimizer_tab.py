@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from collections.abc import Callable
 
 from PyQt6.QtCore import QDate
@@ -21,6 +22,7 @@ from PyQt6.QtWidgets import (
 )
 
 from core.bot_manager import BotManager
+from core.optimizer import OptimizerProgress
 from strategy.base_strategy import StrategySettings
 from utils.logger import log
 
@@ -40,7 +42,9 @@ class OptimizerTab(QWidget):
         self.get_settings = get_settings
         self._last_results: list[dict] = []
         self._last_top_results: list[dict] = []
+        self._last_progress_draw = 0.0
         self._build_ui()
+        self._refresh_runs()
 
     def _build_ui(self) -> None:
         layout = QVBoxLayout(self)
@@ -66,6 +70,16 @@ class OptimizerTab(QWidget):
         self.volume_multiplier_range = QLineEdit("1.2,2.0,0.2")
         self.safety_count_range = QLineEdit("1,5,1")
         self.break_even_range = QLineEdit("0.2,1.0,0.2")
+        self.search_mode_combo = QComboBox()
+        self.search_mode_combo.addItem("Full grid", "grid")
+        self.search_mode_combo.addItem("Successive halving", "halving")
+        self.search_mode_combo.addItem("Random search", "random")
+        self.search_mode_combo.addItem("TPE search", "tpe")
+        self.search_mode_combo.addItem("Walk-forward", "walk_forward")
+        self.search_budget_input = QLineEdit("500")
+        self.search_seed_input = QLineEdit("0")
+        self.time_budget_input = QLineEdit("0")
+        self.walk_forward_input = QLineEdit("20000,5000")
 
         form.addRow("Optimize symbol", self.pair_combo)
         form.addRow("Apply target pair", self.apply_pair_combo)
@@ -78,19 +92,39 @@ class OptimizerTab(QWidget):
         form.addRow("Volume Multiplier range", self.volume_multiplier_range)
         form.addRow("Safety Orders Count range", self.safety_count_range)
         form.addRow("Break-even % range", self.break_even_range)
+        form.addRow("Search mode", self.search_mode_combo)
+        form.addRow("Search budget (random/TPE)", self.search_budget_input)
+        form.addRow("Search seed (random/TPE)", self.search_seed_input)
+        form.addRow("Time budget, minutes (0 = none)", self.time_budget_input)
+        form.addRow("Walk-forward train,test bars", self.walk_forward_input)
 
         button_row = QHBoxLayout()
         self.refresh_button = QPushButton("Refresh pairs")
         self.refresh_button.clicked.connect(self._refresh_pairs)
         self.run_button = QPushButton("Run Optimization")
         self.run_button.clicked.connect(self._run_optimization)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setEnabled(False)
+        self.stop_button.clicked.connect(self._stop_optimization)
         self.apply_button = QPushButton("Apply to Pair")
         self.apply_button.clicked.connect(self._apply_to_pair)
         button_row.addWidget(self.refresh_button)
         button_row.addWidget(self.run_button)
+        button_row.addWidget(self.stop_button)
         button_row.addWidget(self.apply_button)
         button_row.addStretch()
 
+        runs_row = QHBoxLayout()
+        self.runs_combo = QComboBox()
+        self.refresh_runs_button = QPushButton("Refresh runs")
+        self.refresh_runs_button.clicked.connect(self._refresh_runs)
+        self.load_run_button = QPushButton("Load Run")
+        self.load_run_button.clicked.connect(self._load_run)
+        runs_row.addWidget(QLabel("Past runs"))
+        runs_row.addWidget(self.runs_combo, 1)
+        runs_row.addWidget(self.refresh_runs_button)
+        runs_row.addWidget(self.load_run_button)
+
         self.status_label = QLabel("Ready")
 
         self.results_table = QTableWidget(0, 6)
@@ -100,6 +134,7 @@ class OptimizerTab(QWidget):
 
         layout.addLayout(form)
         layout.addLayout(button_row)
+        layout.addLayout(runs_row)
         layout.addWidget(self.status_label)
         layout.addWidget(self.results_table)
 
@@ -150,8 +185,14 @@ class OptimizerTab(QWidget):
 
     def _run_optimization(self) -> None:
         self.run_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
         self.loop.create_task(self._run_optimization_async())
 
+    def _stop_optimization(self) -> None:
+        self.stop_button.setEnabled(False)
+        self.status_label.setText("Stopping optimization...")
+        self.bot_manager.stop_optimization()
+
     async def _run_optimization_async(self) -> None:
         try:
             settings = self.get_settings()
@@ -160,8 +201,15 @@ class OptimizerTab(QWidget):
             start_date = self.start_date.date().toString("yyyy-MM-dd")
             end_date = self.end_date.date().toString("yyyy-MM-dd")
             parameter_ranges = self._build_parameter_ranges()
+            budget_minutes = float(self.time_budget_input.text().strip() or 0)
 
             self.status_label.setText("Optimization in progress...")
+            mode = str(self.search_mode_combo.currentData())
+            if mode == "walk_forward":
+                await self._run_walk_forward(
+                    symbol, settings, start_date, end_date, parameter_ranges, budget_minutes
+                )
+                return
             results = await self.bot_manager.run_optimization(
                 pair=symbol,
                 timeframe=settings.timeframe,
@@ -169,17 +217,119 @@ class OptimizerTab(QWidget):
                 end_date=end_date,
                 parameter_ranges=parameter_ranges,
                 base_settings=settings,
+                mode=mode,
+                budget=int(self.search_budget_input.text().strip() or 500),
+                seed=int(self.search_seed_input.text().strip() or 0),
+                on_progress=self._on_progress,
+                max_seconds=budget_minutes * 60.0 if budget_minutes > 0 else None,
             )
             self._last_results = results
             self._last_top_results = results[:10]
             self._fill_results(self._last_top_results)
-            self.status_label.setText(f"Completed. Tested: {len(results)} combinations")
+            summary = self.bot_manager.optimizer.summary
+            self.status_label.setText(
+                f"Completed. Tested: {summary.get('evaluated', summary.get('combinations', len(results)))} combinations "
+                f"({summary.get('resumed', 0)} resumed) | "
+                f"indicator cache {summary.get('indicator_cache_hits', 0)} hits / "
+                f"{summary.get('indicator_cache_misses', 0)} misses"
+            )
+            if summary.get("stopped"):
+                self.status_label.setText(f"{self.status_label.text()} | stopped early ({summary['stopped']})")
+            if "bars_simulated" in summary:
+                self.status_label.setText(
+                    f"{self.status_label.text()} | {summary['bars_simulated']} of "
+                    f"{summary['bars_exhaustive']} bars simulated"
+                )
             log(f"Optimization complete for {symbol}. Top 10 ready")
         except Exception as exc:  # noqa: BLE001
             self.status_label.setText(f"Failed: {exc}")
             log(f"Optimizer failed: {exc}")
         finally:
             self.run_button.setEnabled(True)
+            self.stop_button.setEnabled(False)
+            self._refresh_runs()
+
+    async def _run_walk_forward(
+        self,
+        symbol: str,
+        settings: StrategySettings,
+        start_date: str,
+        end_date: str,
+        parameter_ranges: dict[str, list[float | int]],
+        budget_minutes: float,
+    ) -> None:
+        train_bars, test_bars = (int(x.strip()) for x in self.walk_forward_input.text().split(","))
+        report = await self.bot_manager.run_walk_forward(
+            pair=symbol,
+            timeframe=settings.timeframe,
+            start_date=start_date,
+            end_date=end_date,
+            parameter_ranges=parameter_ranges,
+            base_settings=settings,
+            train_bars=train_bars,
+            test_bars=test_bars,
+            max_seconds=budget_minutes * 60.0 if budget_minutes > 0 else None,
+        )
+        # one row per window: the parameters picked on its train slice with their out-of-sample metrics
+        self._last_results = self.bot_manager.optimizer.results
+        self._last_top_results = self._last_results
+        self._fill_results(self._last_top_results)
+        oos = report["oos_report"]
+        self.status_label.setText(
+            f"Walk-forward: {len(report['windows'])} windows | out-of-sample profit "
+            f"{float(oos['total_profit']):.4f} | max DD {float(oos['max_drawdown']):.4f} | "
+            f"trades {oos['total_trades']}"
+        )
+        log(f"Walk-forward complete for {symbol}")
+
+    def _refresh_runs(self) -> None:
+        self.loop.create_task(self._refresh_runs_async())
+
+    async def _refresh_runs_async(self) -> None:
+        try:
+            runs = await self.bot_manager.list_optimization_runs()
+        except Exception as exc:  # noqa: BLE001
+            log(f"Failed to list optimizer runs: {exc}")
+            return
+        self.runs_combo.clear()
+        for run in runs:
+            label = (
+                f"{run['symbol']} {run['timeframe']} {run['start_date']}..{run['end_date']} | "
+                f"{run['evaluated']}/{run['combinations']} {run['status']} | {run['updated_at']}"
+            )
+            self.runs_combo.addItem(label, run["run_id"])
+
+    def _load_run(self) -> None:
+        run_id = self.runs_combo.currentData()
+        if not run_id:
+            return
+        self.load_run_button.setEnabled(False)
+        self.loop.create_task(self._load_run_async(str(run_id)))
+
+    async def _load_run_async(self, run_id: str) -> None:
+        try:
+            results = await self.bot_manager.load_optimization_run(run_id)
+            self._last_results = results
+            self._last_top_results = results[:10]
+            self._fill_results(self._last_top_results)
+            self.status_label.setText(f"Loaded run {run_id}: {len(results)} stored combinations")
+        except Exception as exc:  # noqa: BLE001
+            self.status_label.setText(f"Failed: {exc}")
+            log(f"Failed to load optimizer run {run_id}: {exc}")
+        finally:
+            self.load_run_button.setEnabled(True)
+
+    def _on_progress(self, progress: OptimizerProgress) -> None:
+        now = time.monotonic()
+        if now - self._last_progress_draw < 0.5 and progress.completed < progress.total:
+            return
+        self._last_progress_draw = now
+        self._last_top_results = progress.top_results[:10]
+        self._fill_results(self._last_top_results)
+        self.status_label.setText(
+            f"Optimization in progress: {progress.completed}/{progress.total} | "
+            f"{progress.combos_per_sec:.1f} combos/sec | ETA {progress.eta_sec:.0f}s"
+        )
 
     def _fill_results(self, top_results: list[dict]) -> None:
         self.results_table.setRowCount(0)
@@ -28,6 +28,7 @@ from PyQt6.QtWidgets import (
 
 from core.bot_manager import BotManager
 from strategy.base_strategy import StrategySettings
+from strategy.expressions import condition_error
 from utils.logger import log
 
 
@@ -56,6 +57,10 @@ class PairStrategyDialog(QDialog):
         self.adx_threshold_input = QLineEdit(str(self._settings.adx_threshold))
         self.volume_spike_multiplier_input = QLineEdit(str(self._settings.volume_spike_multiplier))
         self.atr_min_value_input = QLineEdit(str(self._settings.atr_min_value))
+        self.long_condition_input = QLineEdit(self._settings.long_condition)
+        self.long_condition_input.setPlaceholderText("built-in filters")
+        self.short_condition_input = QLineEdit(self._settings.short_condition)
+        self.short_condition_input.setPlaceholderText("built-in filters")
         self.risk_per_trade_input = QLineEdit(str(self._settings.risk_per_trade_pct))
         self.max_total_exposure_input = QLineEdit(str(self._settings.max_total_exposure_pct))
 
@@ -115,6 +120,8 @@ class PairStrategyDialog(QDialog):
         form.addRow("ADX Threshold", self.adx_threshold_input)
         form.addRow("Volume Spike Multiplier", self.volume_spike_multiplier_input)
         form.addRow("ATR Min Value", self.atr_min_value_input)
+        form.addRow("Long condition", self.long_condition_input)
+        form.addRow("Short condition", self.short_condition_input)
         form.addRow("Position size mode", self.position_size_mode_dropdown)
         form.addRow("Risk per trade (%)", self.risk_per_trade_input)
         form.addRow("Max total exposure (%)", self.max_total_exposure_input)
@@ -155,6 +162,16 @@ class PairStrategyDialog(QDialog):
         except (TypeError, ValueError):
             return default
 
+    def accept(self) -> None:
+        # an expression that does not compile keeps the dialog open instead of being dropped
+        for name, field in (("Long", self.long_condition_input), ("Short", self.short_condition_input)):
+            error = condition_error(field.text())
+            if error is not None:
+                QMessageBox.warning(self, f"Invalid {name.lower()} condition", error)
+                field.setFocus()
+                return
+        super().accept()
+
     def get_settings(self) -> StrategySettings:
         updated = deepcopy(self._settings)
         updated.take_profit_pct = self._as_float(self.take_profit_input.text(), updated.take_profit_pct)
@@ -170,6 +187,8 @@ class PairStrategyDialog(QDialog):
             self.volume_spike_multiplier_input.text(), updated.volume_spike_multiplier
         )
         updated.atr_min_value = self._as_float(self.atr_min_value_input.text(), updated.atr_min_value)
+        updated.long_condition = self.long_condition_input.text().strip()
+        updated.short_condition = self.short_condition_input.text().strip()
         updated.position_size_mode = self.position_size_mode_dropdown.currentText()
         updated.risk_per_trade_pct = self._as_float(self.risk_per_trade_input.text(), updated.risk_per_trade_pct)
         updated.max_total_exposure_pct = self._as_float(self.max_total_exposure_input.text(), updated.max_total_exposure_pct)
@@ -419,7 +438,16 @@ class PairsTab(QWidget):
         dca_total = max(0, int(worker.strategy_settings.safety_orders_count))
         dca_used = max(0, int(worker.safety_orders_used))
 
-        self.table.setItem(row, self.COL_STATUS, QTableWidgetItem(status))
+        status_item = QTableWidgetItem(status)
+        snapshot = worker.indicator_snapshot
+        if snapshot is not None:
+            report = worker.strategy.last_condition_report
+            status_item.setToolTip(
+                f"{snapshot.describe_values()}\n"
+                f"LONG: {report.get('LONG_TEXT', '')}\n"
+                f"SHORT: {report.get('SHORT_TEXT', '')}"
+            )
+        self.table.setItem(row, self.COL_STATUS, status_item)
         self.table.setItem(row, self.COL_POSITION, QTableWidgetItem(position))
         self.table.setItem(row, self.COL_DCA, QTableWidgetItem(f"{dca_used}/{dca_total}"))
 
@@ -455,7 +483,12 @@ class PairsTab(QWidget):
         return bool(re.fullmatch(r"[A-Z0-9]{5,20}", symbol))
 
     def add_pair(self) -> None:
-        default_mode = "Futures" if self.get_settings().enable_futures else "Spot"
+        try:
+            base_settings = self.get_settings()
+        except ValueError as exc:
+            QMessageBox.warning(self, "Invalid strategy settings", str(exc))
+            return
+        default_mode = "Futures" if base_settings.enable_futures else "Spot"
         dialog = AddPairDialog(default_mode, self.exchange_selector.currentText(), self)
         if dialog.exec() != QDialog.DialogCode.Accepted:
             return
@@ -476,7 +509,7 @@ class PairsTab(QWidget):
         self.table.setItem(row, self.COL_MODE, QTableWidgetItem(mode))
         self.table.setItem(row, self.COL_STATUS, QTableWidgetItem("STOPPED"))
         self.table.setItem(row, self.COL_POSITION, QTableWidgetItem("NONE"))
-        self.table.setItem(row, self.COL_DCA, QTableWidgetItem(f"0/{int(self.get_settings().safety_orders_count)}"))
+        self.table.setItem(row, self.COL_DCA, QTableWidgetItem(f"0/{int(base_settings.safety_orders_count)}"))
         self.table.setItem(row, self.COL_PRICE, QTableWidgetItem("--"))
         self.table.setItem(row, self.COL_EXCHANGE, QTableWidgetItem(exchange))
 
@@ -13,6 +13,7 @@ from PyQt6.QtWidgets import (
     QFormLayout,
     QHBoxLayout,
     QLabel,
+    QLineEdit,
     QPushButton,
     QTableWidget,
     QTableWidgetItem,
@@ -21,6 +22,7 @@ from PyQt6.QtWidgets import (
 )
 
 from core.bot_manager import BotManager
+from core.monte_carlo import MONTE_CARLO_METHODS
 from strategy.base_strategy import StrategySettings
 from utils.logger import log
 
@@ -72,14 +74,32 @@ class StatisticsTab(QWidget):
         button_row.addWidget(self.run_backtest_button)
         button_row.addStretch()
 
+        monte_carlo_row = QHBoxLayout()
+        self.mc_paths_input = QLineEdit("10000")
+        self.mc_method_combo = QComboBox()
+        self.mc_method_combo.addItems(list(MONTE_CARLO_METHODS))
+        self.run_monte_carlo_button = QPushButton("Run Monte Carlo")
+        self.run_monte_carlo_button.clicked.connect(self._run_monte_carlo)
+        monte_carlo_row.addWidget(QLabel("Monte Carlo paths:"))
+        monte_carlo_row.addWidget(self.mc_paths_input)
+        monte_carlo_row.addWidget(self.mc_method_combo)
+        monte_carlo_row.addWidget(self.run_monte_carlo_button)
+        monte_carlo_row.addStretch()
+
         self.stats_table = QTableWidget(0, 2)
         self.stats_table.setHorizontalHeaderLabels(["Metric", "Value"])
 
+        self.monte_carlo_label = QLabel("Monte Carlo: run a backtest first")
+        self.monte_carlo_table = QTableWidget(0, 1)
+
         self.graph_placeholder_label = QLabel("Equity Curve")
 
         layout.addLayout(form)
         layout.addLayout(button_row)
         layout.addWidget(self.stats_table)
+        layout.addLayout(monte_carlo_row)
+        layout.addWidget(self.monte_carlo_label)
+        layout.addWidget(self.monte_carlo_table)
         layout.addWidget(self.graph_placeholder_label)
         self._init_plot_widget(layout)
 
@@ -131,6 +151,35 @@ class StatisticsTab(QWidget):
         finally:
             self.run_backtest_button.setEnabled(True)
 
+    def _run_monte_carlo(self) -> None:
+        self.run_monte_carlo_button.setEnabled(False)
+        self.loop.create_task(self._run_monte_carlo_async())
+
+    async def _run_monte_carlo_async(self) -> None:
+        try:
+            paths = int(self.mc_paths_input.text().strip() or "10000")
+            report = await self.bot_manager.run_monte_carlo(paths=paths, method=self.mc_method_combo.currentText())
+            self._fill_monte_carlo(report)
+        except Exception as exc:  # noqa: BLE001
+            log(f"Monte Carlo failed: {exc}")
+        finally:
+            self.run_monte_carlo_button.setEnabled(True)
+
+    def _fill_monte_carlo(self, report: dict[str, Any]) -> None:
+        self.monte_carlo_label.setText(
+            f"Monte Carlo: {report['paths']} {report['method']} paths over {report['trades']} trades"
+        )
+        metrics = ["max_drawdown", "final_pnl", "longest_losing_streak"]
+        bands = [f"p{percentile:g}" for percentile in report["percentiles"]]
+        self.monte_carlo_table.clear()
+        self.monte_carlo_table.setRowCount(len(metrics))
+        self.monte_carlo_table.setColumnCount(len(bands) + 1)
+        self.monte_carlo_table.setHorizontalHeaderLabels(["Metric", *bands])
+        for row, metric in enumerate(metrics):
+            self.monte_carlo_table.setItem(row, 0, QTableWidgetItem(metric))
+            for column, band in enumerate(bands, start=1):
+                self.monte_carlo_table.setItem(row, column, QTableWidgetItem(f"{report[metric][band]:.4f}"))
+
     def _fill_report(self, report: dict[str, float | int]) -> None:
         self.stats_table.setRowCount(0)
         for metric, value in report.items():
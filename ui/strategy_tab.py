@@ -6,12 +6,14 @@ from PyQt6.QtWidgets import (
     QCheckBox,
     QComboBox,
     QFormLayout,
+    QLabel,
     QLineEdit,
     QVBoxLayout,
     QWidget,
 )
 
 from strategy.base_strategy import StrategySettings
+from strategy.expressions import condition_error
 
 
 class StrategyTab(QWidget):
@@ -40,6 +42,16 @@ class StrategyTab(QWidget):
         self.adx_threshold_input = QLineEdit("20")
         self.volume_spike_multiplier_input = QLineEdit("1.5")
         self.atr_min_value_input = QLineEdit("0")
+        self.long_condition_input = QLineEdit()
+        self.long_condition_input.setPlaceholderText("built-in filters, e.g. rsi(14) < 30 and close > ema(200)")
+        self.short_condition_input = QLineEdit()
+        self.short_condition_input.setPlaceholderText("built-in filters")
+        self.condition_error_label = QLabel()
+        self.condition_error_label.setStyleSheet("color: #c0392b")
+        self.condition_error_label.setWordWrap(True)
+        self.condition_error_label.hide()
+        self.long_condition_input.textChanged.connect(self._check_conditions)
+        self.short_condition_input.textChanged.connect(self._check_conditions)
         self.risk_per_trade_input = QLineEdit("1.0")
         self.max_total_exposure_input = QLineEdit("30.0")
 
@@ -52,6 +64,11 @@ class StrategyTab(QWidget):
         self.run_mode_dropdown = QComboBox()
         self.run_mode_dropdown.addItems(["Live", "Paper", "Backtest"])
 
+        self.fill_model_dropdown = QComboBox()
+        self.fill_model_dropdown.addItems(["Close", "Intrabar"])
+        self.intrabar_order_dropdown = QComboBox()
+        self.intrabar_order_dropdown.addItems(["Adverse first", "Favorable first"])
+
         self.use_market_first_order_checkbox = QCheckBox("Use Market First Order")
         self.use_market_first_order_checkbox.setChecked(True)
 
@@ -102,11 +119,15 @@ class StrategyTab(QWidget):
         form.addRow("ADX Threshold:", self.adx_threshold_input)
         form.addRow("Volume Spike Multiplier:", self.volume_spike_multiplier_input)
         form.addRow("ATR Min Value:", self.atr_min_value_input)
+        form.addRow("Long condition:", self.long_condition_input)
+        form.addRow("Short condition:", self.short_condition_input)
         form.addRow("Position size mode:", self.position_size_mode_dropdown)
         form.addRow("Risk per trade (%):", self.risk_per_trade_input)
         form.addRow("Max total exposure (%):", self.max_total_exposure_input)
         form.addRow("Timeframe:", self.timeframe_dropdown)
         form.addRow("Run mode:", self.run_mode_dropdown)
+        form.addRow("Backtest fills:", self.fill_model_dropdown)
+        form.addRow("Intrabar order:", self.intrabar_order_dropdown)
 
         form.addRow("Leverage:", self.leverage_input)
         form.addRow("Margin Mode:", self.margin_dropdown)
@@ -117,6 +138,7 @@ class StrategyTab(QWidget):
         form.addRow("Futures Position Side:", self.direction_dropdown)
 
         layout.addLayout(form)
+        layout.addWidget(self.condition_error_label)
         layout.addWidget(self.use_market_first_order_checkbox)
         layout.addWidget(self.enable_futures_checkbox)
         layout.addWidget(self.protection_orders_checkbox)
@@ -128,8 +150,26 @@ class StrategyTab(QWidget):
         layout.addWidget(self.use_atr_filter_checkbox)
         layout.addStretch()
 
+    def _check_conditions(self) -> str | None:
+        """Show the first condition expression error under the form and return it."""
+        for name, field in (("Long", self.long_condition_input), ("Short", self.short_condition_input)):
+            error = condition_error(field.text())
+            if error is not None:
+                self.condition_error_label.setText(f"{name} condition: {error}")
+                self.condition_error_label.show()
+                return self.condition_error_label.text()
+        self.condition_error_label.hide()
+        return None
+
     def get_strategy_settings(self) -> StrategySettings:
-        """Read strategy settings from UI with safe defaults."""
+        """Read strategy settings from UI with safe defaults.
+
+        Raises ``ValueError`` while a condition expression does not compile, so an
+        invalid rule is never replaced by something else behind the user's back.
+        """
+        error = self._check_conditions()
+        if error is not None:
+            raise ValueError(error)
 
         def as_int(value: str, default: int) -> int:
             try:
@@ -165,6 +205,8 @@ class StrategyTab(QWidget):
             mode="Futures" if self.enable_futures_checkbox.isChecked() else "Spot",
             cooldown_minutes=as_float(self.cooldown_minutes_input.text(), 0.0),
             run_mode=self.run_mode_dropdown.currentText(),
+            backtest_fill_model=self.fill_model_dropdown.currentText(),
+            intrabar_order=self.intrabar_order_dropdown.currentText(),
             use_rsi=self.use_rsi_checkbox.isChecked(),
             use_ema_trend_filter=self.use_ema_filter_checkbox.isChecked(),
             use_adx_filter=self.use_adx_filter_checkbox.isChecked(),
@@ -173,6 +215,8 @@ class StrategyTab(QWidget):
             adx_threshold=as_float(self.adx_threshold_input.text(), 20.0),
             volume_spike_multiplier=as_float(self.volume_spike_multiplier_input.text(), 1.5),
             atr_min_value=as_float(self.atr_min_value_input.text(), 0.0),
+            long_condition=self.long_condition_input.text().strip(),
+            short_condition=self.short_condition_input.text().strip(),
             position_size_mode=self.position_size_mode_dropdown.currentText(),
             risk_per_trade_pct=as_float(self.risk_per_trade_input.text(), 1.0),
             max_total_exposure_pct=as_float(self.max_total_exposure_input.text(), 30.0),